@@ -26,6 +26,8 @@ from more_itertools import divide
 from autotrader.broker.degiro.degiro_client import DegiroClient
 from autotrader.broker.demo_broker import DemoBroker
 from autotrader.datasource.database.app_database import StockDataBaseApp
+from autotrader.datasource.database.bar_cache import BAR_CACHE
+from autotrader.datasource.database.bar_store import BAR_STORE
 from autotrader.datasource.database.app_schema import TagApp, StockApp, IndexApp, FilterApp, SeriesApp
 from autotrader.datasource.database.stock_database import StockDataBase
 
@@ -103,6 +105,56 @@ def get_arg_parse(args):
                         help="Returns the version of autotrader.")
     parser.add_argument('-t', '--task', dest='task', action='store', nargs='*',
                         help='Add task splitting', default=None)
+    parser.add_argument('-j', '--jobs', dest='jobs', action='store', type=int, default=1,
+                        help='Amount of processes for the indicator build.')
+    parser.add_argument('--threads', dest='threads', action='store', type=int, default=1,
+                        help='Amount of threads that optimize one indicator of the full build.')
+    parser.add_argument('--search', dest='search', action='store', nargs='*', default=None,
+                        help='Search mode of the full build: grid, coarse, halving, random or '
+                             'parzen. Use SHORT_NAME=mode to select the mode of one indicator.')
+    parser.add_argument('--budget', dest='budget', action='store', type=int, default=1024,
+                        help='Maximal amount of scored arguments of the random and parzen search.')
+    parser.add_argument('--seed', dest='seed', action='store', type=int, default=0,
+                        help='Seed of the random and parzen search.')
+    parser.add_argument('--warm', dest='warm_start', action='store_true', default=False,
+                        help='Start the full build at the arguments of the last full build.')
+    parser.add_argument('--indicator-time', dest='indicator_time', action='store', type=float,
+                        default=None, help='Time budget in seconds per indicator of the full '
+                                           'build. The best arguments so far are stored.')
+    parser.add_argument('--stock-time', dest='stock_time', action='store', type=float,
+                        default=None, help='Time budget in seconds for all indicators of a '
+                                           'stock in the full build.')
+    parser.add_argument('--incremental', dest='incremental', action='store_true', default=False,
+                        help='Build only stocks with new or corrected bars since their last '
+                             'full build or with an older build than --max-age.')
+    parser.add_argument('--max-age', dest='max_age', action='store', type=float, default=7,
+                        help='Days after which the incremental build optimizes a stock again.')
+    parser.add_argument('--checkpoint', dest='checkpoint', action='store', default=None,
+                        help='Path of the progress file of the full build. The results are '
+                             'committed every --checkpoint-interval stocks.')
+    parser.add_argument('--checkpoint-interval', dest='checkpoint_interval', action='store',
+                        type=int, default=50, help='Amount of stocks between two checkpoints.')
+    parser.add_argument('--resume', dest='resume', action='store_true', default=False,
+                        help='Skip the stocks that are completed in the progress file.')
+    parser.add_argument('--flush-rows', dest='flush_rows', action='store', type=int,
+                        default=20000, help='Maximal amount of rows the indicator builds keep '
+                                            'in memory before they are committed.')
+    parser.add_argument('--flush-bytes', dest='flush_bytes', action='store', type=int,
+                        default=64 * 1024 * 1024, help='Maximal amount of plot bytes the '
+                                                       'indicator builds keep in memory before '
+                                                       'they are committed.')
+    parser.add_argument('--cache', dest='cache', action='store', default=None,
+                        help='Path of the result cache file of the full build. Stocks with the '
+                             'same bars and settings reuse the stored results.')
+    parser.add_argument('--cache-size', dest='cache_size', action='store', type=int,
+                        default=20000, help='Maximal amount of results in the result cache.')
+    parser.add_argument('--bar-cache-size', dest='bar_cache_size', action='store', type=int,
+                        default=128 * 1024 * 1024, help='Maximal amount of bytes of the '
+                                                        'in-process bar cache. 0 disables it.')
+    parser.add_argument('--bar-store', dest='bar_store', action='store', default=None,
+                        help='Directory of the local memory-mapped bar store. The bars of a '
+                             'stock are copied from the database when they are read and the '
+                             'newest bar or the amount of bars differs from the database.')
     parser.add_argument('--dump', dest='dump', action='store_true',
                         help='Create yaml dump file', default=False)
     parser.add_argument('--appdb', dest='app', action='store_true',
@@ -290,6 +342,8 @@ def autotrader_app():
         logger = TraderBase.setup_logger("autotrader")
         db_tool = StockDataBase(config["sql"], logger)
         db_tool.connect()
+        BAR_CACHE.max_bytes = parsed_args.bar_cache_size
+        BAR_STORE.path = parsed_args.bar_store
 
         print("Autotrader {}".format(VERSION))
         if parsed_args.app:
@@ -387,7 +441,24 @@ def autotrader_app():
                 'signals': ["ALL"],
                 'stocks': my_stocks,
                 "look_back": 300,
-                'db_tool': db_tool
+                'db_tool': db_tool,
+                'jobs': parsed_args.jobs,
+                'threads': parsed_args.threads,
+                'search': parsed_args.search,
+                'budget': parsed_args.budget,
+                'seed': parsed_args.seed,
+                'warm_start': parsed_args.warm_start,
+                'indicator_time': parsed_args.indicator_time,
+                'stock_time': parsed_args.stock_time,
+                'cache': parsed_args.cache,
+                'cache_size': parsed_args.cache_size,
+                'incremental': parsed_args.incremental,
+                'max_age': parsed_args.max_age,
+                'checkpoint': parsed_args.checkpoint,
+                'checkpoint_interval': parsed_args.checkpoint_interval,
+                'resume': parsed_args.resume,
+                'flush_rows': parsed_args.flush_rows,
+                'flush_bytes': parsed_args.flush_bytes
             }
             exit_code += BuildIndicators(config, arguments, logger).build()
         if parsed_args.quicksignals is not None:
@@ -397,7 +468,10 @@ def autotrader_app():
                 'signals': ["ALL"],
                 'stocks': my_stocks,
                 "look_back": 300,
-                'db_tool': db_tool
+                'db_tool': db_tool,
+                'jobs': parsed_args.jobs,
+                'flush_rows': parsed_args.flush_rows,
+                'flush_bytes': parsed_args.flush_bytes
             }
             exit_code += BuildIndicatorsQuick(config, arguments, logger).build()
         if parsed_args.live:
@@ -454,6 +528,7 @@ def autotrader_app():
             }
             exit_code += BackTestingStrategy(config, arguments, logger).build()
             arguments["broker"].commit_work()
+        logger.info("Bar cache statistics %s" % BAR_CACHE.get_statistics())
     if parsed_args.version:
         print(VERSION)
     return exit_code
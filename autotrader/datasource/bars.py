@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import datetime
+
+import numpy as np
+
+# order of the columns in BARS_NUMPY arrays
+COLUMNS = ('close', 'open', 'volume', 'high', 'low', 'times')
+
+
+def to_datetime(value):
+    """
+    Converts a time of bars to a naive datetime
+    :param value: datetime or numpy datetime64
+    :return: datetime
+    """
+    if isinstance(value, np.datetime64):
+        return value.astype('datetime64[us]').item()
+    return value
+
+
+def to_datetime64(value):
+    """
+    Converts a time to the datetime64 unit of bars. Aware datetimes keep their wall time
+    like the naive datetimes of the database.
+    :param value: datetime, date or numpy datetime64
+    :return: numpy datetime64
+    """
+    if isinstance(value, datetime.datetime) and value.tzinfo is not None:
+        value = value.replace(tzinfo=None)
+    return np.datetime64(value, 'ns')
+
+
+class Bars:
+    """
+    Bars of a stock with float64 arrays for prices and volume and a datetime64[ns] array
+    for the times. Bars can be used like BARS_NUMPY arrays: bars[:, 0] returns the close
+    prices and bars[rows] returns the selected bars. Slices share the memory of the arrays.
+    """
+
+    def __init__(self, close, price_open, volume, high, low, times):
+        self.close = np.ascontiguousarray(close, dtype='float64')
+        self.open = np.ascontiguousarray(price_open, dtype='float64')
+        self.volume = np.ascontiguousarray(volume, dtype='float64')
+        self.high = np.ascontiguousarray(high, dtype='float64')
+        self.low = np.ascontiguousarray(low, dtype='float64')
+        self.times = np.asarray(times, dtype='datetime64[ns]')
+
+    @staticmethod
+    def from_array(bars):
+        """
+        Converts a BARS_NUMPY array
+        :param bars: object array with close, open, volume, high, low and date per row
+        :return: bars object
+        """
+        return Bars(*[bars[:, idx] for idx in range(len(COLUMNS))])
+
+    def to_array(self):
+        """
+        Converts the bars to a BARS_NUMPY array
+        :return: object array with close, open, volume, high, low and date per row
+        """
+        array = np.empty(self.shape, dtype='object')
+        for idx, column in enumerate(COLUMNS[:-1]):
+            array[:, idx] = getattr(self, column)
+        array[:, -1] = self.times.astype('datetime64[us]').astype('object')
+        return array
+
+    def get_column(self, column):
+        """
+        Returns a column by its name or its index in BARS_NUMPY arrays
+        :param column: name i.e. 'close' or index i.e. 0
+        :return: array
+        """
+        if isinstance(column, str):
+            return getattr(self, column)
+        return getattr(self, COLUMNS[column])
+
+    def get_window(self, start=None, end=None):
+        """
+        Returns the bars between two times without copying them. The times must be sorted.
+        :param start: first time or None
+        :param end: last time or None
+        :return: bars object
+        """
+        first = 0 if start is None else \
+            np.searchsorted(self.times, to_datetime64(start), side='left')
+        last = len(self) if end is None else \
+            np.searchsorted(self.times, to_datetime64(end), side='right')
+        return self[first:last]
+
+    def is_sorted(self):
+        """
+        Checks if the times are ascending
+        :return: true if sorted
+        """
+        return bool(np.all(self.times[1:] >= self.times[:-1]))
+
+    @property
+    def shape(self):
+        return len(self), len(COLUMNS)
+
+    @property
+    def size(self):
+        return len(self) * len(COLUMNS)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            rows, column = key
+            return self.get_column(column)[rows]
+        if isinstance(key, (int, np.integer)):
+            return tuple(getattr(self, column)[key] for column in COLUMNS)
+        return Bars(*[getattr(self, column)[key] for column in COLUMNS])
+
+    def __len__(self):
+        return self.close.shape[0]
+
+    def __repr__(self):
+        if not len(self):
+            return "Bars(size=0)"
+        return "Bars(size=%r,start=%r,end=%r)" % (len(self), to_datetime(self.times[0]),
+                                                   to_datetime(self.times[-1]))
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+from collections import OrderedDict
+import threading
+
+from autotrader.datasource.bars import COLUMNS, to_datetime64
+
+
+class BarCache:
+    """
+    Process wide cache of typed bars. Each entry is the window of bars between two dates of
+    a stock or an index. Requests inside a cached window are served with a slice of it. The
+    least recently used windows are removed if the arrays exceed max_bytes. The cached bars
+    are shared, so they must not be changed.
+    """
+
+    MAX_BYTES = 128 * 1024 * 1024
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.windows = OrderedDict()
+        # keys of windows per owner and resolution
+        self.owners = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_owner(item):
+        """
+        Returns the key of the owner of series
+        :param item: stock or index
+        :return: tuple with table name and id
+        """
+        return item.__tablename__, item.id
+
+    def get(self, item, resolution, start, end):
+        """
+        Returns the cached bars between two dates
+        :param item: stock or index
+        :param resolution: resolution of series
+        :param start: first date
+        :param end: last date
+        :return: typed bars or None if no window contains the dates
+        """
+        start, end = to_datetime64(start), to_datetime64(end)
+        with self.lock:
+            for key in self.owners.get((self.get_owner(item), resolution), []):
+                if key[2] <= start and end <= key[3]:
+                    self.windows.move_to_end(key)
+                    self.hits += 1
+                    return self.windows[key].get_window(start, end)
+            self.misses += 1
+        return None
+
+    def put(self, item, resolution, start, end, bars):
+        """
+        Stores the bars between two dates. Windows inside the new window are removed.
+        :param item: stock or index
+        :param resolution: resolution of series
+        :param start: first date of query
+        :param end: last date of query
+        :param bars: typed bars
+        :return: nothing
+        """
+        size = sum(bars.get_column(column).nbytes for column in COLUMNS)
+        if self.max_bytes <= 0 or size > self.max_bytes:
+            return
+        owner = (self.get_owner(item), resolution)
+        key = owner + (to_datetime64(start), to_datetime64(end))
+        with self.lock:
+            for old_key in list(self.owners.get(owner, [])):
+                if key[2] <= old_key[2] and old_key[3] <= key[3]:
+                    self.__remove(old_key)
+            self.windows[key] = bars
+            self.owners.setdefault(owner, []).append(key)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self.__remove(next(iter(self.windows)))
+                self.evictions += 1
+
+    def invalidate(self, item=None):
+        """
+        Removes the windows of a stock or an index. Must be called after new series are
+        stored.
+        :param item: stock or index or None for all windows
+        :return: nothing
+        """
+        with self.lock:
+            owner = None if item is None else self.get_owner(item)
+            for key in list(self.windows):
+                if owner is None or key[0] == owner:
+                    self.__remove(key)
+
+    def clear(self):
+        """
+        Removes all windows and resets the counters
+        :return: nothing
+        """
+        self.invalidate()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_statistics(self):
+        """
+        Returns the counters of the cache
+        :return: dictionary with hits, misses, evictions, windows and bytes
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "windows": len(self.windows),
+            "bytes": self.bytes
+        }
+
+    def __remove(self, key):
+        bars = self.windows.pop(key)
+        self.bytes -= sum(bars.get_column(column).nbytes for column in COLUMNS)
+        keys = self.owners[key[:2]]
+        keys.remove(key)
+        if not keys:
+            del self.owners[key[:2]]
+
+
+# cache of get_bars for typed bars
+BAR_CACHE = BarCache()
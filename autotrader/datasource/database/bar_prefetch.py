@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import numpy as np
+from sqlalchemy import func, select
+
+from autotrader.datasource.bars import Bars
+from autotrader.datasource.database.bar_store import BAR_STORE
+from autotrader.datasource.database.stock_schema import Series
+
+
+class BarPrefetch:
+    """
+    Loads the bars of many stocks with one ordered query per chunk of stocks instead of one
+    query per stock. The bars of a chunk are split into typed bars per stock, which share
+    the arrays of the chunk.
+    """
+
+    # amount of stocks per query
+    CHUNK_SIZE = 200
+
+    def __init__(self, session, start, end, resolution='P1D', chunk_size=CHUNK_SIZE):
+        self.session = session
+        self.start = start
+        self.end = end
+        self.resolution = resolution
+        self.chunk_size = chunk_size
+        self.queries = 0
+
+    def load(self, stock_ids):
+        """
+        Loads the bars of stocks
+        :param stock_ids: list with ids of stocks
+        :return: dictionary with typed bars per stock id. Stocks without bars get empty bars.
+        """
+        bars = {}
+        for first in range(0, len(stock_ids), self.chunk_size):
+            bars.update(self.__load_chunk(stock_ids[first:first + self.chunk_size]))
+        return bars
+
+    def iterate(self, stocks):
+        """
+        Loads the bars chunk by chunk, so only the bars of one chunk are kept in memory
+        :param stocks: list with stocks
+        :return: generator of tuples with stock and typed bars
+        """
+        for first in range(0, len(stocks), self.chunk_size):
+            chunk = stocks[first:first + self.chunk_size]
+            if BAR_STORE.path:
+                # the local bar store replaces the bar query if it matches the database
+                states = self.__load_states([stock.id for stock in chunk])
+                for stock in chunk:
+                    stock.sync_bar_store(self.resolution, states.get(stock.id, (None, 0)))
+                    yield stock, BAR_STORE.get_bars(stock, self.resolution, self.start,
+                                                    self.end)
+                continue
+            bars = self.__load_chunk([stock.id for stock in chunk])
+            for stock in chunk:
+                yield stock, bars[stock.id]
+
+    def __load_states(self, stock_ids):
+        """
+        Loads the date of the newest bar and the amount of bars of a chunk of stocks with
+        one query
+        :param stock_ids: list with ids of stocks
+        :return: dictionary with tuple of date and amount per stock id
+        """
+        rows = self.session.execute(
+            select(Series.stock_id, func.max(Series.date), func.count(Series.id))
+            .where(Series.stock_id.in_(stock_ids))
+            .where(Series.resolution == self.resolution)
+            .group_by(Series.stock_id)).all()
+        self.queries += 1
+        return {stock_id: (date, count) for stock_id, date, count in rows}
+
+    def __load_chunk(self, stock_ids):
+        """
+        Loads the bars of a chunk of stocks with one query
+        :param stock_ids: list with ids of stocks
+        :return: dictionary with typed bars per stock id
+        """
+        if not stock_ids:
+            return {}
+        rows = self.session.execute(
+            select(Series.stock_id, Series.priceclose, Series.priceopen, Series.volume,
+                   Series.pricehigh, Series.pricelow, Series.date)
+            .where(Series.stock_id.in_(stock_ids))
+            .where(Series.resolution == self.resolution)
+            .where(Series.date.between(self.start, self.end))
+            .order_by(Series.stock_id, Series.date)).all()
+        self.queries += 1
+        columns = list(zip(*rows)) if rows else [()] * 7
+        owners = np.array(columns[0], dtype='int64')
+        chunk = Bars(*[np.array(column, dtype='float64') for column in columns[1:6]],
+                     np.array(columns[6], dtype='datetime64[ns]'))
+        # the rows are ordered by stock, so the bars of a stock are one slice of the chunk
+        bounds = np.concatenate(([0], np.flatnonzero(np.diff(owners)) + 1, [owners.size]))
+        bars = {stock_id: chunk[0:0] for stock_id in stock_ids}
+        for first, last in zip(bounds[:-1], bounds[1:]):
+            if last > first:
+                bars[int(owners[first])] = chunk[first:last]
+        return bars
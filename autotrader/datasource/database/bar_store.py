@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import os
+import shutil
+
+import numpy as np
+
+from autotrader.datasource.bars import Bars, COLUMNS, to_datetime
+
+
+class BarStore:
+    """
+    Local copy of the bars in memory-mapped files. The bars of a stock or an index and a
+    resolution are stored in one file per column: float64 prices and volume and int64
+    nanosecond timestamps. Reads map the files, so windows of bars are not copied. The
+    database stays the source of truth: the store only holds bars that were read from it, it
+    is updated if it differs from the database and it can be removed at any time.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.hits = 0
+        self.appends = 0
+
+    def get_directory(self, item, resolution):
+        """
+        Returns the directory of the files of a stock or an index
+        :param item: stock or index
+        :param resolution: resolution of series
+        :return: path of directory
+        """
+        return os.path.join(self.path, item.__tablename__, str(item.id), resolution)
+
+    def has_bars(self, item, resolution):
+        """
+        Checks if the bars of a stock or an index are stored
+        :param item: stock or index
+        :param resolution: resolution of series
+        :return: true if the files exist
+        """
+        return os.path.exists(os.path.join(self.get_directory(item, resolution), COLUMNS[-1]))
+
+    def get_bars(self, item, resolution, start=None, end=None):
+        """
+        Returns the stored bars between two dates without copying them
+        :param item: stock or index
+        :param resolution: resolution of series
+        :param start: first date or None
+        :param end: last date or None
+        :return: typed bars
+        """
+        directory = self.get_directory(item, resolution)
+        rows = self.__get_rows(directory)
+        self.hits += 1
+        if not rows:
+            return Bars(*[[]] * len(COLUMNS))
+        columns = [np.memmap(os.path.join(directory, column), dtype='float64', mode='r',
+                             shape=(rows,)) for column in COLUMNS[:-1]]
+        times = np.memmap(os.path.join(directory, COLUMNS[-1]), dtype='int64', mode='r',
+                          shape=(rows,))
+        return Bars(*columns, times.view('datetime64[ns]')).get_window(start, end)
+
+    def get_last_time(self, item, resolution):
+        """
+        Returns the time of the last stored bar
+        :param item: stock or index
+        :param resolution: resolution of series
+        :return: numpy datetime64 or None
+        """
+        directory = self.get_directory(item, resolution)
+        rows = self.__get_rows(directory)
+        if not rows:
+            return None
+        times = np.memmap(os.path.join(directory, COLUMNS[-1]), dtype='int64', mode='r',
+                          shape=(rows,))
+        return times[-1].view('datetime64[ns]')
+
+    def get_state(self, item, resolution):
+        """
+        Returns the time of the last stored bar and the amount of stored bars
+        :param item: stock or index
+        :param resolution: resolution of series
+        :return: tuple with datetime or None and amount or None if the files do not exist
+        """
+        if not self.has_bars(item, resolution):
+            return None
+        rows = self.__get_rows(self.get_directory(item, resolution))
+        last = self.get_last_time(item, resolution)
+        return None if last is None else to_datetime(last), rows
+
+    def write(self, item, resolution, bars):
+        """
+        Replaces the stored bars. The new files are renamed over the old ones, so mapped
+        bars of readers keep the old files.
+        :param item: stock or index
+        :param resolution: resolution of series
+        :param bars: typed bars sorted by time
+        :return: amount of stored bars
+        """
+        directory = self.get_directory(item, resolution)
+        os.makedirs(directory, exist_ok=True)
+        for column in COLUMNS:
+            data = bars.get_column(column)
+            with open(os.path.join(directory, column + '.tmp'), 'wb') as column_file:
+                column_file.write(data.view('int64').tobytes() if column == COLUMNS[-1]
+                                  else data.tobytes())
+        # without the times file the store has no bars until all columns are replaced
+        if os.path.exists(os.path.join(directory, COLUMNS[-1])):
+            os.remove(os.path.join(directory, COLUMNS[-1]))
+        for column in COLUMNS:
+            os.replace(os.path.join(directory, column + '.tmp'), os.path.join(directory, column))
+        self.appends += 1
+        return len(bars)
+
+    def append(self, item, resolution, bars):
+        """
+        Appends the bars after the last stored bar. The files are created if they do not
+        exist, even without bars.
+        :param item: stock or index
+        :param resolution: resolution of series
+        :param bars: typed bars sorted by time
+        :return: amount of appended bars
+        """
+        directory = self.get_directory(item, resolution)
+        os.makedirs(directory, exist_ok=True)
+        last = self.get_last_time(item, resolution)
+        if last is not None:
+            bars = bars.get_window(last + np.timedelta64(1, 'ns'))
+        # an interrupted append leaves columns of different length
+        rows = self.__get_rows(directory)
+        # the times are written last, so the length of the times file marks complete bars
+        for column in COLUMNS:
+            with open(os.path.join(directory, column), 'ab') as column_file:
+                column_file.truncate(rows * 8)
+                data = bars.get_column(column)
+                column_file.write(data.view('int64').tobytes() if column == COLUMNS[-1]
+                                  else data.tobytes())
+        self.appends += 1
+        return len(bars)
+
+    def clear(self):
+        """
+        Removes all stored bars
+        :return: nothing
+        """
+        if self.path and os.path.exists(self.path):
+            shutil.rmtree(self.path)
+
+    @staticmethod
+    def __get_rows(directory):
+        """
+        Returns the amount of complete bars in a directory
+        :param directory: path of directory
+        :return: amount of bars
+        """
+        if not os.path.exists(os.path.join(directory, COLUMNS[-1])):
+            return 0
+        return min(os.path.getsize(os.path.join(directory, column)) // 8
+                   for column in COLUMNS if os.path.exists(os.path.join(directory, column)))
+
+
+# local bar store of get_bars, enabled by setting its path
+BAR_STORE = BarStore()
@@ -0,0 +1,23 @@
+"""add runner-ups of optimizer to signal
+
+Revision ID: 3c9a1d7e5b21
+Revises: f2ee970ee588
+Create Date: 2026-10-17 09:12:31.512204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3c9a1d7e5b21'
+down_revision = 'f2ee970ee588'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('signal', sa.Column('runner_ups', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('signal', 'runner_ups')
@@ -0,0 +1,25 @@
+"""add series state of incremental build to signal
+
+Revision ID: 5e7b2c9a4f13
+Revises: 8d41b6f0c2e7
+Create Date: 2026-10-17 11:24:05.418392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5e7b2c9a4f13'
+down_revision = '8d41b6f0c2e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('signal', sa.Column('series_date', sa.DateTime(), nullable=True))
+    op.add_column('signal', sa.Column('series_count', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('signal', 'series_count')
+    op.drop_column('signal', 'series_date')
@@ -0,0 +1,23 @@
+"""add truncation flag of optimizer to signal
+
+Revision ID: 8d41b6f0c2e7
+Revises: 3c9a1d7e5b21
+Create Date: 2026-10-17 10:03:48.201736
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '8d41b6f0c2e7'
+down_revision = '3c9a1d7e5b21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('signal', sa.Column('truncated', sa.Boolean(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('signal', 'truncated')
@@ -0,0 +1,25 @@
+"""add build token to signal
+
+Revision ID: a7d4c1e9b352
+Revises: 5e7b2c9a4f13
+Create Date: 2026-10-18 09:41:17.630512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a7d4c1e9b352'
+down_revision = '5e7b2c9a4f13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('signal', sa.Column('build_token', sa.String(length=32), nullable=True))
+    op.create_index(op.f('ix_signal_build_token'), 'signal', ['build_token'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_signal_build_token'), table_name='signal')
+    op.drop_column('signal', 'build_token')
@@ -27,12 +27,18 @@ from sqlalchemy import DateTime
 from sqlalchemy import ForeignKey
 from sqlalchemy import UniqueConstraint
 from sqlalchemy import func
+from sqlalchemy import select
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, Session
 
+from autotrader.datasource.bars import Bars
+from autotrader.datasource.database.bar_cache import BAR_CACHE
+from autotrader.datasource.database.bar_store import BAR_STORE
+
 BARS_SERIES = 0
 BARS_PANDAS = 1
 BARS_NUMPY = 2
+BARS_TYPED = 3
 BASE = declarative_base()
 
 
@@ -110,27 +116,118 @@ class SeriesItem:
         session = Session.object_session(self)
         if not start or not end or not resolution or not session:
             return None
+        if output_type == BARS_TYPED and BAR_STORE.path:
+            # the local bar store replaces the bar query and the bar cache
+            self.sync_bar_store(resolution)
+            return BAR_STORE.get_bars(self, resolution, start, end)
+        if output_type == BARS_TYPED:
+            # typed bars are shared with the bar cache
+            bars = BAR_CACHE.get(self, resolution, start, end)
+            if bars is None:
+                bars = self.__get_bar_columns(session, start, end, output_type, resolution)
+                BAR_CACHE.put(self, resolution, start, end, bars)
+            return bars
+        if output_type in (BARS_PANDAS, BARS_NUMPY):
+            return self.__get_bar_columns(session, start, end, output_type, resolution)
         # this must be an query !!!!!!! Do not iterate/filter over self.series
         series = session.query(Series)\
             .filter(Series.stock_id == self.id) \
             .filter(Series.resolution == resolution) \
             .filter(Series.date.between(start, end)).all()
+        return series
+
+    def get_series_state(self, resolution='P1D'):
+        """
+        Returns the date of the newest bar and the amount of bars
+        :param resolution: resolution of series
+        :return: tuple with date or None and amount
+        """
+        session = Session.object_session(self)
+        return tuple(session.execute(
+            select(func.max(Series.date), func.count(Series.id))
+            .where(Series.stock_id == self.id)
+            .where(Series.resolution == resolution)).one())
+
+    def sync_bar_store(self, resolution='P1D', series_state=None):
+        """
+        Updates the local bar store if its newest bar or its amount of bars differs from
+        the database
+        :param resolution: resolution of series
+        :param series_state: tuple from get_series_state or None to load it
+        :return: amount of stored bars
+        """
+        if series_state is None:
+            series_state = self.get_series_state(resolution)
+        if BAR_STORE.get_state(self, resolution) == tuple(series_state):
+            return 0
+        return self.update_bar_store(resolution)
+
+    def update_bar_store(self, resolution='P1D'):
+        """
+        Appends the series after the last stored bar to the local bar store. All series of
+        the resolution are stored again if the store has no files or if the database has
+        another amount of bars up to the last stored bar, i.e. after a backfill.
+        :param resolution: resolution of series
+        :return: amount of stored bars
+        """
+        session = Session.object_session(self)
+        query = self.__select_bars(resolution)
+        state = BAR_STORE.get_state(self, resolution)
+        if state is not None and state[0] is not None:
+            count = session.execute(
+                select(func.count(Series.id))
+                .where(Series.stock_id == self.id)
+                .where(Series.resolution == resolution)
+                .where(Series.date <= state[0])).scalar()
+            if count == state[1]:
+                rows = session.execute(query.where(Series.date > state[0])).all()
+                return BAR_STORE.append(self, resolution, self.__rows_to_bars(rows))
+        rows = session.execute(query).all()
+        return BAR_STORE.write(self, resolution, self.__rows_to_bars(rows))
+
+    def __select_bars(self, resolution):
+        """
+        Builds the core select of the bar columns ordered by date
+        :param resolution: resolution of series
+        :return: select statement
+        """
+        return select(Series.priceclose, Series.priceopen, Series.volume, Series.pricehigh,
+                      Series.pricelow, Series.date)\
+            .where(Series.stock_id == self.id)\
+            .where(Series.resolution == resolution)\
+            .order_by(Series.date)
+
+    @staticmethod
+    def __rows_to_bars(rows):
+        """
+        Converts rows of the bar columns to typed bars
+        :param rows: rows with close, open, volume, high, low and date
+        :return: typed bars
+        """
+        columns = list(zip(*rows)) if rows else [()] * 6
+        return Bars(*[np.array(column, dtype='float64') for column in columns[:5]],
+                    np.array(columns[5], dtype='datetime64[ns]'))
+
+    def __get_bar_columns(self, session, start, end, output_type, resolution):
+        """
+        Loads the bar columns with a core select, so no ORM objects are built
+        :param session: database session
+        :param start: first date
+        :param end: last date
+        :param output_type: BARS_PANDAS, BARS_NUMPY or BARS_TYPED
+        :param resolution: resolution of series
+        :return: bars in output type
+        """
+        rows = session.execute(
+            self.__select_bars(resolution).where(Series.date.between(start, end))).all()
         if output_type == BARS_PANDAS:
-            data_frame = pd.DataFrame([[i.priceclose, i.priceopen, i.volume, i.pricehigh,
-                                        i.pricelow, i.date
-                                        ] for i in series], columns=['Close', 'Open', 'Volume',
-                                                                     'High', 'Low', 'Date'])
+            data_frame = pd.DataFrame([tuple(row) for row in rows],
+                                      columns=['Close', 'Open', 'Volume', 'High', 'Low', 'Date'])
             data_frame = data_frame.set_index(pd.DatetimeIndex(data_frame['Date'].dt.date))
             return data_frame
-        elif output_type == BARS_NUMPY:
-            return np.asarray([[i.priceclose,
-                                i.priceopen,
-                                i.volume,
-                                i.pricehigh,
-                                i.pricelow,
-                                i.date
-                               ] for i in series])
-        return series
+        if output_type == BARS_NUMPY:
+            return np.asarray([tuple(row) for row in rows])
+        return self.__rows_to_bars(rows)
 
 
 class Index(BASE, SeriesItem):
@@ -308,6 +405,15 @@ class Signal(BASE):
     name = Column(String(40), nullable=False)
     info = Column(String(80))
     status = Column(Integer, nullable=False)
+    # best arguments after the optimum as list of dictionaries with profit, parameters, status
+    runner_ups = Column(JSON)
+    # true if the time budget stopped the optimizer before all arguments were scored
+    truncated = Column(Boolean, default=False)
+    # date of the newest bar and amount of bars of the stock when the signal was built
+    series_date = Column(DateTime)
+    series_count = Column(Integer)
+    # token of the build that inserted the signal
+    build_token = Column(String(32), index=True)
     stock_id = Column(Integer, ForeignKey('stock.id'))
     stock = relationship("Stock", backref="signal")
 
@@ -41,9 +41,9 @@ class AdxFilter(BaseFilter):
 
     def analyse(self):
 
-        close = self.bars[:, 0].copy(order='C').astype('float64')
-        high = self.bars[:, 3].copy(order='C').astype('float64')
-        low = self.bars[:, 4].copy(order='C').astype('float64')
+        close = np.ascontiguousarray(self.bars[:, 0], dtype='float64')
+        high = np.ascontiguousarray(self.bars[:, 3], dtype='float64')
+        low = np.ascontiguousarray(self.bars[:, 4], dtype='float64')
         if not (close.size + 2 - 2 * self.parameter > 0):
             raise RuntimeError
         my_result = ti.adx(high, low, close, self.parameter)
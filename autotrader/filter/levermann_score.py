@@ -20,7 +20,8 @@ from datetime import date, datetime
 import numpy as np
 from dateutil.relativedelta import relativedelta
 from autotrader.filter.base_filter import BaseFilter
-from autotrader.datasource.database.stock_schema import BARS_NUMPY
+from autotrader.datasource.bars import to_datetime
+from autotrader.datasource.database.stock_schema import BARS_TYPED
 from autotrader.filter.stock_is_hot import StockIsHot as Sih
 
 
@@ -40,17 +41,17 @@ class LevermannScore(BaseFilter):
         self.index_bars = None
         if self.bars is not None:
             self.index_bars = self.stock.indices[0].get_bars(
-                start=self.bars[:, 5][0],
-                end=self.bars[:, 5][-1],
-                output_type=BARS_NUMPY
+                start=to_datetime(self.bars[:, 5][0]),
+                end=to_datetime(self.bars[:, 5][-1]),
+                output_type=BARS_TYPED
             ) if self.stock is not None else None
 
     def set_stock(self, stock):
         self.stock = stock
         self.index_bars = self.stock.indices[0].get_bars(
-            start=self.bars[:, 5][0],
-            end=self.bars[:, 5][-1],
-            output_type=BARS_NUMPY) if stock is not None else None
+            start=to_datetime(self.bars[:, 5][0]),
+            end=to_datetime(self.bars[:, 5][-1]),
+            output_type=BARS_TYPED) if stock is not None else None
 
     @staticmethod
     def calculate_trendsrating(datas):
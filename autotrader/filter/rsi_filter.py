@@ -41,7 +41,7 @@ class RsiFilter(BaseFilter):
 
     def analyse(self):
 
-        close = self.bars[:, 0].copy(order='C').astype('float64')
+        close = np.ascontiguousarray(self.bars[:, 0], dtype='float64')
         if not (close.size - self.parameter > 0):
             raise RuntimeError
         my_result = ti.rsi(close, self.parameter)
@@ -19,9 +19,10 @@ import logging
 
 import matplotlib.pyplot as plt
 import numpy as np
-import tulipy as ti
 
 from autotrader.indicators.base_indicator import BaseIndicator
+from autotrader.indicators.parameter_space import ParameterSpace, Dimension
+from autotrader.indicators.score_kernels import score_cross, get_backtest_values
 
 
 class EmaCrossSignal(BaseIndicator):
@@ -51,6 +52,11 @@ class EmaCrossSignal(BaseIndicator):
         'plot_result': False
     }
 
+    PARAMETER_SPACE = ParameterSpace(
+        [Dimension('short_window', 5), Dimension('long_window', 5)],
+        [('short_window', '<', 'long_window')]
+    )
+
     def __init__(self, argument: dict, logger: logging.Logger):
         super(EmaCrossSignal, self).__init__(argument, logger)
         self.strategy_value = {
@@ -67,9 +73,12 @@ class EmaCrossSignal(BaseIndicator):
         self.strategy_value['short_window'] = parameters[0]
         self.strategy_value['long_window'] = parameters[1]
 
+    def prepare_primitives(self, parameters):
+        self.preload_moving_averages('ema', 'open', parameters[:, :2])
+
     def get_indicators(self):
-        short_ema = ti.ema(self.open, int(self.strategy_value['short_window']))
-        long_ema = ti.ema(self.open, int(self.strategy_value['long_window']))
+        short_ema = self.get_primitive('ema', ('open',), int(self.strategy_value['short_window']))
+        long_ema = self.get_primitive('ema', ('open',), int(self.strategy_value['long_window']))
         return short_ema, long_ema
 
     def generate_signals(self):
@@ -87,6 +96,11 @@ class EmaCrossSignal(BaseIndicator):
             self.plot([self.times, self.close, self.open, short_ema, long_ema])
         return self.signal
 
+    def score(self, arguments):
+        short_ema, long_ema = self.get_indicators()
+        return score_cross(self.open, short_ema, long_ema, self.signal_shift,
+                           *get_backtest_values(arguments))
+
     def plot(self, graphs):
         openp = graphs[2]
         times = graphs[0]
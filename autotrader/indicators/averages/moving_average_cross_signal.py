@@ -18,8 +18,9 @@
 import logging
 import matplotlib.pyplot as plt
 import numpy as np
-import tulipy as ti
 from autotrader.indicators.base_indicator import BaseIndicator
+from autotrader.indicators.parameter_space import ParameterSpace, Dimension
+from autotrader.indicators.score_kernels import score_cross, get_backtest_values
 
 
 class MovingAverageCrossSignal(BaseIndicator):
@@ -49,6 +50,11 @@ class MovingAverageCrossSignal(BaseIndicator):
         'plot_result': False
     }
 
+    PARAMETER_SPACE = ParameterSpace(
+        [Dimension('short_window', 5), Dimension('long_window', 5)],
+        [('short_window', '<', 'long_window')]
+    )
+
     def __init__(self, argument: dict, logger: logging.Logger):
         super(MovingAverageCrossSignal, self).__init__(argument, logger)
         self.strategy_value = {
@@ -65,9 +71,12 @@ class MovingAverageCrossSignal(BaseIndicator):
         self.strategy_value['short_window'] = parameters[0]
         self.strategy_value['long_window'] = parameters[1]
 
+    def prepare_primitives(self, parameters):
+        self.preload_moving_averages('sma', 'open', parameters[:, :2])
+
     def get_indicators(self):
-        short_mavg = ti.sma(self.open, int(self.strategy_value['short_window']))
-        long_mavg = ti.sma(self.open, int(self.strategy_value['long_window']))
+        short_mavg = self.get_primitive('sma', ('open',), int(self.strategy_value['short_window']))
+        long_mavg = self.get_primitive('sma', ('open',), int(self.strategy_value['long_window']))
         return short_mavg, long_mavg
 
     def generate_signals(self):
@@ -89,6 +98,14 @@ class MovingAverageCrossSignal(BaseIndicator):
             self.plot([self.times, self.close, self.open, short_mavg, long_mavg])
         return self.signal
 
+    def score(self, arguments):
+        long_window = int(self.strategy_value['long_window'])
+        short_window = int(self.strategy_value['short_window'])
+        short_mavg, long_mavg = self.get_indicators()
+        self.signal_shift = long_window - 1
+        return score_cross(self.open, short_mavg[long_window - short_window:], long_mavg,
+                           self.signal_shift, *get_backtest_values(arguments))
+
     def plot(self, graphs):
         long_window = self.strategy_value['long_window']
         short_window = self.strategy_value['short_window']
@@ -18,8 +18,9 @@
 import logging
 import matplotlib.pyplot as plt
 import numpy as np
-import tulipy as ti
 from autotrader.indicators.base_indicator import BaseIndicator
+from autotrader.indicators.parameter_space import ParameterSpace, Dimension
+from autotrader.indicators.score_kernels import score_triple, get_backtest_values
 
 
 class TripleMovingAverageCrossSignal(BaseIndicator):
@@ -55,6 +56,11 @@ class TripleMovingAverageCrossSignal(BaseIndicator):
         'plot_result': False
     }
 
+    PARAMETER_SPACE = ParameterSpace(
+        [Dimension('short_window', 5), Dimension('medium_window', 5), Dimension('long_window', 5)],
+        [('short_window', '<', 'medium_window'), ('medium_window', '<', 'long_window')]
+    )
+
     def __init__(self, argument: dict, logger: logging.Logger):
         super(TripleMovingAverageCrossSignal, self).__init__(argument, logger)
         self.strategy_value = {
@@ -73,10 +79,16 @@ class TripleMovingAverageCrossSignal(BaseIndicator):
         self.strategy_value['medium_window'] = parameters[1]
         self.strategy_value['long_window'] = parameters[2]
 
+    def prepare_primitives(self, parameters):
+        self.preload_moving_averages('sma', 'open', parameters[:, :3])
+
     def get_indicators(self):
-        short_mavg = ti.sma(self.open, int(self.strategy_value['short_window']))
-        medium_mavg = ti.sma(self.open, int(self.strategy_value['medium_window']))
-        long = ti.sma(self.open, int(self.strategy_value['long_window']))
+        short_window = int(self.strategy_value['short_window'])
+        medium_window = int(self.strategy_value['medium_window'])
+        long_window = int(self.strategy_value['long_window'])
+        short_mavg = self.get_primitive('sma', ('open',), short_window)
+        medium_mavg = self.get_primitive('sma', ('open',), medium_window)
+        long = self.get_primitive('sma', ('open',), long_window)
         return short_mavg, medium_mavg, long
 
     def generate_signals(self):
@@ -102,6 +114,16 @@ class TripleMovingAverageCrossSignal(BaseIndicator):
             self.plot([self.times, self.close, self.open, medium, short, long])
         return self.signal
 
+    def score(self, arguments):
+        long_window = int(self.strategy_value['long_window'])
+        medium_window = int(self.strategy_value['medium_window'])
+        short_window = int(self.strategy_value['short_window'])
+        short_mavg, medium_mavg, long = self.get_indicators()
+        self.signal_shift = long_window - 1
+        return score_triple(self.open, short_mavg[long_window - short_window:],
+                            medium_mavg[long_window - medium_window:], long,
+                            self.signal_shift, *get_backtest_values(arguments))
+
     def plot(self, graphs):
         shift = self.signal_shift
         price_open = graphs[2]
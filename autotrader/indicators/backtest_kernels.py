@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+from numba import jit
+import numpy as np
+
+from autotrader.indicators.base_indicator import BaseIndicator
+
+# numba can only call the jitted status function by a global name
+get_status = BaseIndicator.get_status
+NO_SIGNAL = BaseIndicator.NO_SIGNAL
+
+
+@jit(nopython=True, nogil=True)
+def backtest_step(signal_value, price, wallet, portfolio, position, commission_rate,
+                  commission_rate_prc):
+    """
+    Executes the trade of one signal value
+    :param signal_value: buy (1), sell (-1) or hold (0)
+    :param price: trade price
+    :param wallet: cash before the trade
+    :param portfolio: invested capital before the trade
+    :param position: amount of shares before the trade
+    :param commission_rate: fixed commission per trade
+    :param commission_rate_prc: commission in percent of trade volume
+    :return: wallet, portfolio and position after the trade
+    """
+    if signal_value == 1:
+        position = int(wallet / price)
+        wallet -= price * position * (1 + commission_rate_prc) - commission_rate
+        portfolio += price * position
+    if signal_value == -1:
+        wallet += price * position * (1 - commission_rate_prc) - commission_rate
+        portfolio = 0.
+        position = 0
+    return wallet, portfolio, position
+
+
+@jit(nopython=True, nogil=True)
+def backtest_equity_curve(price, signal, signal_shift, initial_capital, commission_rate,
+                          commission_rate_prc):
+    """
+    Calculates the portfolio value over time in a single pass
+    :param price: open prices
+    :param signal: signal with buy (1), sell (-1) and hold (0)
+    :param signal_shift: index of price that belongs to first signal value
+    :param initial_capital: cash at start
+    :param commission_rate: fixed commission per trade
+    :param commission_rate_prc: commission in percent of trade volume
+    :return: portfolio value for each signal value
+    """
+    total = np.empty(signal.shape[0])
+    wallet = initial_capital
+    portfolio = 0.
+    position = 0
+    for index in range(signal.shape[0]):
+        wallet, portfolio, position = backtest_step(signal[index], price[index + signal_shift],
+                                                    wallet, portfolio, position,
+                                                    commission_rate, commission_rate_prc)
+        total[index] = portfolio + wallet
+    return total
+
+
+@jit(nopython=True, nogil=True)
+def backtest_final_value(price, signal, signal_shift, initial_capital, commission_rate,
+                         commission_rate_prc):
+    """
+    Calculates the portfolio value at the end of the signal without the equity curve
+    :param price: open prices
+    :param signal: signal with buy (1), sell (-1) and hold (0)
+    :param signal_shift: index of price that belongs to first signal value
+    :param initial_capital: cash at start
+    :param commission_rate: fixed commission per trade
+    :param commission_rate_prc: commission in percent of trade volume
+    :return: last portfolio value
+    """
+    wallet = initial_capital
+    portfolio = 0.
+    position = 0
+    for index in range(signal.shape[0]):
+        wallet, portfolio, position = backtest_step(signal[index], price[index + signal_shift],
+                                                    wallet, portfolio, position,
+                                                    commission_rate, commission_rate_prc)
+    return portfolio + wallet
+
+
+@jit(nopython=True, nogil=True)
+def backtest_matrix(price, signals, signal_shifts, valid, initial_capital, commission_rate,
+                    commission_rate_prc):
+    """
+    Calculates profit and status for a signal matrix with one parameter set per row. The rows
+    are aligned to price and the signal of a row starts at its signal shift.
+    :param price: open prices
+    :param signals: signal matrix with buy (1), sell (-1) and hold (0)
+    :param signal_shifts: start index of the signal in each row
+    :param valid: mask of rows to calculate
+    :param initial_capital: cash at start
+    :param commission_rate: fixed commission per trade
+    :param commission_rate_prc: commission in percent of trade volume
+    :return: profit and status of each row
+    """
+    profits = np.full(signals.shape[0], np.nan)
+    status_codes = np.full(signals.shape[0], NO_SIGNAL)
+    for row in range(signals.shape[0]):
+        if not valid[row]:
+            continue
+        wallet = initial_capital
+        portfolio = 0.
+        position = 0
+        for index in range(signal_shifts[row], signals.shape[1]):
+            wallet, portfolio, position = backtest_step(signals[row, index], price[index],
+                                                        wallet, portfolio, position,
+                                                        commission_rate, commission_rate_prc)
+        profits[row] = (portfolio + wallet) / initial_capital - 1
+        status_codes[row] = get_status(signals[row, signal_shifts[row]:])
+    return profits, status_codes
@@ -15,16 +15,21 @@
  See the License for the specific language governing permissions and
  limitations under the License.
 """
+import copy
 import json
 import logging
 import sys
 
 from numba import jit
 import numpy as np
+import tulipy as ti
 import zlib
 import base64
 
 from autotrader.base.trader_base import TraderBase
+from autotrader.datasource.bars import Bars, to_datetime64
+from autotrader.indicators.moving_average_bank import BANKS, get_bank_row
+from autotrader.indicators.primitive_cache import PrimitiveCache
 
 
 class BaseIndicator:
@@ -36,6 +41,8 @@ class BaseIndicator:
     BUY = 1
     HOLD = 0
     NO_SIGNAL = 10
+    # parameter space of the optimizer. See autotrader.indicators.parameter_space
+    PARAMETER_SPACE = None
 
     def __init__(self, argument, logger: logging.Logger):
         self.close = None
@@ -54,6 +61,7 @@ class BaseIndicator:
         self.status = 0
         self.signal_shift = 0
         self.param_count = 0
+        self.primitives = PrimitiveCache()
         if argument is not None:
             self.symbol = argument['symbol']
             self.set_bars(argument['bars'])
@@ -75,6 +83,63 @@ class BaseIndicator:
         """
         raise NotImplementedError
 
+    def generate_signal_matrix(self, parameters):
+        """
+        Generate the signals for a block of parameters. Each row is aligned to the bars and
+        padded with zeros in front of the signal shift.
+        :param parameters: 2-D integer array with one parameter set per row
+        :return: signal matrix, signal shift of each row and mask of valid rows
+        """
+        self.prepare_primitives(parameters)
+        size = self.open.size
+        signals = np.zeros((parameters.shape[0], size), dtype='int8')
+        signal_shifts = np.full(parameters.shape[0], size, dtype='int64')
+        valid = np.zeros(parameters.shape[0], dtype='bool')
+        for idx, parameter in enumerate(parameters):
+            try:
+                self.set_parameters(tuple(parameter.tolist()))
+                signal = self.generate_signals()
+            except ValueError:
+                self.logger.debug("Arguments %s causes errors", parameter)
+                continue
+            signal_shifts[idx] = size - signal.size
+            signals[idx, signal_shifts[idx]:] = signal
+            valid[idx] = True
+        return signals, signal_shifts, valid
+
+    def score(self, arguments):
+        """
+        Calculates profit and status of the current parameters with a compiled kernel that
+        does not build the signal. Strategies without such a kernel return None.
+        :param arguments: back test arguments
+        :return: profit and status or None
+        """
+        return None
+
+    def clone(self):
+        """
+        Creates a strategy with own parameters that shares bars and primitives with this
+        strategy. Used to score parameters on several threads.
+        :return: strategy object
+        """
+        strategy = copy.copy(self)
+        if hasattr(self, 'strategy_value'):
+            strategy.strategy_value = dict(self.strategy_value)
+        strategy.signal = None
+        return strategy
+
+    def get_window(self, size):
+        """
+        Creates a strategy that only knows the last bars of this strategy
+        :param size: amount of bars
+        :return: strategy object with own primitives
+        """
+        strategy = self.clone()
+        strategy.primitives = PrimitiveCache()
+        for column in ('close', 'open', 'volume', 'high', 'low', 'times'):
+            setattr(strategy, column, getattr(self, column)[-size:])
+        return strategy
+
     def plot(self, graphs: list):
         """
         Plot strategy results
@@ -97,13 +162,23 @@ class BaseIndicator:
         :param bars:
         :return:
         """
-        if bars is not None and hasattr(bars, 'shape') and len(bars.shape) >= 2 and bars.shape[1] == 6:
+        if isinstance(bars, Bars):
+            # typed bars are already float64 arrays and are shared without copies
+            self.close = bars.close
+            self.open = bars.open
+            self.volume = bars.volume
+            self.high = bars.high
+            self.low = bars.low
+            self.times = bars.times
+            self.primitives.clear()
+        elif bars is not None and hasattr(bars, 'shape') and len(bars.shape) >= 2 and bars.shape[1] == 6:
             self.close = bars[:, 0].copy(order='C').astype('float64')
             self.open = bars[:, 1].copy(order='C').astype('float64')
             self.volume = bars[:, 2].copy(order='C').astype('float64')
             self.high = bars[:, 3].copy(order='C').astype('float64')
             self.low = bars[:, 4].copy(order='C').astype('float64')
             self.times = bars[:, 5].copy(order='C')
+            self.primitives.clear()
 
     def append_value_to_bars(self, price):
         """
@@ -117,19 +192,66 @@ class BaseIndicator:
             self.volume = np.append(self.volume, price.volume)
             self.high = np.append(self.high, price.pricehigh)
             self.low = np.append(self.low, price.pricelow)
-            self.times = np.append(self.times, price.date)
+            if self.times.dtype.kind == 'M':
+                self.times = np.append(self.times, to_datetime64(price.date))
+            else:
+                self.times = np.append(self.times, price.date)
+            self.primitives.clear()
+
+    def get_primitive(self, primitive, inputs, *options):
+        """
+        Returns the memoized result of a tulipy function for the bars of the strategy.
+        Every distinct primitive is calculated once per bar set.
+        :param primitive: name of tulipy function i.e. 'sma'
+        :param inputs: tuple with names of bar columns i.e. ('open',)
+        :param options: options of tulipy function i.e. the period
+        :return: result of tulipy function
+        """
+        return self.primitives.get((primitive, inputs) + options, self.__calc_primitive,
+                                   primitive, inputs, options)
+
+    def __calc_primitive(self, primitive, inputs, options):
+        return getattr(ti, primitive)(*[getattr(self, column) for column in inputs], *options)
+
+    def prepare_primitives(self, parameters):
+        """
+        Precalculates the building blocks for a block of parameters before the signals are
+        generated. Strategies with moving averages override it.
+        :param parameters: 2-D integer array with one parameter set per row
+        :return: nothing
+        """
+        pass
+
+    def preload_moving_averages(self, primitive, column, windows):
+        """
+        Calculates the moving averages of a bar column for many windows in one pass and
+        stores them in the primitive cache. Windows tulipy would reject are left out.
+        :param primitive: 'sma' or 'ema'
+        :param column: name of bar column i.e. 'open'
+        :param windows: array with windows
+        :return: nothing
+        """
+        values = getattr(self, column)
+        windows = [int(window) for window in np.unique(windows)
+                   if 1 <= window <= values.size and
+                   (primitive, (column,), int(window)) not in self.primitives]
+        if not windows:
+            return
+        bank = BANKS[primitive](values, np.asarray(windows, dtype='int64'))
+        for row, window in enumerate(windows):
+            self.primitives.put((primitive, (column,), window),
+                                get_bank_row(primitive, bank, row, window))
 
     def get_plot(self):
         """
         Generate plot data for highcharts
         :return: json series string
         """
-        tz = TraderBase.get_timezone()
+        timestamps = self.get_timestamps()
         series_list = [
             {
                 "name": "Price",
-                "data": [[int(self.times[idx].replace(tzinfo=tz).timestamp()) * 1000, x]
-                         for idx, x in enumerate(self.open)],
+                "data": [[timestamps[idx], x] for idx, x in enumerate(self.open)],
                 "id": 'dataseries'
             },
             {
@@ -143,7 +265,7 @@ class BaseIndicator:
         # we have to generate the siganl again
         signal = self.generate_signals()
         for idx, val in enumerate(signal):
-            timestamp = int(self.times[idx + self.signal_shift].replace(tzinfo=tz).timestamp()) * 1000
+            timestamp = timestamps[idx + self.signal_shift]
             if val == 1:
                 series_list[1]["data"].append(
                     {
@@ -177,8 +299,7 @@ class BaseIndicator:
             data_shift = len(series_list[0]["data"]) - val.size
             indicator_values = [None for _ in range(data_shift)]
             for idx2, val2 in enumerate(val):
-                timestamp = int(self.times[idx2 + data_shift].replace(tzinfo=tz).timestamp()) * 1000
-                indicator_values.append([timestamp, val2])
+                indicator_values.append([timestamps[idx2 + data_shift], val2])
             series_list.append(
                 {
                     "yAxis": 1,
@@ -195,6 +316,17 @@ class BaseIndicator:
         self.logger.debug(debug_msg)
         return my_pack_str
 
+    def get_timestamps(self):
+        """
+        Converts the times of the bars to timestamps of highcharts
+        :return: list with milliseconds since epoch
+        """
+        tz = TraderBase.get_timezone()
+        times = self.times
+        if times.dtype.kind == 'M':
+            times = times.astype('datetime64[us]').astype('object')
+        return [int(time.replace(tzinfo=tz).timestamp()) * 1000 for time in times]
+
     def has_bars(self):
         """
         Checks for existing bars
@@ -264,6 +396,7 @@ class BaseIndicator:
         return signal
 
     @staticmethod
+    @jit(nopython=True)
     def set_signal_osc(signal):
         """
         numba optimized function to create standard signal for oscillator signals
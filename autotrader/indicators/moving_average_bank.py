@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import numpy as np
+from numba import jit
+
+
+@jit(nopython=True, nogil=True)
+def sma_bank(values, windows):
+    """
+    Calculates the simple moving averages for many windows in one call. Each row is aligned to
+    values and starts at index window - 1 like ti.sma. The values in front are nan.
+    The running sum is the same as in tulipy so the rows are equal to ti.sma.
+    :param values: prices
+    :param windows: integer array with windows
+    :return: matrix with one moving average per window
+    """
+    size = values.shape[0]
+    bank = np.full((windows.shape[0], size), np.nan)
+    for row in range(windows.shape[0]):
+        period = windows[row]
+        if period < 1 or period > size:
+            continue
+        scale = 1.0 / period
+        total = 0.
+        for index in range(period):
+            total += values[index]
+        bank[row, period - 1] = total * scale
+        for index in range(period, size):
+            total += values[index]
+            total -= values[index - period]
+            bank[row, index] = total * scale
+    return bank
+
+
+@jit(nopython=True, nogil=True)
+def ema_bank(values, windows):
+    """
+    Calculates the exponential moving averages for many windows in one pass over the prices.
+    Each row has the full length of values like ti.ema and uses the same recurrence.
+    :param values: prices
+    :param windows: integer array with windows
+    :return: matrix with one moving average per window
+    """
+    size = values.shape[0]
+    bank = np.empty((windows.shape[0], size))
+    factors = np.empty(windows.shape[0])
+    if size == 0:
+        return bank
+    for row in range(windows.shape[0]):
+        factors[row] = 2 / (float(windows[row]) + 1)
+        bank[row, 0] = values[0]
+    for index in range(1, size):
+        for row in range(windows.shape[0]):
+            previous = bank[row, index - 1]
+            bank[row, index] = (values[index] - previous) * factors[row] + previous
+    return bank
+
+
+BANKS = {
+    'sma': sma_bank,
+    'ema': ema_bank,
+}
+
+
+def get_bank_row(primitive, bank, row, window):
+    """
+    Slices a row of a bank to the shape of the tulipy result
+    :param primitive: 'sma' or 'ema'
+    :param bank: result of sma_bank or ema_bank
+    :param row: row of window
+    :param window: window of moving average
+    :return: moving average
+    """
+    if primitive == 'sma':
+        return bank[row, window - 1:]
+    return bank[row]
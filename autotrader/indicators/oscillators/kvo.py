@@ -22,6 +22,8 @@ import numpy as np
 import tulipy as ti
 
 from autotrader.indicators.base_indicator import BaseIndicator
+from autotrader.indicators.parameter_space import ParameterSpace, Dimension
+from autotrader.indicators.score_kernels import score_osc_cross, get_backtest_values
 
 
 class Kvo(BaseIndicator):
@@ -43,6 +45,11 @@ class Kvo(BaseIndicator):
         'plot_result': False
     }
 
+    PARAMETER_SPACE = ParameterSpace(
+        [Dimension('short_window', 5), Dimension('long_window', 5), Dimension('signal_window', 5)],
+        [('short_window', '<', 'long_window'), ('long_window', '<', 'signal_window')]
+    )
+
     def __init__(self, arguments: dict, logger: logging.Logger):
         super(Kvo, self).__init__(arguments, logger)
         self.strategy_value = {
@@ -67,7 +74,8 @@ class Kvo(BaseIndicator):
         short_window = int(self.strategy_value['short_window'])
         long_window = int(self.strategy_value['long_window'])
         signal_window = int(self.strategy_value['signal_window'])
-        kvo = ti.kvo(self.high, self.low, self.close, self.volume, short_window, long_window)
+        kvo = self.get_primitive('kvo', ('high', 'low', 'close', 'volume'),
+                                 short_window, long_window)
         return kvo, ti.ema(kvo, signal_window)
 
     def generate_signals(self):
@@ -83,6 +91,12 @@ class Kvo(BaseIndicator):
             self.plot([self.times, self.close, kvo, kvo_signal])
         return self.signal
 
+    def score(self, arguments):
+        kvo, kvo_signal = self.get_indicators()
+        self.signal_shift = 1
+        return score_osc_cross(self.open, kvo, kvo_signal, self.signal_shift,
+                               *get_backtest_values(arguments))
+
     def plot(self, graphs):
         times = graphs[0]
         close = graphs[1]
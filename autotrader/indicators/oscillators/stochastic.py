@@ -19,9 +19,12 @@ import logging
 
 import matplotlib.pyplot as plt
 import numpy as np
-import tulipy as ti
+from numba import jit
 
 from autotrader.indicators.base_indicator import BaseIndicator
+from autotrader.indicators.parameter_space import ParameterSpace, Dimension
+from autotrader.indicators.rolling_extrema import raw_stochastic_bank
+from autotrader.indicators.score_kernels import score_band, get_backtest_values
 
 
 class Stochastic(BaseIndicator):
@@ -43,6 +46,11 @@ class Stochastic(BaseIndicator):
         'plot_result': False
     }
 
+    PARAMETER_SPACE = ParameterSpace(
+        [Dimension('d_period', 3), Dimension('slowing_period', 3), Dimension('period', 3)],
+        [('d_period', '<=', 'slowing_period')]
+    )
+
     def __init__(self, arguments: dict, logger: logging.Logger):
         super(Stochastic, self).__init__(arguments, logger)
         self.mode = 1
@@ -75,11 +83,73 @@ class Stochastic(BaseIndicator):
             'd_period': parameters[0],
         }
 
+    def prepare_primitives(self, parameters):
+        periods = [int(period) for period in np.unique(parameters[:, 2])
+                   if period >= 1 and self.get_raw_key(period) not in self.primitives]
+        if not periods:
+            return
+        raw_bank = raw_stochastic_bank(self.high, self.low, self.close,
+                                       np.asarray(periods, dtype='int64'))
+        for row, period in enumerate(periods):
+            self.primitives.put(self.get_raw_key(period), raw_bank[row])
+
+    @staticmethod
+    def get_raw_key(period):
+        """
+        Returns the key of the fast %K in the primitive cache
+        :param period: %K period
+        :return: key
+        """
+        return 'stoch_raw', ('high', 'low', 'close'), int(period)
+
     def get_indicators(self):
         period = int(self.strategy_value['period'])
         slowing = int(self.strategy_value['slowing_period'])
         d_period = int(self.strategy_value['d_period'])
-        stoch_k, stoch_d = ti.stoch(self.high, self.low, self.close, period, slowing, d_period)
+        if period < 1 or slowing < 1 or d_period < 1 or \
+                period + slowing + d_period - 3 >= self.close.size:
+            raise ValueError("Invalid stochastic periods")
+        # the fast %K only depends on the period and is shared by all slowing and d periods
+        raw = self.primitives.get(self.get_raw_key(period), self.__calc_raw, period)
+        return Stochastic.smooth(raw, period, slowing, d_period)
+
+    def __calc_raw(self, period):
+        return raw_stochastic_bank(self.high, self.low, self.close,
+                                   np.asarray([period], dtype='int64'))[0]
+
+    @staticmethod
+    @jit(nopython=True, nogil=True)
+    def smooth(raw, period, slowing, d_period):
+        """
+        numba optimized function to smooth the fast %K like ti.stoch
+        :param raw: fast %K
+        :param period: %K period
+        :param slowing: slowing period
+        :param d_period: %D period
+        :return: %K and %D
+        """
+        start = period - 1 + slowing - 1
+        output_start = start + d_period - 1
+        k_scale = 1.0 / slowing
+        d_scale = 1.0 / d_period
+        stoch = np.empty(raw.shape[0])
+        stoch_k = np.empty(raw.shape[0] - output_start)
+        stoch_d = np.empty(raw.shape[0] - output_start)
+        k_sum = 0.
+        d_sum = 0.
+        for index in range(raw.shape[0]):
+            if index >= slowing:
+                k_sum -= raw[index - slowing]
+            k_sum += raw[index]
+            if index < start:
+                continue
+            stoch[index] = k_sum * k_scale
+            if index - start >= d_period:
+                d_sum -= stoch[index - d_period]
+            d_sum += stoch[index]
+            if index >= output_start:
+                stoch_k[index - output_start] = stoch[index]
+                stoch_d[index - output_start] = d_sum * d_scale
         return stoch_k, stoch_d
 
     def generate_signals(self):
@@ -112,6 +182,21 @@ class Stochastic(BaseIndicator):
             self.plot([self.times, self.close, stoch_k, stoch_d])
         return self.signal
 
+    def score(self, arguments):
+        stoch_k, stoch_d = self.get_indicators()
+        if self.mode == 1:
+            first, second = stoch_d, stoch_d
+        elif self.mode == 2:
+            first, second = stoch_k, stoch_k
+        elif self.mode == 3:
+            first, second = stoch_d, stoch_k
+        else:
+            return None
+        self.signal_shift = abs(len(self.times) - len(stoch_d))
+        return score_band(self.open, first, second, float(self.upper_threshold),
+                          float(self.lower_threshold), self.signal_shift,
+                          *get_backtest_values(arguments))
+
     def plot(self, graphs):
         times = graphs[0]
         close = graphs[1]
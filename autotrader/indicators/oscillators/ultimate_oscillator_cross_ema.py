@@ -19,9 +19,10 @@ import logging
 
 import matplotlib.pyplot as plt
 import numpy as np
-import tulipy as ti
 
 from autotrader.indicators.base_indicator import BaseIndicator
+from autotrader.indicators.parameter_space import ParameterSpace, Dimension
+from autotrader.indicators.score_kernels import score_cross, get_backtest_values
 
 
 class UltimateOscillatorCrossEma(BaseIndicator):
@@ -53,6 +54,11 @@ class UltimateOscillatorCrossEma(BaseIndicator):
         'plot_result': False
     }
 
+    PARAMETER_SPACE = ParameterSpace(
+        [Dimension('ema_window_short', 5), Dimension('ema_window_long', 5)],
+        [('ema_window_short', '<', 'ema_window_long')]
+    )
+
     def __init__(self, arguments: dict, logger: logging.Logger):
         super(UltimateOscillatorCrossEma, self).__init__(arguments, logger)
         self.strategy_value = {
@@ -75,22 +81,24 @@ class UltimateOscillatorCrossEma(BaseIndicator):
         self.strategy_value['ema_window_short'] = parameters[0]
         self.strategy_value['ema_window_long'] = parameters[1]
 
+    def prepare_primitives(self, parameters):
+        self.preload_moving_averages('ema', 'close', parameters[:, :2])
+
     def get_indicators(self):
         short_window = int(self.strategy_value['short_window'])
         medium_window = int(self.strategy_value['medium_window'])
         long_window = int(self.strategy_value['long_window'])
         ema_window_short = int(self.strategy_value['ema_window_short'])
         ema_window_long = int(self.strategy_value['ema_window_long'])
-        ultimate = ti.ultosc(
-            self.high,
-            self.low,
-            self.close,
+        ultimate = self.get_primitive(
+            'ultosc',
+            ('high', 'low', 'close'),
             short_window,
             medium_window,
             long_window
         )
-        ema_long = ti.ema(self.close, ema_window_long)
-        ema_short = ti.ema(self.close, ema_window_short)
+        ema_long = self.get_primitive('ema', ('close',), ema_window_long)
+        ema_short = self.get_primitive('ema', ('close',), ema_window_short)
         return ultimate, ema_short, ema_long
 
     def generate_signals(self):
@@ -115,6 +123,14 @@ class UltimateOscillatorCrossEma(BaseIndicator):
             self.plot([self.times, self.close, ema_long, ema_short, ultimate])
         return self.signal
 
+    def score(self, arguments):
+        _, ema_short, ema_long = self.get_indicators()
+        self.signal_shift = int(self.strategy_value['long_window'])
+        # the signal of generate_signals only depends on the ema cross
+        return score_cross(self.open, ema_short[self.signal_shift:],
+                           ema_long[self.signal_shift:], self.signal_shift,
+                           *get_backtest_values(arguments))
+
     def plot(self, graphs):
         times = graphs[0]
         close = graphs[1]
@@ -19,9 +19,9 @@ import logging
 
 import matplotlib.pyplot as plt
 import numpy as np
-import tulipy as ti
 
 from autotrader.indicators.base_indicator import BaseIndicator
+from autotrader.indicators.parameter_space import ParameterSpace, Dimension
 
 
 class UltimateOscillatorCrossMa(BaseIndicator):
@@ -53,6 +53,11 @@ class UltimateOscillatorCrossMa(BaseIndicator):
         'plot_result': False
     }
 
+    PARAMETER_SPACE = ParameterSpace(
+        [Dimension('ma_window_short', 5), Dimension('ma_window_long', 5)],
+        [('ma_window_short', '<', 'ma_window_long')]
+    )
+
     def __init__(self, arguments: dict, logger: logging.Logger):
         super(UltimateOscillatorCrossMa, self).__init__(arguments, logger)
         self.strategy_value = {
@@ -75,22 +80,24 @@ class UltimateOscillatorCrossMa(BaseIndicator):
         self.strategy_value['ma_window_short'] = parameters[0]
         self.strategy_value['ma_window_long'] = parameters[1]
 
+    def prepare_primitives(self, parameters):
+        self.preload_moving_averages('sma', 'open', parameters[:, :2])
+
     def get_indicators(self):
         short_window = int(self.strategy_value['short_window'])
         medium_window = int(self.strategy_value['medium_window'])
         long_window = int(self.strategy_value['long_window'])
         ma_window_short = int(self.strategy_value['ma_window_short'])
         ma_window_long = int(self.strategy_value['ma_window_long'])
-        ultimate = ti.ultosc(
-            self.high,
-            self.low,
-            self.close,
+        ultimate = self.get_primitive(
+            'ultosc',
+            ('high', 'low', 'close'),
             short_window,
             medium_window,
             long_window
         )
-        ma_long = ti.sma(self.open, ma_window_long)
-        ma_short = ti.sma(self.open, ma_window_short)
+        ma_long = self.get_primitive('sma', ('open',), ma_window_long)
+        ma_short = self.get_primitive('sma', ('open',), ma_window_short)
         min_size = min(ma_long.size, ma_short.size, ultimate.size)
         self.signal_shift = self.open.size - min_size
         cut_u = ultimate.size-min_size
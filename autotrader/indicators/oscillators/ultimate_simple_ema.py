@@ -19,9 +19,9 @@ import logging
 
 import matplotlib.pyplot as plt
 import numpy as np
-import tulipy as ti
 
 from autotrader.indicators.base_indicator import BaseIndicator
+from autotrader.indicators.parameter_space import ParameterSpace, Dimension
 
 
 class UltimateSimple(BaseIndicator):
@@ -51,6 +51,11 @@ class UltimateSimple(BaseIndicator):
         'plot_result': False
     }
 
+    PARAMETER_SPACE = ParameterSpace(
+        [Dimension('short_window', 5), Dimension('medium_window', 5), Dimension('long_window', 5)],
+        [('short_window', '<', 'medium_window'), ('medium_window', '<', 'long_window')]
+    )
+
     def __init__(self, arguments: dict, logger: logging.Logger):
         super(UltimateSimple, self).__init__(arguments, logger)
         self.strategy_value = {
@@ -71,19 +76,21 @@ class UltimateSimple(BaseIndicator):
             'long_window': parameters[2],
         }
 
+    def prepare_primitives(self, parameters):
+        self.preload_moving_averages('ema', 'open', parameters[:, 0])
+
     def get_indicators(self):
         short_window = int(self.strategy_value['short_window'])
         medium_window = int(self.strategy_value['medium_window'])
         long_window = int(self.strategy_value['long_window'])
-        ultimate = ti.ultosc(
-            self.high,
-            self.low,
-            self.open,
+        ultimate = self.get_primitive(
+            'ultosc',
+            ('high', 'low', 'open'),
             short_window,
             medium_window,
             long_window
         )
-        ema = ti.ema(self.open, short_window)
+        ema = self.get_primitive('ema', ('open',), short_window)
         return ultimate, ema
 
     def generate_signals(self):
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import hashlib
+
+import numpy as np
+
+
+class Dimension:
+    """
+    One integer parameter of a strategy. The values start at low and end before high.
+    Without high the values end before the half of the look back period.
+    """
+
+    def __init__(self, name, low, high=None, step=1):
+        self.name = name
+        self.low = low
+        self.high = high
+        self.step = step
+
+    def get_values(self, look_back):
+        """
+        Returns the values of the dimension
+        :param look_back: look back period in days
+        :return: integer array
+        """
+        high = self.high if self.high is not None else int(look_back / 2)
+        return np.arange(self.low, high, self.step, dtype='int64')
+
+
+class ParameterSpace:
+    """
+    Declares the parameters of a strategy for the optimizer. The constraints are tuples
+    with two dimension names and an operator between them i.e. ('short', '<', 'long').
+    Only parameter sets that satisfy all constraints are enumerated.
+    """
+
+    OPERATORS = {
+        '<': np.less,
+        '<=': np.less_equal,
+        '>': np.greater,
+        '>=': np.greater_equal
+    }
+
+    def __init__(self, dimensions, constraints=()):
+        self.dimensions = dimensions
+        self.declaration = ([(dimension.name, dimension.low, dimension.high, dimension.step)
+                             for dimension in dimensions], list(constraints))
+        names = [dimension.name for dimension in dimensions]
+        self.constraints = []
+        for left, operator, right in constraints:
+            if operator not in self.OPERATORS:
+                raise ValueError("Unknown operator {}".format(operator))
+            self.constraints.append((names.index(left), self.OPERATORS[operator],
+                                     names.index(right)))
+
+    def get_version(self):
+        """
+        Returns a fingerprint of the declaration. It changes with every dimension or
+        constraint, so stored optimizer results of an old space are not reused.
+        :return: hex string
+        """
+        return hashlib.sha1(repr(self.declaration).encode('utf-8')).hexdigest()[:16]
+
+    def get_grid(self, look_back):
+        """
+        Returns the valid parameter sets for a look back period
+        :param look_back: look back period in days
+        :return: parameter grid
+        """
+        return ParameterGrid(self, [dimension.get_values(look_back)
+                                    for dimension in self.dimensions])
+
+    def is_valid(self, parameters):
+        """
+        Checks the constraints for a block of parameter sets
+        :param parameters: 2-D integer array with one parameter set per row
+        :return: mask of valid rows
+        """
+        valid = np.ones(parameters.shape[0], dtype='bool')
+        for left, operator, right in self.constraints:
+            valid &= operator(parameters[:, left], parameters[:, right])
+        return valid
+
+
+class ParameterGrid:
+    """
+    The valid parameter sets of a parameter space in lexicographic order. The order is the
+    same as in itertools.product or itertools.combinations without the invalid sets.
+    """
+
+    def __init__(self, space, values):
+        self.space = space
+        self.values = values
+
+    def get_blocks(self, batch_size):
+        """
+        Enumerates the valid parameter sets in blocks
+        :param batch_size: maximal amount of rows per block
+        :return: generator of 2-D integer arrays
+        """
+        buffer = np.empty((0, len(self.values)), dtype='int64')
+        for rows in self.__get_slices():
+            buffer = np.concatenate((buffer, rows))
+            while buffer.shape[0] >= batch_size:
+                yield buffer[:batch_size]
+                buffer = buffer[batch_size:]
+        if buffer.shape[0]:
+            yield buffer
+
+    def __get_slices(self, reverse=False):
+        """
+        Builds the valid parameter sets for each value of the first dimension
+        :param reverse: starts with the last value of the first dimension if true
+        :return: generator of 2-D integer arrays
+        """
+        if len(self.values) == 1:
+            rows = self.values[0].reshape(-1, 1)
+            yield rows[self.space.is_valid(rows)]
+            return
+        for first in (self.values[0][::-1] if reverse else self.values[0]):
+            grids = np.meshgrid(np.asarray([first]), *self.values[1:], indexing='ij')
+            rows = np.stack([grid.ravel() for grid in grids], axis=1)
+            yield rows[self.space.is_valid(rows)]
+
+    def get_coarse(self, stride):
+        """
+        Returns a grid with every stride-th value of each dimension
+        :param stride: distance between two values in steps of the dimension
+        :return: parameter grid
+        """
+        return ParameterGrid(self.space, [values[::stride] for values in self.values])
+
+    def get_neighbours(self, rows, radius):
+        """
+        Returns the valid parameter sets around some parameter sets of the grid. The
+        neighbourhood of a parameter set is a cube with radius steps in each dimension.
+        :param rows: 2-D integer array with parameter sets of the grid
+        :param radius: distance to the border of the cube in steps of the dimension
+        :return: 2-D integer array with unique parameter sets in lexicographic order
+        """
+        offsets = np.meshgrid(*[np.arange(-radius, radius + 1)] * len(self.values), indexing='ij')
+        offsets = np.stack([offset.ravel() for offset in offsets], axis=1)
+        indices = np.stack([np.searchsorted(values, rows[:, dim])
+                            for dim, values in enumerate(self.values)], axis=1)
+        indices = (indices[:, np.newaxis, :] + offsets[np.newaxis, :, :]).reshape(
+            -1, offsets.shape[1])
+        sizes = np.asarray([values.size for values in self.values])
+        indices = np.unique(indices[((indices >= 0) & (indices < sizes)).all(axis=1)], axis=0)
+        neighbours = np.stack([values[indices[:, dim]]
+                               for dim, values in enumerate(self.values)], axis=1)
+        return neighbours[self.space.is_valid(neighbours)]
+
+    def contains(self, row):
+        """
+        Checks if a parameter set belongs to the grid
+        :param row: 1-D integer array with parameter set
+        :return: true if the parameter set is valid and each value is in its dimension
+        """
+        if len(row) != len(self.values):
+            return False
+        return all(value in values for value, values in zip(row, self.values)) and \
+            bool(self.space.is_valid(np.asarray(row).reshape(1, -1))[0])
+
+    def get_last(self):
+        """
+        Returns the last valid parameter set of the grid
+        :return: 1-D integer array or None if the grid is empty
+        """
+        for rows in self.__get_slices(reverse=True):
+            if rows.shape[0]:
+                return rows[-1]
+        return None
+
+    def __iter__(self):
+        for block in self.get_blocks(4096):
+            for row in block:
+                yield tuple(row.tolist())
+
+    def __len__(self):
+        return sum(rows.shape[0] for rows in self.__get_slices())
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+
+class PrimitiveCache:
+    """
+    Memoizes the building blocks of indicators like moving averages or oscillators.
+    The optimizer evaluates thousands of parameter combinations on the same bars and most
+    combinations share their building blocks. A cache belongs to one bar set and must be
+    cleared when the bars change.
+
+    The keys are tuples of primitive name, input columns and options
+    i.e. ('sma', ('open',), 20). Cached values must not be changed by the caller.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, function, *args):
+        """
+        Returns the cached value or calculates and stores it
+        :param key: key of primitive
+        :param function: function to calculate the primitive on a cache miss
+        :param args: arguments of function
+        :return: value of primitive
+        """
+        value = self.values.get(key)
+        if value is None:
+            self.misses += 1
+            value = function(*args)
+            self.values[key] = value
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Stores a precalculated primitive
+        :param key: key of primitive
+        :param value: value of primitive
+        :return: nothing
+        """
+        self.values[key] = value
+
+    def clear(self):
+        """
+        Removes all primitives. Must be called when the bars change.
+        :return: nothing
+        """
+        self.values = {}
+
+    def __contains__(self, key):
+        return key in self.values
+
+    def __len__(self):
+        return len(self.values)
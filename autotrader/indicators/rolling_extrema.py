@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import numpy as np
+from numba import jit
+
+
+@jit(nopython=True, nogil=True)
+def rolling_extrema(values, windows, maximum):
+    """
+    Calculates the rolling maximum or minimum and its position for many window lengths.
+    A monotonic deque keeps the candidates of a window, so each window length costs one pass.
+    The window of index i is [i - window + 1, i] and is shortened at the start of values.
+    Equal values are resolved to the latest position like in tulipy.
+    :param values: prices
+    :param windows: integer array with window lengths
+    :param maximum: maximum if true otherwise minimum
+    :return: matrix of extrema and matrix of positions with one row per window length
+    """
+    size = values.shape[0]
+    extrema = np.empty((windows.shape[0], size))
+    positions = np.empty((windows.shape[0], size), dtype=np.int64)
+    deque = np.empty(size, dtype=np.int64)
+    for row in range(windows.shape[0]):
+        window = windows[row]
+        head = 0
+        tail = 0
+        for index in range(size):
+            if head < tail and deque[head] <= index - window:
+                head += 1
+            if maximum:
+                while head < tail and values[deque[tail - 1]] <= values[index]:
+                    tail -= 1
+            else:
+                while head < tail and values[deque[tail - 1]] >= values[index]:
+                    tail -= 1
+            deque[tail] = index
+            tail += 1
+            positions[row, index] = deque[head]
+            extrema[row, index] = values[deque[head]]
+    return extrema, positions
+
+
+@jit(nopython=True, nogil=True)
+def raw_stochastic_bank(high, low, close, periods):
+    """
+    Calculates the fast %K for many periods. The first period - 1 values use the shortened
+    window like ti.stoch does internally.
+    :param high: high prices
+    :param low: low prices
+    :param close: close prices
+    :param periods: integer array with %K periods
+    :return: matrix with one fast %K per period
+    """
+    highest = rolling_extrema(high, periods, True)[0]
+    lowest = rolling_extrema(low, periods, False)[0]
+    raw = np.empty(highest.shape)
+    for row in range(periods.shape[0]):
+        for index in range(close.shape[0]):
+            diff = highest[row, index] - lowest[row, index]
+            if diff == 0.0:
+                raw[row, index] = 0.
+            else:
+                raw[row, index] = 100 * ((close[index] - lowest[row, index]) / diff)
+    return raw
+
+
+@jit(nopython=True, nogil=True)
+def aroon_bank(high, low, periods):
+    """
+    Calculates aroon down and aroon up for many periods from one extrema pass. Each row is
+    aligned to the prices and starts at index period like ti.aroon. The values in front are nan.
+    :param high: high prices
+    :param low: low prices
+    :param periods: integer array with aroon periods
+    :return: matrix with aroon down and matrix with aroon up
+    """
+    # the aroon window contains period + 1 bars
+    positions_high = rolling_extrema(high, periods + 1, True)[1]
+    positions_low = rolling_extrema(low, periods + 1, False)[1]
+    aroon_down = np.full(positions_low.shape, np.nan)
+    aroon_up = np.full(positions_high.shape, np.nan)
+    for row in range(periods.shape[0]):
+        period = periods[row]
+        scale = 100.0 / period
+        for index in range(period, high.shape[0]):
+            aroon_down[row, index] = (period - (index - positions_low[row, index])) * scale
+            aroon_up[row, index] = (period - (index - positions_high[row, index])) * scale
+    return aroon_down, aroon_up
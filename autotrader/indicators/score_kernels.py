@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+
+ Compiled kernels that go from indicator series straight to profit and status.
+ Each kernel fuses the raw signal, the state machine of BaseIndicator.set_signal or
+ BaseIndicator.set_signal_osc, the back test and BaseIndicator.get_status in one loop
+ without building the signal. The series must be aligned to each other and the first
+ value belongs to the price at signal shift.
+"""
+from numba import jit
+
+from autotrader.indicators.backtest_kernels import backtest_step
+from autotrader.indicators.base_indicator import BaseIndicator
+
+NO_SIGNAL = BaseIndicator.NO_SIGNAL
+
+
+def get_backtest_values(arguments):
+    """
+    Converts back test arguments to the kernel arguments
+    :param arguments: dict with initial_capital, commission_rate and commission_rate_prc
+    :return: tuple with initial capital, commission rate and commission rate in percent
+    """
+    return (float(arguments['initial_capital']),
+            float(arguments['commission_rate']),
+            float(arguments['commission_rate_prc']))
+
+
+@jit(nopython=True, nogil=True)
+def signal_step(raw_value, prev_sym):
+    """
+    One step of BaseIndicator.set_signal
+    :param raw_value: invested (1) or not invested (0)
+    :param prev_sym: previous raw value or state
+    :return: signal value and new state
+    """
+    if raw_value == 1 and prev_sym == 1:
+        return 0, 1
+    if raw_value == 0 and prev_sym == 1:
+        return -1, -1
+    if raw_value == 1:
+        return 1, 1
+    return raw_value, raw_value
+
+
+@jit(nopython=True, nogil=True)
+def signal_osc_step(raw_value, open_pos):
+    """
+    One step of BaseIndicator.set_signal_osc
+    :param raw_value: buy (1), sell (-1) or hold (0)
+    :param open_pos: true if a position is open
+    :return: signal value and new state
+    """
+    if raw_value == 1 and not open_pos:
+        return 1, True
+    if raw_value == -1 and open_pos:
+        return -1, False
+    return 0, open_pos
+
+
+@jit(nopython=True, nogil=True)
+def get_final_status(size, last_value, last_trade):
+    """
+    Status of a signal like BaseIndicator.get_status
+    :param size: length of signal
+    :param last_value: last signal value
+    :param last_trade: last signal value that is not zero
+    :return: status
+    """
+    if size == 0:
+        return NO_SIGNAL
+    if last_value == 1:
+        return 2
+    if last_value == -1:
+        return -2
+    return last_trade
+
+
+@jit(nopython=True, nogil=True)
+def score_cross(price, fast, slow, signal_shift, initial_capital, commission_rate,
+                commission_rate_prc):
+    """
+    Scores a signal that is invested while fast is above slow
+    :param price: open prices
+    :param fast: fast series
+    :param slow: slow series
+    :param signal_shift: index of price that belongs to first series value
+    :param initial_capital: cash at start
+    :param commission_rate: fixed commission per trade
+    :param commission_rate_prc: commission in percent of trade volume
+    :return: profit and status
+    """
+    if fast.shape[0] != slow.shape[0]:
+        raise ValueError("Series have different shapes")
+    wallet = initial_capital
+    portfolio = 0.
+    position = 0
+    prev_sym = 0
+    value = 0
+    last_trade = 0
+    for index in range(fast.shape[0]):
+        raw_value = 1 if fast[index] > slow[index] else 0
+        value, prev_sym = signal_step(raw_value, prev_sym)
+        wallet, portfolio, position = backtest_step(value, price[index + signal_shift],
+                                                    wallet, portfolio, position,
+                                                    commission_rate, commission_rate_prc)
+        if value != 0:
+            last_trade = value
+    return ((portfolio + wallet) / initial_capital - 1,
+            get_final_status(fast.shape[0], value, last_trade))
+
+
+@jit(nopython=True, nogil=True)
+def score_triple(price, short, medium, long, signal_shift, initial_capital, commission_rate,
+                 commission_rate_prc):
+    """
+    Scores a signal that is invested while short is above medium and medium is above long
+    :param price: open prices
+    :param short: short series
+    :param medium: medium series
+    :param long: long series
+    :param signal_shift: index of price that belongs to first series value
+    :param initial_capital: cash at start
+    :param commission_rate: fixed commission per trade
+    :param commission_rate_prc: commission in percent of trade volume
+    :return: profit and status
+    """
+    if short.shape[0] != long.shape[0] or medium.shape[0] != long.shape[0]:
+        raise ValueError("Series have different shapes")
+    wallet = initial_capital
+    portfolio = 0.
+    position = 0
+    prev_sym = 0
+    value = 0
+    last_trade = 0
+    for index in range(long.shape[0]):
+        raw_value = 0
+        if short[index] > medium[index] and short[index] > long[index] and \
+                medium[index] > long[index]:
+            raw_value = 1
+        value, prev_sym = signal_step(raw_value, prev_sym)
+        wallet, portfolio, position = backtest_step(value, price[index + signal_shift],
+                                                    wallet, portfolio, position,
+                                                    commission_rate, commission_rate_prc)
+        if value != 0:
+            last_trade = value
+    return ((portfolio + wallet) / initial_capital - 1,
+            get_final_status(long.shape[0], value, last_trade))
+
+
+@jit(nopython=True, nogil=True)
+def score_band(price, first, second, upper_threshold, lower_threshold, signal_shift,
+               initial_capital, commission_rate, commission_rate_prc):
+    """
+    Scores an oscillator signal that buys when both series are above the upper threshold
+    and sells when both series are below the lower threshold
+    :param price: open prices
+    :param first: first oscillator series
+    :param second: second oscillator series. Can be the first series.
+    :param upper_threshold: buy threshold
+    :param lower_threshold: sell threshold
+    :param signal_shift: index of price that belongs to first series value
+    :param initial_capital: cash at start
+    :param commission_rate: fixed commission per trade
+    :param commission_rate_prc: commission in percent of trade volume
+    :return: profit and status
+    """
+    if first.shape[0] != second.shape[0]:
+        raise ValueError("Series have different shapes")
+    wallet = initial_capital
+    portfolio = 0.
+    position = 0
+    open_pos = False
+    value = 0
+    last_trade = 0
+    for index in range(first.shape[0]):
+        raw_value = 0
+        if first[index] > upper_threshold and second[index] > upper_threshold:
+            raw_value = 1
+        if lower_threshold > first[index] and lower_threshold > second[index]:
+            raw_value = -1
+        value, open_pos = signal_osc_step(raw_value, open_pos)
+        wallet, portfolio, position = backtest_step(value, price[index + signal_shift],
+                                                    wallet, portfolio, position,
+                                                    commission_rate, commission_rate_prc)
+        if value != 0:
+            last_trade = value
+    return ((portfolio + wallet) / initial_capital - 1,
+            get_final_status(first.shape[0], value, last_trade))
+
+
+@jit(nopython=True, nogil=True)
+def score_osc_cross(price, line, signal_line, signal_shift, initial_capital, commission_rate,
+                    commission_rate_prc):
+    """
+    Scores an oscillator signal that buys when the signal line is above the line and sells
+    when it is below
+    :param price: open prices
+    :param line: oscillator series
+    :param signal_line: signal series of oscillator
+    :param signal_shift: index of price that belongs to first series value
+    :param initial_capital: cash at start
+    :param commission_rate: fixed commission per trade
+    :param commission_rate_prc: commission in percent of trade volume
+    :return: profit and status
+    """
+    if line.shape[0] != signal_line.shape[0]:
+        raise ValueError("Series have different shapes")
+    wallet = initial_capital
+    portfolio = 0.
+    position = 0
+    open_pos = False
+    value = 0
+    last_trade = 0
+    for index in range(line.shape[0]):
+        raw_value = 0
+        if signal_line[index] > line[index]:
+            raw_value = 1
+        elif line[index] > signal_line[index]:
+            raw_value = -1
+        value, open_pos = signal_osc_step(raw_value, open_pos)
+        wallet, portfolio, position = backtest_step(value, price[index + signal_shift],
+                                                    wallet, portfolio, position,
+                                                    commission_rate, commission_rate_prc)
+        if value != 0:
+            last_trade = value
+    return ((portfolio + wallet) / initial_capital - 1,
+            get_final_status(line.shape[0], value, last_trade))
@@ -19,9 +19,11 @@ import logging
 
 import matplotlib.pyplot as plt
 import numpy as np
-import tulipy as ti
 
 from autotrader.indicators.base_indicator import BaseIndicator
+from autotrader.indicators.parameter_space import ParameterSpace, Dimension
+from autotrader.indicators.score_kernels import score_cross, get_backtest_values
+from autotrader.indicators.rolling_extrema import aroon_bank
 
 
 class AroonSignal(BaseIndicator):
@@ -49,6 +51,8 @@ class AroonSignal(BaseIndicator):
         'plot_result': False
     }
 
+    PARAMETER_SPACE = ParameterSpace([Dimension('period', 5)])
+
     def __init__(self, argument: dict, logger: logging.Logger):
         super(AroonSignal, self).__init__(argument, logger)
         self.strategy_value = {
@@ -63,8 +67,19 @@ class AroonSignal(BaseIndicator):
         self.parameters = parameters
         self.strategy_value['period'] = parameters[0]
 
+    def prepare_primitives(self, parameters):
+        periods = [int(period) for period in np.unique(parameters[:, 0])
+                   if 1 <= period < self.high.size and
+                   ('aroon', ('high', 'low'), int(period)) not in self.primitives]
+        if not periods:
+            return
+        aroon_down, aroon_up = aroon_bank(self.high, self.low, np.asarray(periods, dtype='int64'))
+        for row, period in enumerate(periods):
+            self.primitives.put(('aroon', ('high', 'low'), period),
+                                (aroon_down[row, period:], aroon_up[row, period:]))
+
     def get_indicators(self):
-        return ti.aroon(self.high, self.low, int(self.strategy_value['period']))
+        return self.get_primitive('aroon', ('high', 'low'), int(self.strategy_value['period']))
 
     def generate_signals(self):
         """Returns the DataFrame of symbols containing the indicators
@@ -83,6 +98,12 @@ class AroonSignal(BaseIndicator):
             self.plot([self.times, self.close, self.open, aroon_down, aroon_up])
         return self.signal
 
+    def score(self, arguments):
+        aroon_down, aroon_up = self.get_indicators()
+        self.signal_shift = int(self.strategy_value['period'])
+        return score_cross(self.open, aroon_up, aroon_down, self.signal_shift,
+                           *get_backtest_values(arguments))
+
     def plot(self, graphs):
         times = graphs[0]
         close_prices = graphs[1]
@@ -22,6 +22,8 @@ import numpy as np
 import tulipy as ti
 
 from autotrader.indicators.base_indicator import BaseIndicator
+from autotrader.indicators.parameter_space import ParameterSpace, Dimension
+from autotrader.indicators.score_kernels import score_cross, get_backtest_values
 
 
 class MacdHistogramSignal(BaseIndicator):
@@ -55,6 +57,11 @@ class MacdHistogramSignal(BaseIndicator):
         'plot_result': False
     }
 
+    PARAMETER_SPACE = ParameterSpace(
+        [Dimension('short_period', 5), Dimension('long_period', 5), Dimension('signal_period', 5)],
+        [('short_period', '<', 'long_period'), ('long_period', '<', 'signal_period')]
+    )
+
     def __init__(self, argument: dict, logger: logging.Logger):
         super(MacdHistogramSignal, self).__init__(argument, logger)
         self.strategy_value = {
@@ -74,11 +81,25 @@ class MacdHistogramSignal(BaseIndicator):
         self.strategy_value['long_period'] = parameters[1]
         self.strategy_value['signal_period'] = parameters[2]
 
+    def prepare_primitives(self, parameters):
+        self.preload_moving_averages('ema', 'open', parameters[:, :2])
+
     def get_indicators(self):
         short_period = int(self.strategy_value['short_period'])
         long_period = int(self.strategy_value['long_period'])
         signal_period = int(self.strategy_value['signal_period'])
-        return ti.macd(self.open, short_period, long_period, signal_period)
+        if short_period == 12 and long_period == 26:
+            # tulipy uses fixed smoothing factors for the default periods
+            return ti.macd(self.open, short_period, long_period, signal_period)
+        if short_period < 1 or long_period < 2 or long_period < short_period or \
+                signal_period < 1 or long_period - 1 >= self.open.size:
+            raise ValueError("Invalid MACD periods")
+        # the macd is the difference of two emas that are shared by many parameter sets
+        short_ema = self.get_primitive('ema', ('open',), short_period)
+        long_ema = self.get_primitive('ema', ('open',), long_period)
+        macd = short_ema[long_period - 1:] - long_ema[long_period - 1:]
+        macd_signal = ti.ema(macd, signal_period)
+        return macd, macd_signal, macd - macd_signal
 
     def generate_signals(self):
         """Returns the DataFrame of symbols containing the indicators
@@ -94,6 +115,13 @@ class MacdHistogramSignal(BaseIndicator):
             self.plot([self.times, self.open, macd_histogram, macd, macd_signal])
         return self.signal
 
+    def score(self, arguments):
+        macd, macd_signal, _ = self.get_indicators()
+        self.signal_shift = int(self.strategy_value['long_period']) - 1
+        # the histogram is above zero exactly when the macd is above its signal line
+        return score_cross(self.open, macd, macd_signal, self.signal_shift,
+                           *get_backtest_values(arguments))
+
     def plot(self, graphs):
         times = graphs[0]
         open_prices = graphs[1]
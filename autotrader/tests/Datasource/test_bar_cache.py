@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import datetime
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from autotrader.datasource.bars import Bars
+from autotrader.datasource.database.bar_cache import BarCache, BAR_CACHE
+from autotrader.datasource.database.stock_schema import BASE, Stock, Series, BARS_TYPED
+from autotrader.tests.indicators.test_base import TestBase
+
+
+class Owner:
+    """
+    Owner of series with id
+    """
+    __tablename__ = 'stock'
+
+    def __init__(self, owner_id):
+        self.id = owner_id
+
+
+class TestBarCache(unittest.TestCase):
+    """
+    Tests the in-process bar cache
+    """
+
+    def setUp(self):
+        BAR_CACHE.clear()
+
+    def tearDown(self):
+        BAR_CACHE.clear()
+
+    def test_window(self):
+        """
+        Tests that requests inside a cached window are served from it
+        """
+        cache = BarCache()
+        bars = Bars.from_array(TestBase.get_random_bars(size=30))
+        start, end = datetime.datetime(2017, 1, 2), datetime.datetime(2017, 1, 31)
+        self.assertIsNone(cache.get(Owner(1), 'P1D', start, end))
+        cache.put(Owner(1), 'P1D', start, end, bars)
+        window = cache.get(Owner(1), 'P1D', datetime.datetime(2017, 1, 5),
+                           datetime.datetime(2017, 1, 9))
+        self.assertEqual(len(window), 5)
+        self.assertIsNone(cache.get(Owner(1), 'P1D', start, datetime.datetime(2017, 2, 5)))
+        self.assertIsNone(cache.get(Owner(2), 'P1D', start, end))
+        self.assertIsNone(cache.get(Owner(1), 'PT1S', start, end))
+        self.assertEqual(cache.get_statistics()["hits"], 1)
+        self.assertEqual(cache.get_statistics()["misses"], 4)
+
+    def test_eviction(self):
+        """
+        Tests the byte bound, the least recently used order and the invalidation
+        """
+        bars = Bars.from_array(TestBase.get_random_bars(size=30))
+        size = 30 * 6 * 8
+        cache = BarCache(max_bytes=2 * size)
+        start, end = datetime.datetime(2017, 1, 2), datetime.datetime(2017, 1, 31)
+        cache.put(Owner(1), 'P1D', start, end, bars)
+        cache.put(Owner(2), 'P1D', start, end, bars)
+        self.assertIsNotNone(cache.get(Owner(1), 'P1D', start, end))
+        cache.put(Owner(3), 'P1D', start, end, bars)
+        self.assertEqual(cache.get_statistics()["evictions"], 1)
+        self.assertEqual(cache.get_statistics()["bytes"], 2 * size)
+        self.assertIsNone(cache.get(Owner(2), 'P1D', start, end))
+        self.assertIsNotNone(cache.get(Owner(1), 'P1D', start, end))
+        cache.invalidate(Owner(1))
+        self.assertIsNone(cache.get(Owner(1), 'P1D', start, end))
+        self.assertEqual(cache.get_statistics()["windows"], 1)
+
+    def test_get_bars(self):
+        """
+        Tests that get_bars uses the cache until it is invalidated
+        """
+        session = Session(create_engine('sqlite://'))
+        BASE.metadata.create_all(session.get_bind())
+        stock = Stock(symbol='S', name='Stock', category='stock', feed_quality='test')
+        for bar in TestBase.get_random_bars(size=20):
+            stock.series.append(Series(priceclose=bar[0], priceopen=bar[1], volume=bar[2],
+                                       pricehigh=bar[3], pricelow=bar[4], date=bar[5],
+                                       resolution='P1D'))
+        session.add(stock)
+        session.commit()
+        start, end = datetime.datetime(2017, 1, 1), datetime.datetime(2017, 2, 1)
+        self.assertEqual(len(stock.get_bars(start, end, output_type=BARS_TYPED)), 20)
+        stock.series.append(Series(priceclose=1, priceopen=1, volume=1, pricehigh=1,
+                                   pricelow=1, date=datetime.datetime(2017, 1, 25),
+                                   resolution='P1D'))
+        session.commit()
+        bars = stock.get_bars(datetime.datetime(2017, 1, 3), datetime.datetime(2017, 1, 30),
+                              output_type=BARS_TYPED)
+        self.assertEqual(len(bars), 19)
+        BAR_CACHE.invalidate(stock)
+        self.assertEqual(len(stock.get_bars(start, end, output_type=BARS_TYPED)), 21)
+        self.assertEqual(BAR_CACHE.get_statistics()["hits"], 1)
+        session.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import datetime
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from autotrader.datasource.bars import Bars
+from autotrader.datasource.database.bar_cache import BAR_CACHE
+from autotrader.datasource.database.bar_prefetch import BarPrefetch
+from autotrader.datasource.database.bar_store import BarStore, BAR_STORE
+from autotrader.datasource.database.stock_schema import BASE, Stock, Series, BARS_TYPED
+from autotrader.tests.Datasource.test_bar_cache import Owner
+from autotrader.tests.indicators.test_base import TestBase
+
+
+class TestBarStore(unittest.TestCase):
+    """
+    Tests the memory-mapped bar store
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        BAR_CACHE.clear()
+
+    def tearDown(self):
+        BAR_STORE.path = None
+        self.directory.cleanup()
+
+    def test_append(self):
+        """
+        Tests that appends skip stored bars and reads map the files
+        """
+        store = BarStore(self.directory.name)
+        bars = Bars.from_array(TestBase.get_random_bars(size=30))
+        self.assertFalse(store.has_bars(Owner(1), 'P1D'))
+        self.assertEqual(store.append(Owner(1), 'P1D', bars[:20]), 20)
+        self.assertEqual(store.append(Owner(1), 'P1D', bars[10:]), 10)
+        self.assertEqual(store.append(Owner(2), 'P1D', bars[0:0]), 0)
+        self.assertTrue(store.has_bars(Owner(2), 'P1D'))
+        self.assertEqual(len(store.get_bars(Owner(2), 'P1D')), 0)
+        stored = store.get_bars(Owner(1), 'P1D')
+        # read-only views of the mapped files
+        self.assertFalse(stored.close.flags.writeable or stored.close.flags.owndata)
+        for column in ('close', 'open', 'volume', 'high', 'low', 'times'):
+            np.testing.assert_array_equal(stored.get_column(column), bars.get_column(column))
+        window = store.get_bars(Owner(1), 'P1D', datetime.datetime(2017, 1, 5),
+                                datetime.datetime(2017, 1, 9))
+        self.assertEqual(len(window), 5)
+        np.testing.assert_array_equal(window.close, bars.close[3:8])
+        self.assertFalse(window.close.flags.owndata)
+        self.assertEqual(store.get_last_time(Owner(1), 'P1D'), bars.times[-1])
+        store.clear()
+        self.assertFalse(store.has_bars(Owner(1), 'P1D'))
+
+    def test_interrupted_append(self):
+        """
+        Tests that bars of an interrupted append are ignored and overwritten
+        """
+        store = BarStore(self.directory.name)
+        bars = Bars.from_array(TestBase.get_random_bars(size=30))
+        store.append(Owner(1), 'P1D', bars[:20])
+        with open(os.path.join(store.get_directory(Owner(1), 'P1D'), 'close'), 'ab') as close:
+            close.write(bars.close[20:25].tobytes())
+        self.assertEqual(len(store.get_bars(Owner(1), 'P1D')), 20)
+        store.append(Owner(1), 'P1D', bars)
+        np.testing.assert_array_equal(store.get_bars(Owner(1), 'P1D').close, bars.close)
+
+    def test_get_bars(self):
+        """
+        Tests that get_bars copies the bars of a stock to the store, reads them from it and
+        updates the store if the database differs
+        """
+        BAR_STORE.path = self.directory.name
+        session = Session(create_engine('sqlite://'))
+        BASE.metadata.create_all(session.get_bind())
+        stock = Stock(symbol='S', name='Stock', category='stock', feed_quality='test')
+        for bar in TestBase.get_random_bars(size=20):
+            stock.series.append(Series(priceclose=bar[0], priceopen=bar[1], volume=bar[2],
+                                       pricehigh=bar[3], pricelow=bar[4], date=bar[5],
+                                       resolution='P1D'))
+        session.add(stock)
+        session.commit()
+        bars = stock.get_bars(datetime.datetime(2017, 1, 3), datetime.datetime(2017, 1, 10),
+                              output_type=BARS_TYPED)
+        self.assertEqual(len(bars), 8)
+        self.assertFalse(bars.close.flags.writeable or bars.close.flags.owndata)
+        self.assertEqual(len(BAR_STORE.get_bars(stock, 'P1D')), 20)
+        stock.series.append(Series(priceclose=1, priceopen=1, volume=1, pricehigh=1,
+                                   pricelow=1, date=datetime.datetime(2017, 2, 1),
+                                   resolution='P1D'))
+        session.commit()
+        self.assertEqual(stock.update_bar_store(), 1)
+        self.assertEqual(stock.update_bar_store(), 0)
+        self.assertEqual(stock.sync_bar_store(), 0)
+        # new bar without update of the store
+        stock.series.append(Series(priceclose=2, priceopen=2, volume=2, pricehigh=2,
+                                   pricelow=2, date=datetime.datetime(2017, 2, 2),
+                                   resolution='P1D'))
+        session.commit()
+        start, end = datetime.datetime(2016, 12, 1), datetime.datetime(2017, 3, 1)
+        self.assertEqual(len(stock.get_bars(start, end, output_type=BARS_TYPED)), 22)
+        # backfill of an older bar
+        stock.series.append(Series(priceclose=3, priceopen=3, volume=3, pricehigh=3,
+                                   pricelow=3, date=datetime.datetime(2016, 12, 30),
+                                   resolution='P1D'))
+        session.commit()
+        prefetch = BarPrefetch(session, start, end)
+        stored = [bars for _, bars in prefetch.iterate([stock])]
+        self.assertEqual(len(stored[0]), 23)
+        self.assertEqual(stored[0].close[0], 3)
+        self.assertTrue(stored[0].is_sorted())
+        self.assertEqual(prefetch.queries, 1)
+        # bars that were read before keep the replaced files
+        self.assertEqual(len(bars), 8)
+        # removed bar
+        session.delete(stock.series[0])
+        session.commit()
+        self.assertEqual(len(stock.get_bars(start, end, output_type=BARS_TYPED)), 22)
+        self.assertEqual(BAR_CACHE.get_statistics()["windows"], 0)
+        session.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
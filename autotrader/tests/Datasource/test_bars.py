@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import datetime
+import logging
+import unittest
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from autotrader.datasource.bars import Bars, to_datetime
+from autotrader.datasource.database.bar_cache import BAR_CACHE
+from autotrader.datasource.database.bar_prefetch import BarPrefetch
+from autotrader.datasource.database.stock_schema import BASE, Stock, Series, BARS_NUMPY, \
+    BARS_TYPED
+from autotrader.indicators.trend.aroon_basic import AroonSignal
+from autotrader.tests.indicators.test_base import TestBase
+
+
+class TestBars(unittest.TestCase):
+    """
+    Tests the typed bar container
+    """
+
+    TEST_LOGGER = logging.getLogger()
+    TEST_LOGGER.setLevel(logging.WARNING)
+
+    def setUp(self):
+        # the ids of the in-memory databases repeat
+        BAR_CACHE.clear()
+
+    def test_conversion(self):
+        """
+        Tests the conversion from and to BARS_NUMPY arrays and the array like access
+        """
+        array = TestBase.get_random_bars(size=30)
+        bars = Bars.from_array(array)
+        self.assertEqual(bars.shape, (30, 6))
+        self.assertEqual(bars.size, array.size)
+        self.assertEqual(bars.close.dtype, np.float64)
+        self.assertEqual(bars.times.dtype, np.dtype('datetime64[ns]'))
+        self.assertEqual(bars.to_array().tolist(), array.tolist())
+        for column in range(5):
+            np.testing.assert_array_equal(bars[:, column], array[:, column].astype('float64'))
+        self.assertEqual(to_datetime(bars[:, 5][-1]), array[-1, 5])
+        self.assertEqual(bars[[3, 2]][1][0], array[2, 0])
+        self.assertEqual(to_datetime(bars[-1][5]), array[-1, 5])
+
+    def test_window(self):
+        """
+        Tests that windows by date share the memory of the bars
+        """
+        array = TestBase.get_random_bars(size=30)
+        bars = Bars.from_array(array)
+        window = bars.get_window(array[5, 5], array[9, 5])
+        self.assertEqual(len(window), 5)
+        self.assertTrue(np.shares_memory(window.close, bars.close))
+        self.assertEqual(to_datetime(window.times[0]), array[5, 5])
+        window = bars.get_window(start=array[25, 5] + datetime.timedelta(hours=1))
+        self.assertEqual(len(window), 4)
+        self.assertEqual(len(bars.get_window(end=datetime.datetime(2000, 1, 1))), 0)
+
+    def test_indicator(self):
+        """
+        Tests that an indicator calculates the same signal and plot with typed bars
+        """
+        array = TestBase.get_random_bars(size=80)
+        results = []
+        for bars in (array, Bars.from_array(array)):
+            indicator = AroonSignal(AroonSignal.ARGUMENTS, self.TEST_LOGGER)
+            indicator.set_bars(bars)
+            indicator.set_parameters((14,))
+            results.append((indicator.generate_signals().tolist(), indicator.get_plot()))
+        self.assertEqual(results[0], results[1])
+
+    def test_get_bars(self):
+        """
+        Tests that the bars of the database are sorted and equal in both numpy formats
+        """
+        session = Session(create_engine('sqlite://'))
+        BASE.metadata.create_all(session.get_bind())
+        stock = Stock(symbol='S', name='Stock', category='stock', feed_quality='test')
+        session.add(stock)
+        array = TestBase.get_random_bars(size=20)
+        for idx in np.random.RandomState(0).permutation(20):
+            stock.series.append(Series(priceclose=array[idx, 0], priceopen=array[idx, 1],
+                                       volume=array[idx, 2], pricehigh=array[idx, 3],
+                                       pricelow=array[idx, 4], date=array[idx, 5],
+                                       resolution='P1D'))
+        session.commit()
+        start, end = array[2, 5], array[15, 5]
+        numpy_bars = stock.get_bars(start, end, output_type=BARS_NUMPY)
+        typed_bars = stock.get_bars(start, end, output_type=BARS_TYPED)
+        self.assertEqual(numpy_bars.tolist(), array[2:16].tolist())
+        self.assertEqual(typed_bars.to_array().tolist(), array[2:16].tolist())
+        self.assertEqual(stock.get_bars(end, start, output_type=BARS_TYPED).shape, (0, 6))
+        session.close()
+
+    def test_prefetch(self):
+        """
+        Tests that the prefetched bars equal the bars of each stock
+        """
+        session = Session(create_engine('sqlite://'))
+        BASE.metadata.create_all(session.get_bind())
+        stocks = []
+        for seed in range(5):
+            stock = Stock(symbol='S{}'.format(seed), name='Stock {}'.format(seed),
+                          category='stock', feed_quality='test')
+            bars = TestBase.get_random_bars(size=10 + seed, seed=seed)
+            # the third stock has no bars
+            for bar in bars[:0] if seed == 2 else bars:
+                stock.series.append(Series(priceclose=bar[0], priceopen=bar[1], volume=bar[2],
+                                           pricehigh=bar[3], pricelow=bar[4], date=bar[5],
+                                           resolution='P1D'))
+            session.add(stock)
+            stocks.append(stock)
+        session.commit()
+        start, end = datetime.datetime(2017, 1, 4), datetime.datetime(2017, 1, 12)
+        prefetch = BarPrefetch(session, start, end, chunk_size=2)
+        results = list(prefetch.iterate(stocks))
+        self.assertEqual(prefetch.queries, 3)
+        self.assertEqual([stock for stock, _ in results], stocks)
+        for stock, bars in results:
+            self.assertEqual(bars.to_array().tolist(),
+                             stock.get_bars(start, end, output_type=BARS_TYPED).to_array().tolist())
+        self.assertEqual(len(results[2][1]), 0)
+        self.assertEqual(sorted(prefetch.load([stock.id for stock in stocks])),
+                         [stock.id for stock in stocks])
+        session.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
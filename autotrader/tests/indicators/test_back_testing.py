@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import subprocess
+import sys
+import unittest
+
+import numpy as np
+
+from autotrader.indicators.base_indicator import BaseIndicator
+from autotrader.indicators.backtest_kernels import backtest_equity_curve, backtest_final_value, \
+    backtest_matrix
+
+
+def reference_backtest(price, signal, signal_shift, initial_capital, commission_rate,
+                       commission_rate_prc):
+    """
+    Former back test loop of BackTesting that updates the rest of the curve on each trade
+    :param price: open prices
+    :param signal: signal with buy (1), sell (-1) and hold (0)
+    :param signal_shift: index of price that belongs to first signal value
+    :param initial_capital: cash at start
+    :param commission_rate: fixed commission per trade
+    :param commission_rate_prc: commission in percent of trade volume
+    :return: portfolio value for each signal value
+    """
+    wallet = np.full(signal.shape, initial_capital)
+    portfolio = np.full(signal.shape, 0.0)
+    position = 0
+    for index in range(signal.shape[0]):
+        if signal[index] == 1:
+            position = int(wallet[index] / price[index + signal_shift])
+            wallet[index:] -= price[index + signal_shift] * position * \
+                (1 + commission_rate_prc) - commission_rate
+            portfolio[index:] += price[index + signal_shift] * position
+        if signal[index] == -1:
+            wallet[index:] += price[index + signal_shift] * position * \
+                (1 - commission_rate_prc) - commission_rate
+            portfolio[index:] = 0
+            position = 0
+    return portfolio + wallet
+
+
+class TestBackTesting(unittest.TestCase):
+    """
+    Tests the back testing engine
+    """
+
+    def test_import(self):
+        """
+        Tests that the back testing module can be imported first in a new interpreter
+        """
+        for module in ('autotrader.tool.indicators.back_testing',
+                       'autotrader.indicators.score_kernels'):
+            result = subprocess.run([sys.executable, '-c', 'import %s' % module],
+                                    capture_output=True, text=True)
+            self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_reference(self):
+        """
+        Tests the single pass engine against the former loop with random signals,
+        commissions and signal shifts
+        """
+        random = np.random.RandomState(7)
+        price = 50. + np.cumsum(random.normal(0., 1., 300)).clip(-40., None)
+        for commission_rate, commission_rate_prc in ((0., 0.), (2., 0.004), (5., 0.01)):
+            for signal_shift in (0, 1, 13, 120):
+                signal = random.choice([-1, 0, 0, 0, 1], size=price.size - signal_shift)
+                arguments = (price, signal, signal_shift, 100000., commission_rate,
+                             commission_rate_prc)
+                expected = reference_backtest(*arguments)
+                np.testing.assert_allclose(backtest_equity_curve(*arguments), expected)
+                self.assertAlmostEqual(backtest_final_value(*arguments), expected[-1],
+                                       places=6)
+
+    def test_equity_curve(self):
+        """
+        Tests a buy and a sell with commissions and signal shift
+        """
+        price = np.array([1., 10., 20., 40., 30.])
+        signal = np.array([1, 0, -1, 0])
+        total = backtest_equity_curve(price, signal, 1, 1000., 2., 0.1)
+        # buy 100 shares for 10 and sell them for 40
+        bought = 1000. - (10. * 100 * 1.1 - 2.)
+        sold = bought + 40. * 100 * 0.9 - 2.
+        np.testing.assert_array_equal(total, [bought + 1000., bought + 1000., sold, sold])
+        self.assertEqual(backtest_final_value(price, signal, 1, 1000., 2., 0.1), total[-1])
+
+    def test_final_value(self):
+        """
+        Tests that the final value is the last value of the equity curve
+        """
+        random = np.random.RandomState(0)
+        for _ in range(100):
+            price = np.abs(random.randn(120).cumsum()) + 1.
+            signal = random.choice([-1, 0, 0, 1], 100)
+            total = backtest_equity_curve(price, signal, 20, 100000., 2., 0.004)
+            self.assertEqual(backtest_final_value(price, signal.astype('int8'), 20,
+                                                  100000., 2., 0.004), total[-1])
+
+    def test_matrix(self):
+        """
+        Tests the signal matrix kernel against the single signal engine
+        """
+        random = np.random.RandomState(1)
+        price = np.abs(random.randn(150).cumsum()) + 1.
+        signals = random.choice([-1, 0, 0, 1], (40, 150)).astype('int8')
+        signal_shifts = random.randint(0, 150, 40)
+        valid = random.rand(40) > 0.2
+        profits, status_codes = backtest_matrix(price, signals, signal_shifts, valid,
+                                                100000., 2., 0.004)
+        for row in range(40):
+            if not valid[row]:
+                self.assertTrue(np.isnan(profits[row]))
+                self.assertEqual(status_codes[row], BaseIndicator.NO_SIGNAL)
+                continue
+            signal = signals[row, signal_shifts[row]:]
+            total = backtest_final_value(price, signal, signal_shifts[row], 100000., 2., 0.004)
+            self.assertEqual(profits[row], total / 100000. - 1)
+            self.assertEqual(status_codes[row], BaseIndicator.get_status(signal))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,6 +19,8 @@ import datetime
 import unittest
 import logging
 
+import numpy as np
+
 from autotrader.base.trader_base import TraderBase
 from autotrader.datasource.database.stock_schema import BARS_NUMPY
 from autotrader.tool.indicators.optimizer import Optimizer
@@ -40,6 +42,24 @@ class TestBase(unittest.TestCase):
     test_stocks = ["LHA", "MRK"]
     test_excepted_results = None
 
+    @staticmethod
+    def get_random_bars(size=80, seed=0):
+        """
+        Generates random bars in BARS_NUMPY format
+        :param size: amount of bars
+        :param seed: seed of random generator
+        :return: numpy array with close, open, volume, high, low and date
+        """
+        random = np.random.RandomState(seed)
+        close = np.abs(50 + np.cumsum(random.randn(size))) + 5
+        open_price = close + random.randn(size) * 0.5
+        high = np.maximum(close, open_price) + np.abs(random.randn(size))
+        low = np.minimum(close, open_price) - np.abs(random.randn(size))
+        volume = random.randint(1000, 100000, size).astype('float64')
+        start = datetime.datetime(2017, 1, 2)
+        return np.asarray([[close[idx], open_price[idx], volume[idx], high[idx], low[idx],
+                            start + datetime.timedelta(days=idx)] for idx in range(size)])
+
     @staticmethod
     def check_consistency():
         """
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import datetime
+import logging
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from autotrader.datasource.database.bar_cache import BAR_CACHE
+from autotrader.datasource.database.stock_schema import BASE, Index, Stock, Series, Signal, \
+    Parameter, Plot
+from autotrader.tests.indicators.test_base import TestBase
+from autotrader.tool.indicators.build_indicators_full import BuildIndicators
+
+
+class SqliteTool:
+    """
+    Database tool with an in-memory sqlite database
+    """
+
+    def __init__(self):
+        engine = create_engine('sqlite://')
+        BASE.metadata.create_all(engine)
+        self.session = sessionmaker(bind=engine)()
+
+    def commit(self):
+        self.session.commit()
+
+
+class TestBuildFull(unittest.TestCase):
+    """
+    Tests the database path of the full build
+    """
+
+    TEST_LOGGER = logging.getLogger()
+    TEST_LOGGER.setLevel(logging.WARNING)
+
+    def setUp(self):
+        # the ids of the in-memory databases repeat
+        BAR_CACHE.clear()
+        self.db_tool = SqliteTool()
+        index = Index(symbol='TEST', feed_quality='test')
+        now = datetime.datetime.now()
+        for seed in range(3):
+            stock = Stock(symbol='S{}'.format(seed), name='Stock {}'.format(seed),
+                          category='stock', feed_quality='test', indices=[index])
+            bars = TestBase.get_random_bars(size=50, seed=seed)
+            for idx, bar in enumerate(bars):
+                stock.series.append(Series(priceclose=bar[0], priceopen=bar[1], volume=bar[2],
+                                           pricehigh=bar[3], pricelow=bar[4], resolution='P1D',
+                                           date=now - datetime.timedelta(days=50 - idx)))
+            self.db_tool.session.add(stock)
+        self.db_tool.commit()
+
+    def build(self, **arguments):
+        """
+        Runs the full build
+        :param arguments: additional arguments of the build
+        :return: build tool
+        """
+        arguments.setdefault('signals', ['Ar', 'SO'])
+        arguments.setdefault('look_back', 80)
+        arguments.update({
+            'stocks': ['ALL'],
+            'db_tool': self.db_tool
+        })
+        tool = BuildIndicators({'degiro': {'user': None, 'pw': None}}, arguments,
+                               self.TEST_LOGGER)
+        self.assertEqual(tool.build(), 0)
+        return tool
+
+    def test_insert(self):
+        """
+        Tests that signals, parameters and plots are inserted with their relations
+        """
+        self.build(flush_rows=10)
+        session = self.db_tool.session
+        signals = session.query(Signal).all()
+        self.assertEqual(len(signals), 6)
+        for signal in signals:
+            self.assertEqual(signal.info, '80')
+            self.assertEqual(signal.series_count, 50)
+            self.assertEqual(len(signal.plot), 1)
+            self.assertIsNotNone(signal.plot[0].get_plot())
+            self.assertGreater(len(signal.parameter), 0)
+            self.assertEqual(sorted({signal.name for signal in signal.stock.signal}),
+                             ['AroonSignal', 'Stochastic'])
+        self.assertEqual(session.query(Plot).count(), 6)
+        self.assertEqual(session.query(Parameter).count(),
+                         sum(len(signal.parameter) for signal in signals))
+
+    def test_concurrent_builds(self):
+        """
+        Tests that the relations of signals of builds with the same stocks stay separate
+        """
+        first = self.build()
+        second = self.build(look_back=60)
+        self.assertNotEqual(first.build_token, second.build_token)
+        signals = self.db_tool.session.query(Signal).all()
+        self.assertEqual(len(signals), 12)
+        for signal in signals:
+            self.assertEqual(signal.build_token,
+                             first.build_token if signal.info == '80' else second.build_token)
+            self.assertEqual(len(signal.plot), 1)
+            self.assertGreater(len(signal.parameter), 0)
+        self.assertEqual(self.db_tool.session.query(Plot).count(), 12)
+
+    def test_warm_start(self):
+        """
+        Tests that the warm start uses the newest signal of each selected indicator with the
+        same look back
+        """
+        self.build()
+        self.build()
+        self.build(look_back=60)
+        tool = BuildIndicators({'degiro': {'user': None, 'pw': None}},
+                               {'signals': ['Ar'], 'stocks': ['ALL'], 'look_back': 80,
+                                'db_tool': self.db_tool, 'warm_start': True}, self.TEST_LOGGER)
+        tasks = list(tool.work_generator())
+        self.assertEqual(len(tasks), 3)
+        for task in tasks:
+            self.assertEqual(list(task["optima"]), ['AroonSignal'])
+            optimum = task["optima"]['AroonSignal']
+            signal = self.db_tool.session.query(Signal).\
+                filter(Signal.stock_id == task["stock_id"]).\
+                filter(Signal.name == 'AroonSignal').\
+                filter(Signal.info == '80').order_by(Signal.id.desc()).first()
+            self.assertEqual(optimum["signal_id"], signal.id)
+            self.assertEqual(optimum["parameters"],
+                             [int(parameter.value) for parameter in signal.parameter])
+
+    def test_incremental(self):
+        """
+        Tests that the incremental build skips stocks without new bars and builds newly
+        selected indicators
+        """
+        self.build(signals=['Ar'])
+        self.assertEqual(self.db_tool.session.query(Signal).count(), 3)
+        self.build(incremental=True)
+        self.assertEqual(self.db_tool.session.query(Signal).count(), 9)
+        self.assertEqual(self.db_tool.session.query(Signal).
+                         filter(Signal.name == 'Stochastic').count(), 3)
+        self.db_tool.session.query(Plot).delete()
+        self.db_tool.session.query(Parameter).delete()
+        self.db_tool.session.query(Signal).delete()
+        self.db_tool.commit()
+        self.build()
+        self.build(incremental=True)
+        self.assertEqual(self.db_tool.session.query(Signal).count(), 6)
+        stock = self.db_tool.session.query(Stock).filter(Stock.symbol == 'S1').one()
+        stock.series.append(Series(priceclose=50, priceopen=50, volume=1000, pricehigh=51,
+                                   pricelow=49, resolution='P1D', date=datetime.datetime.now()))
+        self.db_tool.commit()
+        self.build(incremental=True)
+        self.assertEqual(self.db_tool.session.query(Signal).count(), 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
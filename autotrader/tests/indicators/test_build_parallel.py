@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import json
+import logging
+import os
+import tempfile
+import unittest
+
+from autotrader.tests.indicators.test_base import TestBase
+from autotrader.tool.indicators.build_indicators_base import BuildIndicatorsBase
+from autotrader.tool.indicators.build_indicators_full import BuildIndicators
+
+
+class GeneratedBarsBuild(BuildIndicatorsBase):
+    """
+    Indicator build of the full build with generated bars and without database
+    """
+
+    compute_task = staticmethod(BuildIndicators.compute_task)
+
+    def __init__(self, config, arguments, logger: logging.Logger):
+        super(GeneratedBarsBuild, self).__init__(config, arguments, logger)
+        self.results = {}
+
+    def work_generator(self):
+        for seed in range(5):
+            yield {
+                "stock_id": seed,
+                "stock_index": "TEST",
+                "stock_symbol": "S{}".format(seed),
+                "stock_bars": TestBase.get_random_bars(size=60 + 10 * seed, seed=seed)
+            }
+
+    def store_result(self, task, result):
+        self.results[task["stock_id"]] = result
+        return 0
+
+    def commit_work_result(self):
+        pass
+
+
+class FailingBuild(GeneratedBarsBuild):
+    """
+    Indicator build that fails at the stock with id 3 and records its commits
+    """
+
+    def __init__(self, config, arguments, logger: logging.Logger):
+        super(FailingBuild, self).__init__(config, arguments, logger)
+        self.commits = []
+
+    def store_result(self, task, result):
+        if task["stock_id"] == 3 and not self.arguments.get('resume'):
+            raise RuntimeError("database is gone")
+        return super(FailingBuild, self).store_result(task, result)
+
+    def commit_work_result(self):
+        self.commits.append(sorted(self.results))
+
+
+class BulkBuild(GeneratedBarsBuild):
+    """
+    Indicator build that stores the plots in bulk data storage and records its commits
+    """
+
+    def __init__(self, config, arguments, logger: logging.Logger):
+        super(BulkBuild, self).__init__(config, arguments, logger)
+        self.commits = []
+
+    def store_result(self, task, result):
+        for indicator_result in result:
+            self.bulk_data_storage["signal"].append(task["stock_id"])
+            self.bulk_data_storage["plot_create"].append({"data": indicator_result["plot"]})
+        return 0
+
+    def commit_work_result(self):
+        self.commits.append(self.bulk_data_storage["signal"])
+
+
+class TestBuildParallel(unittest.TestCase):
+    """
+    Tests the parallel mode of the indicator build
+    """
+
+    TEST_LOGGER = logging.getLogger()
+    TEST_LOGGER.setLevel(logging.WARNING)
+
+    def test_parallel_equals_serial(self):
+        """
+        Tests that the parallel mode stores the same results as the serial mode
+        """
+        results = []
+        for jobs in (1, 3):
+            arguments = {
+                'signals': ['Macs', 'Ar', 'SO'],
+                'stocks': ['ALL'],
+                'look_back': 40,
+                'jobs': jobs
+            }
+            tool = GeneratedBarsBuild(None, arguments, self.TEST_LOGGER)
+            self.assertEqual(tool.build(), 0)
+            results.append(tool.results)
+        self.assertEqual(len(results[0]), 5)
+        self.assertEqual(results[0], results[1])
+
+    def test_flush(self):
+        """
+        Tests that the results are committed in batches of whole stocks
+        """
+        arguments = {
+            'signals': ['Ar', 'SO'],
+            'stocks': ['ALL'],
+            'look_back': 40,
+            'flush_rows': 7
+        }
+        tool = BulkBuild(None, arguments, self.TEST_LOGGER)
+        self.assertEqual(tool.build(), 0)
+        self.assertEqual(tool.commits, [[0, 0, 1, 1], [2, 2, 3, 3], [4, 4]])
+        tool = BulkBuild(None, dict(arguments, flush_rows=None, flush_bytes=1), self.TEST_LOGGER)
+        tool.build()
+        self.assertEqual(len(tool.commits), 6)
+        self.assertEqual(tool.commits[-1], [])
+
+    def test_resume(self):
+        """
+        Tests that a resumed build skips the stocks of the last checkpoint
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            arguments = {
+                'signals': ['Ar'],
+                'stocks': ['ALL'],
+                'look_back': 40,
+                'checkpoint': os.path.join(directory, 'progress.json'),
+                'checkpoint_interval': 2
+            }
+            tool = FailingBuild(None, arguments, self.TEST_LOGGER)
+            self.assertRaises(RuntimeError, tool.build)
+            self.assertEqual(tool.commits, [[0, 1]])
+            with open(arguments['checkpoint']) as progress_file:
+                progress = json.load(progress_file)
+            self.assertEqual(progress["stocks"], [0, 1])
+            tool = FailingBuild(None, dict(arguments, resume=True), self.TEST_LOGGER)
+            self.assertEqual(tool.build(), 0)
+            self.assertEqual(sorted(tool.results), [2, 3, 4])
+            self.assertEqual(tool.generation, progress["generation"])
+            self.assertFalse(os.path.isfile(arguments['checkpoint']))
+
+
+if __name__ == '__main__':
+    unittest.main()
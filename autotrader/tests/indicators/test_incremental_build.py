@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import datetime
+import unittest
+
+from autotrader.base.trader_base import TraderBase
+from autotrader.tool.indicators.build_indicators_full import BuildIndicators
+
+
+class TestIncrementalBuild(unittest.TestCase):
+    """
+    Tests the selection of stocks of the incremental full build
+    """
+
+    def test_needs_build(self):
+        """
+        Tests new bars, corrected bars, old builds and naive dates
+        """
+        now = datetime.datetime.now(TraderBase.get_timezone())
+        oldest = now - datetime.timedelta(days=7)
+        bar_date = datetime.datetime(2026, 10, 16)
+        build = (now - datetime.timedelta(days=1), bar_date, 250)
+        names = ['A', 'B']
+        self.assertTrue(BuildIndicators.needs_build({}, names, (bar_date, 250), oldest))
+        self.assertFalse(BuildIndicators.needs_build({'A': build, 'B': build}, names,
+                                                     (bar_date, 250), oldest))
+        # new selected indicator
+        self.assertTrue(BuildIndicators.needs_build({'A': build}, names, (bar_date, 250),
+                                                    oldest))
+        # new bar
+        self.assertTrue(BuildIndicators.needs_build(
+            {'A': build}, ['A'], (bar_date + datetime.timedelta(days=1), 251), oldest))
+        # corrected bar in the past
+        self.assertTrue(BuildIndicators.needs_build({'A': build}, ['A'], (bar_date, 251),
+                                                    oldest))
+        # build of an older version without series state
+        self.assertTrue(BuildIndicators.needs_build({'A': build, 'B': (build[0], None, None)},
+                                                    names, (bar_date, 250), oldest))
+        old_build = (now - datetime.timedelta(days=8), bar_date, 250)
+        self.assertTrue(BuildIndicators.needs_build({'A': build, 'B': old_build}, names,
+                                                    (bar_date, 250), oldest))
+        naive_build = (build[0].replace(tzinfo=None), bar_date, 250)
+        self.assertFalse(BuildIndicators.needs_build({'A': naive_build}, ['A'],
+                                                     (bar_date, 250), oldest))
+
+
+if __name__ == '__main__':
+    unittest.main()
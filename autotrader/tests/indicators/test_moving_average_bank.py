@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import logging
+import unittest
+
+import numpy as np
+import tulipy as ti
+
+from autotrader.indicators.averages.ema_cross_signal import EmaCrossSignal
+from autotrader.indicators.moving_average_bank import sma_bank, ema_bank
+from autotrader.tests.indicators.test_base import TestBase
+
+
+class TestMovingAverageBank(unittest.TestCase):
+    """
+    Tests the moving averages for many windows
+    """
+
+    TEST_LOGGER = logging.getLogger()
+    TEST_LOGGER.setLevel(logging.WARNING)
+
+    def test_equal_to_tulipy(self):
+        """
+        Tests that every row is equal to the tulipy result
+        """
+        values = TestBase.get_random_bars(size=120)[:, 1].astype('float64')
+        windows = np.arange(1, 121)
+        sma = sma_bank(values, windows)
+        ema = ema_bank(values, windows)
+        for row, window in enumerate(windows):
+            np.testing.assert_array_equal(sma[row, window - 1:], ti.sma(values, int(window)))
+            self.assertTrue(np.isnan(sma[row, :window - 1]).all())
+            np.testing.assert_array_equal(ema[row], ti.ema(values, int(window)))
+
+    def test_preload(self):
+        """
+        Tests that preloaded moving averages are used by the strategy
+        """
+        strategy = EmaCrossSignal(dict(EmaCrossSignal.ARGUMENTS), self.TEST_LOGGER)
+        strategy.set_bars(TestBase.get_random_bars())
+        strategy.prepare_primitives(np.asarray([[5, 10], [5, 200], [0, 20]]))
+        self.assertEqual(len(strategy.primitives), 3)
+        strategy.set_parameters((5, 20))
+        strategy.generate_signals()
+        self.assertEqual(strategy.primitives.misses, 0)
+        np.testing.assert_array_equal(strategy.get_primitive('ema', ('open',), 20),
+                                      ti.ema(strategy.open, 20))
+
+
+if __name__ == '__main__':
+    unittest.main()
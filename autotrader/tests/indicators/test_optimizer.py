@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import itertools
+import logging
+import unittest
+
+import numpy as np
+
+from autotrader.indicators.averages.moving_average_cross_signal import MovingAverageCrossSignal
+from autotrader.indicators.oscillators.stochastic import Stochastic
+from autotrader.indicators.trend.aroon_basic import AroonSignal
+from autotrader.indicators.trend.macd_histogram import MacdHistogramSignal
+from autotrader.tests.indicators.test_base import TestBase
+from autotrader.tool.indicators.optimizer import Optimizer
+
+
+class RecordingOptimizer(Optimizer):
+    """
+    Optimizer that records the scored arguments
+    """
+
+    def __init__(self, logger):
+        super(RecordingOptimizer, self).__init__(logger)
+        self.scored = []
+
+    def calc_profit_batch(self, strategy, stock_bars, optimizer_values, last_price=None):
+        self.scored.append(np.array(optimizer_values))
+        return super(RecordingOptimizer, self).calc_profit_batch(strategy, stock_bars,
+                                                                 optimizer_values, last_price)
+
+
+class TestOptimizer(unittest.TestCase):
+    """
+    Tests the optimizer with generated bars
+    """
+
+    TEST_LOGGER = logging.getLogger()
+    TEST_LOGGER.setLevel(logging.WARNING)
+
+    def check_batch(self, indicator_class, optimizer_values, threads=1):
+        """
+        Compares the batched optimizer with the serial optimizer
+        :param indicator_class: indicator to test
+        :param optimizer_values: list of arguments
+        :param threads: amount of threads of the batched optimizer
+        :return: nothing
+        """
+        for seed in range(3):
+            bars = TestBase.get_random_bars(seed=seed)
+            serial_optimizer = Optimizer(self.TEST_LOGGER)
+            serial = serial_optimizer.run_optimizer(
+                optimizer_values,
+                indicator_class(dict(indicator_class.ARGUMENTS), self.TEST_LOGGER),
+                bars)
+            batch_optimizer = Optimizer(self.TEST_LOGGER)
+            batch = batch_optimizer.run_optimizer_batch(
+                optimizer_values,
+                indicator_class(dict(indicator_class.ARGUMENTS), self.TEST_LOGGER),
+                bars,
+                batch_size=97,
+                threads=threads)
+            self.assertEqual(serial[0], batch[0])
+            self.assertEqual(tuple(serial[1]), tuple(batch[1]))
+            self.assertEqual(serial[2], batch[2])
+            self.assertEqual(serial_optimizer.top.get(), batch_optimizer.top.get())
+            self.assertEqual(batch_optimizer.top.get()[0][:2], (batch[0], batch[1]))
+
+    def test_batch_moving_average(self):
+        """
+        Tests the batch mode with the moving average cross signal
+        """
+        self.check_batch(MovingAverageCrossSignal, list(itertools.combinations(range(5, 40), 2)))
+
+    def test_batch_macd(self):
+        """
+        Tests the batch mode with arguments in wrong order
+        """
+        self.check_batch(MacdHistogramSignal, list(itertools.permutations(range(5, 20), 3)))
+
+    def test_batch_stochastic(self):
+        """
+        Tests the batch mode with the stochastic oscillator
+        """
+        self.check_batch(Stochastic, list(itertools.product(range(3, 12), repeat=3)))
+
+    def test_batch_threads(self):
+        """
+        Tests that the thread pool finds the same arguments as the serial optimizer
+        """
+        self.check_batch(MovingAverageCrossSignal, list(itertools.combinations(range(5, 40), 2)),
+                         threads=3)
+        self.check_batch(AroonSignal, [(period,) for period in range(1, 60)], threads=4)
+        self.check_batch(Stochastic, list(itertools.product(range(3, 12), repeat=3)), threads=2)
+
+    def test_search(self):
+        """
+        Tests the coarse search and the successive halving against the grid search
+        """
+        for indicator_class in (MovingAverageCrossSignal, MacdHistogramSignal, Stochastic):
+            grid = indicator_class.PARAMETER_SPACE.get_grid(80)
+            for seed in range(3):
+                bars = TestBase.get_random_bars(seed=seed)
+                results = {}
+                for search in ('grid', 'coarse', 'halving'):
+                    optimizer = Optimizer(self.TEST_LOGGER)
+                    results[search] = optimizer.run_optimizer_search(
+                        grid,
+                        indicator_class(dict(indicator_class.ARGUMENTS), self.TEST_LOGGER),
+                        bars,
+                        search=search)
+                    if search != 'grid':
+                        self.assertLess(optimizer.evaluations, len(grid) / 2)
+                for search in ('coarse', 'halving'):
+                    self.assertLessEqual(results[search][0], results['grid'][0])
+                    self.assertIn(results[search][1], list(grid))
+                    self.assertEqual(results[search][2], results['grid'][2])
+                # a coarse grid with stride one is the grid
+                result = Optimizer(self.TEST_LOGGER).run_optimizer_search(
+                    grid,
+                    indicator_class(dict(indicator_class.ARGUMENTS), self.TEST_LOGGER),
+                    bars,
+                    search='coarse',
+                    stride=1)
+                self.assertEqual(result, results['grid'])
+
+    def test_sampling_search(self):
+        """
+        Tests the budget of the random and the parzen search
+        """
+        for indicator_class in (MovingAverageCrossSignal, Stochastic):
+            grid = indicator_class.PARAMETER_SPACE.get_grid(80)
+            bars = TestBase.get_random_bars(seed=1)
+            expected = Optimizer(self.TEST_LOGGER).run_optimizer_search(
+                grid, indicator_class(dict(indicator_class.ARGUMENTS), self.TEST_LOGGER), bars)
+            for search in ('random', 'parzen'):
+                results = []
+                for _ in range(2):
+                    optimizer = Optimizer(self.TEST_LOGGER)
+                    results.append(optimizer.run_optimizer_search(
+                        grid,
+                        indicator_class(dict(indicator_class.ARGUMENTS), self.TEST_LOGGER),
+                        bars,
+                        search=search,
+                        budget=100,
+                        seed=5))
+                    self.assertEqual(optimizer.evaluations, 100)
+                self.assertEqual(results[0], results[1])
+                self.assertLessEqual(results[0][0], expected[0])
+                self.assertIn(results[0][1], list(grid))
+                self.assertEqual(results[0][2], expected[2])
+            # a grid within budget is scored completely
+            result = Optimizer(self.TEST_LOGGER).run_optimizer_search(
+                grid,
+                indicator_class(dict(indicator_class.ARGUMENTS), self.TEST_LOGGER),
+                bars,
+                search='parzen',
+                budget=10 ** 6)
+            self.assertEqual(result, expected)
+
+    def test_warm_start(self):
+        """
+        Tests the warm start at the optimum and the fallback to the grid search
+        """
+        for indicator_class in (MovingAverageCrossSignal, MacdHistogramSignal):
+            grid = indicator_class.PARAMETER_SPACE.get_grid(80)
+            bars = TestBase.get_random_bars(seed=2)
+            expected = Optimizer(self.TEST_LOGGER).run_optimizer_search(
+                grid, indicator_class(dict(indicator_class.ARGUMENTS), self.TEST_LOGGER), bars)
+            optimizer = Optimizer(self.TEST_LOGGER)
+            result = optimizer.run_optimizer_warm_start(
+                grid, indicator_class(dict(indicator_class.ARGUMENTS), self.TEST_LOGGER), bars,
+                expected[1], threshold=expected[0])
+            self.assertEqual(result, expected)
+            self.assertLess(optimizer.evaluations, 400)
+            # a start far away from the optimum does not reach the threshold
+            start = list(grid)[-1]
+            optimizer = Optimizer(self.TEST_LOGGER)
+            result = optimizer.run_optimizer_warm_start(
+                grid, indicator_class(dict(indicator_class.ARGUMENTS), self.TEST_LOGGER), bars,
+                start, threshold=expected[0])
+            self.assertEqual(result, expected)
+            self.assertGreater(optimizer.evaluations, len(grid))
+            # unknown arguments are searched like a grid
+            result = Optimizer(self.TEST_LOGGER).run_optimizer_warm_start(
+                grid, indicator_class(dict(indicator_class.ARGUMENTS), self.TEST_LOGGER), bars,
+                (1, 2, 3, 4))
+            self.assertEqual(result, expected)
+
+    def test_time_budget(self):
+        """
+        Tests that an optimizer with a spent time budget returns the best result so far
+        """
+        for indicator_class in (MovingAverageCrossSignal, Stochastic):
+            grid = indicator_class.PARAMETER_SPACE.get_grid(80)
+            bars = TestBase.get_random_bars(seed=0)
+            expected = Optimizer(self.TEST_LOGGER).run_optimizer_search(
+                grid, indicator_class(dict(indicator_class.ARGUMENTS), self.TEST_LOGGER), bars)
+            # the coarse grid comes first and gives the same result without expiry
+            optimizer = Optimizer(self.TEST_LOGGER)
+            optimizer.set_time_budget(1000)
+            result = optimizer.run_optimizer_search(
+                grid, indicator_class(dict(indicator_class.ARGUMENTS), self.TEST_LOGGER), bars)
+            self.assertEqual(result, expected)
+            self.assertFalse(optimizer.truncated)
+            for search in Optimizer.SEARCH_MODES:
+                optimizer = Optimizer(self.TEST_LOGGER)
+                optimizer.set_time_budget(0)
+                result = optimizer.run_optimizer_search(
+                    grid, indicator_class(dict(indicator_class.ARGUMENTS), self.TEST_LOGGER),
+                    bars, search=search, budget=100)
+                # the random search scores its whole budget in the first block
+                self.assertEqual(optimizer.truncated, search != 'random')
+                self.assertIn(result[1], list(grid))
+                self.assertLessEqual(result[0], expected[0])
+                self.assertLessEqual(optimizer.evaluations, Optimizer.BATCH_SIZE)
+            # a spent budget in a coarse grid of several blocks keeps the status of the grid
+            optimizer = RecordingOptimizer(self.TEST_LOGGER)
+            optimizer.BATCH_SIZE = 8
+            optimizer.set_time_budget(0)
+            result = optimizer.run_optimizer_search(
+                grid, indicator_class(dict(indicator_class.ARGUMENTS), self.TEST_LOGGER), bars)
+            self.assertTrue(optimizer.truncated)
+            self.assertEqual(optimizer.evaluations, 8)
+            self.assertEqual(result[2], expected[2])
+            scored = np.concatenate(optimizer.scored)
+            self.assertIn(tuple(grid.get_last().tolist()), set(map(tuple, scored.tolist())))
+            # the scored arguments spread over the first dimension
+            self.assertGreaterEqual(len(set(scored[:, 0].tolist())), 3)
+        optimizer = Optimizer(self.TEST_LOGGER)
+        optimizer.set_time_budget(0)
+        optimizer.run_optimizer(list(itertools.combinations(range(5, 40), 2)),
+                                MovingAverageCrossSignal(dict(MovingAverageCrossSignal.ARGUMENTS),
+                                                         self.TEST_LOGGER),
+                                TestBase.get_random_bars(seed=0))
+        self.assertEqual(optimizer.evaluations, 1)
+
+    def test_search_mode(self):
+        """
+        Tests the selection of the search mode per strategy
+        """
+        self.assertEqual(Optimizer.get_search_mode(None, 'SO'), 'grid')
+        self.assertEqual(Optimizer.get_search_mode(['coarse'], 'SO'), 'coarse')
+        self.assertEqual(Optimizer.get_search_mode(['SO=halving', 'coarse'], 'SO'), 'halving')
+        self.assertEqual(Optimizer.get_search_mode(['SO=halving', 'coarse'], 'Macs'), 'coarse')
+        self.assertRaises(ValueError, Optimizer(self.TEST_LOGGER).run_optimizer_search,
+                          [], None, None, search='exhaustive')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import unittest
+
+import numpy as np
+
+from autotrader.indicators.parameter_space import ParameterSpace, Dimension
+from autotrader.tool.indicators.parameter_sampler import ParameterSampler, halton_points
+
+
+class TestParameterSampler(unittest.TestCase):
+    """
+    Tests the quasi-random and the Parzen sampling of parameter grids
+    """
+
+    def test_halton_points(self):
+        """
+        Tests the Halton sequence and its shift
+        """
+        points = halton_points(4, 2, seed=0)
+        shift = np.random.RandomState(0).random_sample(2)
+        expected = np.asarray([[1 / 2, 1 / 3], [1 / 4, 2 / 3], [3 / 4, 1 / 9], [1 / 8, 4 / 9]])
+        np.testing.assert_allclose(points, (expected + shift) % 1.0)
+        np.testing.assert_allclose(halton_points(2, 2, seed=0, start=2), points[2:])
+        self.assertRaises(ValueError, halton_points, 1, 11)
+
+    def test_sampling(self):
+        """
+        Tests that the samples are valid, unique and reproducible
+        """
+        space = ParameterSpace([Dimension('a', 1, 40), Dimension('b', 1, 40),
+                                Dimension('c', 1, 40)], [('a', '<', 'b'), ('b', '<', 'c')])
+        grid = space.get_grid(80)
+        samples = []
+        for _ in range(2):
+            sampler = ParameterSampler(grid, seed=3)
+            known = set()
+            rows = sampler.get_quasi_random(50, known)
+            profits = -np.abs(rows - 20).sum(axis=1).astype('float64')
+            rows = np.concatenate((rows, sampler.get_proposals(rows, profits, 30, known)))
+            self.assertEqual(rows.shape, (80, 3))
+            self.assertTrue(space.is_valid(rows).all())
+            self.assertEqual(len(set(map(tuple, rows.tolist()))), 80)
+            samples.append(rows)
+        np.testing.assert_array_equal(samples[0], samples[1])
+        # the proposals are closer to the best parameters than the quasi-random samples
+        distance = np.abs(samples[0] - 20).sum(axis=1)
+        self.assertLess(distance[50:].mean(), distance[:50].mean())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import itertools
+import logging
+import unittest
+
+import numpy as np
+
+import autotrader.indicators as ind
+from autotrader.indicators.parameter_space import ParameterSpace, Dimension
+from autotrader.tests.indicators.test_base import TestBase
+from autotrader.tool.indicators.optimizer import Optimizer
+
+
+class TestParameterSpace(unittest.TestCase):
+    """
+    Tests the declared parameter spaces of the strategies
+    """
+
+    TEST_LOGGER = logging.getLogger()
+    TEST_LOGGER.setLevel(logging.WARNING)
+
+    LOOK_BACK = 50
+
+    def get_legacy_values(self, indicator):
+        """
+        Returns the valid arguments of the former grids of the full build
+        :param indicator: strategy object
+        :return: list of arguments
+        """
+        if indicator.SHORT_NAME in ["SO", "SOM2", "SOM3"]:
+            values = itertools.product(range(3, int(self.LOOK_BACK / 2)), repeat=3)
+        else:
+            values = itertools.combinations(range(5, int(self.LOOK_BACK / 2)),
+                                            indicator.param_count)
+        valid_values = []
+        for value in values:
+            try:
+                indicator.set_parameters(value)
+            except ValueError:
+                continue
+            valid_values.append(value)
+        return valid_values
+
+    def test_legacy_grids(self):
+        """
+        Tests that the spaces contain the valid arguments of the former grids in same order
+        """
+        for indicator_class in ind.INDICATORS + [ind.Ema, ind.Kvo, ind.So2, ind.So3]:
+            indicator = indicator_class(dict(indicator_class.ARGUMENTS), self.TEST_LOGGER)
+            grid = indicator.PARAMETER_SPACE.get_grid(self.LOOK_BACK)
+            expected = self.get_legacy_values(indicator)
+            self.assertEqual(list(grid), expected)
+            self.assertEqual(len(grid), len(expected))
+
+    def test_blocks(self):
+        """
+        Tests block sizes, steps and bounds
+        """
+        space = ParameterSpace([Dimension('a', 1, 30, 2), Dimension('b', 0, 10)],
+                               [('a', '>=', 'b')])
+        grid = space.get_grid(self.LOOK_BACK)
+        blocks = list(grid.get_blocks(7))
+        self.assertTrue(all(block.shape[0] == 7 for block in blocks[:-1]))
+        rows = np.concatenate(blocks)
+        expected = [(a, b) for a in range(1, 30, 2) for b in range(10) if a >= b]
+        self.assertEqual([tuple(row) for row in rows.tolist()], expected)
+        self.assertRaises(ValueError, ParameterSpace, [Dimension('a', 1)], [('a', '!=', 'a')])
+
+    def test_refinement(self):
+        """
+        Tests the coarse grid and the neighbourhood of parameter sets
+        """
+        space = ParameterSpace([Dimension('a', 1, 30), Dimension('b', 0, 10, 2)],
+                               [('a', '>=', 'b')])
+        grid = space.get_grid(self.LOOK_BACK)
+        coarse = grid.get_coarse(3)
+        self.assertEqual(list(coarse), [(a, b) for a in range(1, 30, 3) for b in range(0, 10, 6)
+                                        if a >= b])
+        neighbours = grid.get_neighbours(np.asarray([[1, 0], [6, 4]]), 1)
+        cubes = set(itertools.product(range(1, 3), range(0, 4, 2))) | \
+            set(itertools.product(range(5, 8), range(2, 8, 2)))
+        expected = sorted((a, b) for a, b in cubes if a >= b)
+        self.assertEqual([tuple(row) for row in neighbours.tolist()], expected)
+        self.assertEqual(tuple(grid.get_last()), (29, 8))
+
+    def test_optimizer(self):
+        """
+        Tests that the optimizer finds the same result with the space and the former grid
+        """
+        bars = TestBase.get_random_bars(seed=2)
+        for indicator_class in (ind.Macs, ind.So):
+            indicator = indicator_class(dict(indicator_class.ARGUMENTS), self.TEST_LOGGER)
+            legacy = Optimizer(self.TEST_LOGGER).run_optimizer_batch(
+                self.get_legacy_values(indicator), indicator, bars)
+            result = Optimizer(self.TEST_LOGGER).run_optimizer_batch(
+                indicator.PARAMETER_SPACE.get_grid(self.LOOK_BACK), indicator, bars)
+            self.assertEqual(legacy, result)
+
+
+if __name__ == '__main__':
+    unittest.main()
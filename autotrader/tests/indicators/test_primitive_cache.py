@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import itertools
+import logging
+import unittest
+
+import numpy as np
+import tulipy as ti
+
+from autotrader.indicators.averages.moving_average_cross_signal import MovingAverageCrossSignal
+from autotrader.indicators.trend.macd_histogram import MacdHistogramSignal
+from autotrader.tests.indicators.test_base import TestBase
+
+
+class TestPrimitiveCache(unittest.TestCase):
+    """
+    Tests the shared building blocks of indicators
+    """
+
+    TEST_LOGGER = logging.getLogger()
+    TEST_LOGGER.setLevel(logging.WARNING)
+
+    def test_shared_moving_averages(self):
+        """
+        Tests that every moving average is calculated once per bar set
+        """
+        strategy = MovingAverageCrossSignal(dict(MovingAverageCrossSignal.ARGUMENTS),
+                                            self.TEST_LOGGER)
+        strategy.set_bars(TestBase.get_random_bars())
+        for parameters in itertools.combinations(range(5, 15), 2):
+            strategy.set_parameters(parameters)
+            strategy.generate_signals()
+        self.assertEqual(strategy.primitives.misses, 10)
+        self.assertEqual(len(strategy.primitives), 10)
+        strategy.set_bars(TestBase.get_random_bars(seed=1))
+        self.assertEqual(len(strategy.primitives), 0)
+        np.testing.assert_array_equal(strategy.get_primitive('sma', ('open',), 5),
+                                      ti.sma(strategy.open, 5))
+
+    def test_macd_composition(self):
+        """
+        Tests that the macd composed of cached emas equals the tulipy macd
+        """
+        strategy = MacdHistogramSignal(dict(MacdHistogramSignal.ARGUMENTS), self.TEST_LOGGER)
+        strategy.set_bars(TestBase.get_random_bars())
+        for parameters in itertools.permutations(range(2, 30, 3), 3):
+            try:
+                strategy.set_parameters(parameters)
+                expected = ti.macd(strategy.open, *parameters)
+            except ValueError:
+                continue
+            for result, value in zip(strategy.get_indicators(), expected):
+                np.testing.assert_array_equal(result, value)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import logging
+import os
+import tempfile
+import unittest
+
+from autotrader.tests.indicators.test_base import TestBase
+from autotrader.tool.indicators.build_indicators_full import BuildIndicators
+from autotrader.tool.indicators.result_cache import ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+    """
+    Tests the persistent cache of optimizer results
+    """
+
+    TEST_LOGGER = logging.getLogger()
+    TEST_LOGGER.setLevel(logging.WARNING)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'results.db')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_eviction(self):
+        """
+        Tests that the least recently used results are removed above the size cap
+        """
+        cache = ResultCache(self.path, max_entries=2)
+        cache.put('a', {'profit': 1.0})
+        cache.put('b', {'profit': 2.0})
+        self.assertEqual(cache.get('a'), {'profit': 1.0})
+        cache.put('c', {'profit': 3.0})
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), {'profit': 3.0})
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        cache.close()
+
+    def test_persistence(self):
+        """
+        Tests that results and their usage survive a new cache object
+        """
+        cache = ResultCache(self.path, max_entries=2)
+        cache.put('a', {'plot': b'abc', 'parameters': (3, 4)})
+        cache.put('b', {'plot': b'def', 'parameters': (5, 6)})
+        cache.get('a')
+        cache.close()
+        cache = ResultCache(self.path, max_entries=2)
+        cache.put('c', {})
+        self.assertEqual(cache.get('a'), {'plot': b'abc', 'parameters': (3, 4)})
+        self.assertIsNone(cache.get('b'))
+        cache.close()
+
+    def test_fingerprint(self):
+        """
+        Tests that the fingerprint changes with the bars
+        """
+        bars = TestBase.get_random_bars(size=50, seed=1)
+        fingerprint = ResultCache.get_fingerprint(bars)
+        self.assertEqual(fingerprint, ResultCache.get_fingerprint(bars.copy()))
+        bars[-1, 0] += 0.01
+        self.assertNotEqual(fingerprint, ResultCache.get_fingerprint(bars))
+        self.assertNotEqual(ResultCache.get_key(1, 'A', fingerprint),
+                            ResultCache.get_key(2, 'A', fingerprint))
+
+    def test_warm_start_key(self):
+        """
+        Tests that the cache key changes with the stored optimum of a warm start
+        """
+        tool = BuildIndicators({'degiro': {'user': None, 'pw': None}},
+                               {'signals': ['Ar'], 'stocks': ['ALL'], 'look_back': 40,
+                                'cache': self.path}, self.TEST_LOGGER)
+        arguments = {
+            "stock_id": 1,
+            "stock_index": "TEST",
+            "stock_symbol": "S1",
+            "stock_bars": TestBase.get_random_bars(size=60, seed=1)
+        }
+        keys = set()
+        for optima in ({}, {'AroonSignal': {'parameters': [14], 'profit': 0.1}},
+                       {'AroonSignal': {'parameters': [20], 'profit': 0.1}},
+                       {'AroonSignal': {'parameters': [20], 'profit': 0.2}}):
+            keys.add(tool.get_task(dict(arguments, optima=optima))["cache_keys"]['AroonSignal'])
+        self.assertEqual(len(keys), 4)
+        tool.cache.close()
+
+    def test_cached_task(self):
+        """
+        Tests that the full build reuses the cached results of a task
+        """
+        settings = {'signals': ['Ar', 'SO'], 'look_back': 40}
+        task = {
+            "stock_index": "TEST",
+            "stock_symbol": "S1",
+            "stock_bars": TestBase.get_random_bars(size=60, seed=1)
+        }
+        results = BuildIndicators.compute_task(settings, task, self.TEST_LOGGER)
+        self.assertEqual(len(results), 2)
+        task["cached"] = {results[0]["name"]: results[0]}
+        cached_results = BuildIndicators.compute_task(settings, task, self.TEST_LOGGER)
+        self.assertTrue(cached_results[0]["cached"])
+        self.assertNotIn("cached", cached_results[1])
+        self.assertEqual(dict(cached_results[0], cached=False), dict(results[0], cached=False))
+        self.assertEqual(cached_results[1], results[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
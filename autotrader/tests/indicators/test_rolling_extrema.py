@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import unittest
+
+import numpy as np
+import tulipy as ti
+
+from autotrader.indicators.oscillators.stochastic import Stochastic
+from autotrader.indicators.rolling_extrema import rolling_extrema, raw_stochastic_bank, \
+    aroon_bank
+from autotrader.tests.indicators.test_base import TestBase
+
+
+class TestRollingExtrema(unittest.TestCase):
+    """
+    Tests the rolling extrema engine
+    """
+
+    @staticmethod
+    def get_prices(seed):
+        """
+        Returns rounded prices with many equal values
+        :param seed: seed of random generator
+        :return: high, low and close prices
+        """
+        bars = TestBase.get_random_bars(size=90, seed=seed)
+        return [np.round(bars[:, column].astype('float64')) for column in (3, 4, 0)]
+
+    def test_extrema(self):
+        """
+        Tests the deque against a search in every window
+        """
+        values = self.get_prices(0)[0]
+        windows = np.arange(1, 30)
+        maxima, max_positions = rolling_extrema(values, windows, True)
+        minima, min_positions = rolling_extrema(values, windows, False)
+        for row, window in enumerate(windows):
+            for index in range(values.size):
+                start = max(0, index - window + 1)
+                part = values[start:index + 1]
+                self.assertEqual(maxima[row, index], part.max())
+                self.assertEqual(minima[row, index], part.min())
+                # equal values are resolved to the latest position
+                self.assertEqual(max_positions[row, index],
+                                 start + part.size - 1 - np.argmax(part[::-1]))
+                self.assertEqual(min_positions[row, index],
+                                 start + part.size - 1 - np.argmin(part[::-1]))
+
+    def test_aroon(self):
+        """
+        Tests that the aroon rows are equal to ti.aroon
+        """
+        for seed in range(3):
+            high, low, _ = self.get_prices(seed)
+            periods = np.arange(1, high.size)
+            aroon_down, aroon_up = aroon_bank(high, low, periods)
+            for row, period in enumerate(periods):
+                expected_down, expected_up = ti.aroon(high, low, int(period))
+                np.testing.assert_array_equal(aroon_down[row, period:], expected_down)
+                np.testing.assert_array_equal(aroon_up[row, period:], expected_up)
+
+    def test_stochastic(self):
+        """
+        Tests that the smoothed fast %K is equal to ti.stoch
+        """
+        for seed in range(3):
+            high, low, close = self.get_prices(seed)
+            periods = np.arange(1, 20)
+            raw_bank = raw_stochastic_bank(high, low, close, periods)
+            for row, period in enumerate(periods):
+                for slowing in range(1, 8):
+                    for d_period in range(1, 8):
+                        expected_k, expected_d = ti.stoch(high, low, close, int(period),
+                                                          slowing, d_period)
+                        stoch_k, stoch_d = Stochastic.smooth(raw_bank[row], int(period),
+                                                             slowing, d_period)
+                        np.testing.assert_array_equal(stoch_k, expected_k)
+                        np.testing.assert_array_equal(stoch_d, expected_d)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import itertools
+import logging
+import unittest
+
+from autotrader.indicators.averages.ema_cross_signal import EmaCrossSignal
+from autotrader.indicators.averages.moving_average_cross_signal import MovingAverageCrossSignal
+from autotrader.indicators.averages.triple_moving_average_cross_signal import \
+    TripleMovingAverageCrossSignal
+from autotrader.indicators.oscillators.kvo import Kvo
+from autotrader.indicators.oscillators.stochastic import Stochastic
+from autotrader.indicators.oscillators.stochastic_m_2 import StochasticM2
+from autotrader.indicators.oscillators.stochastic_m_3 import StochasticM3
+from autotrader.indicators.oscillators.ultimate_oscillator_cross_ema import \
+    UltimateOscillatorCrossEma
+from autotrader.indicators.trend.aroon_basic import AroonSignal
+from autotrader.indicators.trend.macd_histogram import MacdHistogramSignal
+from autotrader.tests.indicators.test_base import TestBase
+from autotrader.tool.indicators.back_testing import BackTesting
+
+
+class TestScoreKernels(unittest.TestCase):
+    """
+    Tests the compiled score kernels against generated signals
+    """
+
+    TEST_LOGGER = logging.getLogger()
+    TEST_LOGGER.setLevel(logging.WARNING)
+
+    def check_score(self, indicator_class, optimizer_values):
+        """
+        Compares the score of each argument with the back test of the generated signal
+        :param indicator_class: indicator to test
+        :param optimizer_values: list of arguments
+        :return: nothing
+        """
+        optimizer_values = list(optimizer_values)
+        for seed in range(2):
+            strategy = indicator_class(dict(indicator_class.ARGUMENTS), self.TEST_LOGGER)
+            strategy.set_bars(TestBase.get_random_bars(seed=seed))
+            for optimizer_value in optimizer_values:
+                try:
+                    strategy.set_parameters(optimizer_value)
+                except ValueError:
+                    continue
+                try:
+                    signal = strategy.generate_signals()
+                except ValueError:
+                    self.assertRaises(ValueError, strategy.score, BackTesting.ARGUMENTS)
+                    continue
+                total = BackTesting(None, strategy, signal).backtest_portfolio_value()
+                profit, status = strategy.score(BackTesting.ARGUMENTS)
+                self.assertEqual(profit, total / BackTesting.ARGUMENTS['initial_capital'] - 1)
+                self.assertEqual(status, strategy.get_status(signal))
+
+    def test_cross(self):
+        """
+        Tests the strategies with crossing series
+        """
+        self.check_score(MovingAverageCrossSignal, itertools.permutations(range(3, 40, 3), 2))
+        self.check_score(EmaCrossSignal, itertools.combinations(range(3, 40, 3), 2))
+        self.check_score(AroonSignal, [(period,) for period in range(1, 90, 4)])
+        self.check_score(MacdHistogramSignal,
+                         [(12, 26, 9)] + list(itertools.permutations(range(2, 30, 4), 3)))
+        self.check_score(UltimateOscillatorCrossEma,
+                         itertools.combinations(range(3, 40, 4), 2))
+
+    def test_triple(self):
+        """
+        Tests the triple moving average cross
+        """
+        self.check_score(TripleMovingAverageCrossSignal,
+                         itertools.permutations(range(3, 40, 5), 3))
+
+    def test_oscillators(self):
+        """
+        Tests the oscillator strategies
+        """
+        self.check_score(Kvo, itertools.permutations(range(2, 30, 4), 3))
+        for indicator_class in (Stochastic, StochasticM2, StochasticM3):
+            self.check_score(indicator_class, itertools.product(range(1, 15, 3), repeat=3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import unittest
+
+import numpy as np
+
+from autotrader.tool.indicators.top_results import TopResults
+
+
+class TestTopResults(unittest.TestCase):
+    """
+    Tests the heap of the best optimizer results
+    """
+
+    def test_push(self):
+        """
+        Tests order, ties, duplicates and the bound of the heap
+        """
+        top = TopResults(3)
+        top.push(0.1, (5, 6), 1)
+        top.push(0.3, (5, 7), 2)
+        top.push(0.1, (5, 8), -1)
+        top.push(0.3, (5, 7), 2)
+        top.push(float('nan'), (5, 9), 0)
+        top.push(0.2, (6, 7), 0)
+        self.assertEqual(top.get(), [(0.3, (5, 7), 2), (0.2, (6, 7), 0), (0.1, (5, 6), 1)])
+        top.push(0.1, (6, 8), 0)
+        self.assertEqual(len(top), 3)
+        top.push(0.4, (7, 8), 1)
+        self.assertEqual(top.get(), [(0.4, (7, 8), 1), (0.3, (5, 7), 2), (0.2, (6, 7), 0)])
+        self.assertEqual(TopResults(0).get(), [])
+
+    def test_push_block(self):
+        """
+        Tests that blocks give the same results as single pushes
+        """
+        random = np.random.RandomState(0)
+        rows = random.randint(0, 20, size=(200, 2))
+        profits = np.round(random.normal(size=200), 1)
+        status_codes = random.randint(-2, 3, size=200)
+        valid = random.random_sample(200) > 0.2
+        single = TopResults(10)
+        block = TopResults(10)
+        for start in range(0, 200, 64):
+            end = start + 64
+            block.push_block(rows[start:end], profits[start:end], status_codes[start:end],
+                             valid[start:end])
+        for idx in range(200):
+            if valid[idx]:
+                single.push(profits[idx], rows[idx], status_codes[idx])
+        self.assertEqual(block.get(), single.get())
+        self.assertEqual(len(block), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
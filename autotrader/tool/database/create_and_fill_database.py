@@ -17,6 +17,7 @@
 """
 import logging
 from autotrader.broker.degiro.degiro_data_helper import DegiroDataHelper
+from autotrader.datasource.database.bar_store import BAR_STORE
 from autotrader.datasource.database.stock_schema import Stock, Exchange, Index, LookupTable, Region
 from autotrader.datasource.webull_client import WeBullClient
 from autotrader.datasource.yahoo_finance_client import YahooFinanceClient
@@ -52,6 +53,8 @@ class CreateAndFillDataBase:
         if self.drop_data:
             self.db_tool.drop()
             self.db_tool.create()
+            # the ids of the new stocks do not match the stored bars
+            BAR_STORE.clear()
         self.db_tool.connect()
         self.client.read_config()
 
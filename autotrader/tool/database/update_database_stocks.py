@@ -21,6 +21,8 @@ from dateutil.relativedelta import relativedelta
 from sqlalchemy import desc
 from sqlalchemy.exc import SQLAlchemyError
 
+from autotrader.datasource.database.bar_cache import BAR_CACHE
+from autotrader.datasource.database.bar_store import BAR_STORE
 from autotrader.datasource.database.stock_schema import Stock, JsonData, Exchange, Series, Index, \
     Tag, LookupTable
 from autotrader.datasource.webull_client import WeBullClient
@@ -253,6 +255,9 @@ class UpdateDataBaseStocks:
                     else:
                         self.logger.debug("Ignore data of stock %s. Already exists", series)
             self.db_tool.commit()
+            # cached bars of the stock miss the new series
+            BAR_CACHE.invalidate(stock)
+            self.__update_bar_store(stock)
 
     def __update_indices(self):
         yah = YahooFinanceClient(self.logger)
@@ -275,6 +280,21 @@ class UpdateDataBaseStocks:
                     else:
                         self.logger.debug("Ignore data of stock %s. Already exists", series)
             self.db_tool.commit()
+            BAR_CACHE.invalidate(index)
+            self.__update_bar_store(index)
+
+    def __update_bar_store(self, item):
+        """
+        Appends the new series to the local bar store. Items without stored bars are stored
+        when they are read the first time.
+        :param item: stock or index
+        :return: nothing
+        """
+        if not BAR_STORE.path:
+            return
+        for resolution in self.arguments['resolutions']:
+            if BAR_STORE.has_bars(item, resolution):
+                item.update_bar_store(resolution)
 
     def __add_missing_indices(self):
         my_indices_in_config = self.config['autotrader']['indices'].split(',')
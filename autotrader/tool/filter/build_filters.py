@@ -19,7 +19,8 @@ import datetime
 import logging
 
 from autotrader.base.trader_base import TraderBase
-from autotrader.datasource.database.stock_schema import BARS_NUMPY, Filter, Stock
+from autotrader.datasource.database.bar_prefetch import BarPrefetch
+from autotrader.datasource.database.stock_schema import Filter, Stock
 from autotrader.filter.adx_filter import AdxFilter
 from autotrader.filter.base_filter import BaseFilter
 from autotrader.filter.rsi_filter import RsiFilter
@@ -244,12 +245,12 @@ class BuildFilters:
         :return: nothing
         """
         rc = 0
-        for stock in self.stocks:
+        for stock, bars in self.__iterate_bars():
             self.logger.info("Analyse %s:%s", stock.indices[0].symbol, stock.symbol)
             for my_filter in self.filters:
                 try:
                     self.logger.info("Execute filter %s", my_filter.name)
-                    self.__build(my_filter, stock)
+                    self.__build(my_filter, stock, bars)
                 except TypeError:
                     self.logger.exception("Filter {} causes exceptions.".format(my_filter.name))
                     rc += 1
@@ -258,10 +259,23 @@ class BuildFilters:
         self.db_tool.commit()
         return rc
 
-    def __build(self, my_filter, stock):
-        bars = stock.get_bars(my_filter.look_back_date(), datetime.datetime.now(),
-                              output_type=BARS_NUMPY)
-        if my_filter.look_back_date() is None or bars.size:
+    def __iterate_bars(self):
+        """
+        Iterates over the stocks with the bars of the longest look back of all filters
+        :return: generator of tuples with stock and typed bars or None
+        """
+        starts = [my_filter.look_back_date() for my_filter in self.filters]
+        starts = [start for start in starts if start is not None]
+        if not starts:
+            return ((stock, None) for stock in self.stocks)
+        prefetch = BarPrefetch(self.db_tool.session, min(starts), datetime.datetime.now())
+        return prefetch.iterate(list(self.stocks))
+
+    def __build(self, my_filter, stock, stock_bars):
+        start = my_filter.look_back_date()
+        # each filter gets its own window of the prefetched bars
+        bars = None if start is None else stock_bars.get_window(start=start)
+        if start is None or bars.size:
             my_filter.set_bars(bars)
             my_filter.set_stock(stock)
             strategy_status = my_filter.analyse()
@@ -17,7 +17,9 @@
 """
 import numpy as np
 import matplotlib.pyplot as plt
-from numba import jit
+
+from autotrader.indicators.backtest_kernels import backtest_equity_curve, backtest_final_value, \
+    backtest_matrix
 
 
 class BackTesting:
@@ -32,13 +34,15 @@ class BackTesting:
     initial_capital - The amount in cash at the start of the portfolio.
     """
 
+    ARGUMENTS = {
+        'initial_capital': 100000.0,
+        'commission_rate': 2.,
+        'commission_rate_prc': 0.004
+    }
+
     def __init__(self, symbol, strategy, signal, arguments=None):
         if arguments is None:
-            arguments = {
-                'initial_capital': 100000.0,
-                'commission_rate': 2.,
-                'commission_rate_prc': 0.004
-            }
+            arguments = dict(self.ARGUMENTS)
         self.arguments = arguments
         self.symbol = symbol
         self.strategy = strategy
@@ -50,42 +54,47 @@ class BackTesting:
         :param plot_result: plot portfolio if true
         :return:
         """
-        initial_capital = float(self.arguments['initial_capital'])
-        commission_rate = float(self.arguments['commission_rate'])
-        commission_rate_prc = float(self.arguments['commission_rate_prc'])
-        wallet = np.full(self.strategy.signal.shape, initial_capital)
-        portfolio = np.full(self.strategy.signal.shape, 0.0)
-
-        total = self.__backtest_portfolio(wallet,
-                                          portfolio,
-                                          self.strategy.open,
-                                          self.signal,
-                                          self.strategy.signal_shift,
-                                          commission_rate,
-                                          commission_rate_prc
-                                          )
+        total = backtest_equity_curve(self.strategy.open,
+                                      self.signal,
+                                      self.strategy.signal_shift,
+                                      float(self.arguments['initial_capital']),
+                                      float(self.arguments['commission_rate']),
+                                      float(self.arguments['commission_rate_prc'])
+                                      )
         if plot_result:
             self.plot(total)
         return total
 
-    @staticmethod
-    @jit(nopython=True)
-    def __backtest_portfolio(wallet, portfolio, price, signal, signal_offset, commission_rate,
-                             commission_rate_prc):
-        position = 0
-        for index in range(signal.shape[0]):
-            if signal[index] == 1:
-                position = int(wallet[index]/price[index+signal_offset])
-                wallet[index:] -= price[index+signal_offset] * position * \
-                    (1 + commission_rate_prc) - commission_rate
-                portfolio[index:] += price[index+signal_offset] * position
-            if signal[index] == -1:
-                wallet[index:] += price[index+signal_offset] * position * \
-                                  (1 - commission_rate_prc) - commission_rate
-                portfolio[index:] = 0
-                position = 0
-        total = portfolio+wallet
-        return total
+    def backtest_portfolio_value(self):
+        """
+        Calculate the portfolio value at the end of the signal without building the equity curve
+        :return: last portfolio value
+        """
+        return backtest_final_value(self.strategy.open,
+                                    self.signal,
+                                    self.strategy.signal_shift,
+                                    float(self.arguments['initial_capital']),
+                                    float(self.arguments['commission_rate']),
+                                    float(self.arguments['commission_rate_prc'])
+                                    )
+
+    def backtest_portfolio_matrix(self, signal_shifts, valid=None):
+        """
+        Calculate the possible earnings for a signal matrix with one signal per row.
+        :param signal_shifts: start index of the signal in each row
+        :param valid: mask of rows to calculate. All rows if None.
+        :return: profit and status of each row
+        """
+        if valid is None:
+            valid = np.ones(self.signal.shape[0], dtype='bool')
+        return backtest_matrix(self.strategy.open,
+                               self.signal,
+                               signal_shifts,
+                               valid,
+                               float(self.arguments['initial_capital']),
+                               float(self.arguments['commission_rate']),
+                               float(self.arguments['commission_rate_prc'])
+                               )
 
     def plot(self, total):
         """
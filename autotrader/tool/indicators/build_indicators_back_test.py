@@ -18,7 +18,7 @@
 import logging
 from datetime import date, datetime, timedelta
 from autotrader.tool.indicators.build_indicators_quick import BuildIndicatorsQuick
-from autotrader.datasource.database.stock_schema import BARS_NUMPY, Stock, LookupTable
+from autotrader.datasource.database.stock_schema import Stock, LookupTable
 
 
 class BuildIndicatorsBackTest(BuildIndicatorsQuick):
@@ -42,13 +42,7 @@ class BuildIndicatorsBackTest(BuildIndicatorsQuick):
         return stock.get_bars(datetime.combine(date.today(), datetime.min.time()),
                               datetime.combine(date.today(), datetime.max.time()))
 
-    def get_bars(self, stock, data_size_days):
-        if stock and data_size_days:
-            my_bars = stock.get_bars(
-                start=datetime.now() + timedelta(days=-data_size_days),
-                end=datetime.now() + timedelta(days=-1),
-                output_type=BARS_NUMPY
-            )
-            return my_bars
-        return None
+    def get_bar_range(self, data_size_days):
+        return datetime.now() + timedelta(days=-data_size_days), \
+            datetime.now() + timedelta(days=-1)
 
@@ -15,9 +15,26 @@
  See the License for the specific language governing permissions and
  limitations under the License.
 """
+import json
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED, ALL_COMPLETED
 from datetime import datetime, timedelta
-from autotrader.datasource.database.stock_schema import BARS_NUMPY
+from autotrader.datasource.database.bar_prefetch import BarPrefetch
+from autotrader.datasource.database.stock_schema import BARS_TYPED
+from autotrader.tool.indicators.optimizer import Optimizer
+
+
+def compute_work_item(builder_class, settings, task, logger_name):
+    """
+    Entry point of the worker processes in parallel mode
+    :param builder_class: class of indicator build tool
+    :param settings: settings of indicator build tool
+    :param task: picklable task of one stock
+    :param logger_name: name of logger
+    :return: result of compute_task
+    """
+    return builder_class.compute_task(settings, task, logging.getLogger(logger_name))
 
 
 class BuildIndicatorsBase:
@@ -25,6 +42,12 @@ class BuildIndicatorsBase:
     A base class for a Tool to build indicators with optimized arguments.
     """
 
+    # amount of stocks between two checkpoints
+    CHECKPOINT_INTERVAL = 50
+    # maximal amount of rows and plot bytes in bulk data storage before they are committed
+    FLUSH_ROWS = 20000
+    FLUSH_BYTES = 64 * 1024 * 1024
+
     def __init__(self, config, arguments, logger: logging.Logger):
         self.signal_to_builds = arguments['signals']
         self.look_back = arguments['look_back']
@@ -33,6 +56,23 @@ class BuildIndicatorsBase:
         self.logger = logger
         self.client = None
         self.arguments = arguments
+        self.checkpoint = arguments.get('checkpoint')
+        self.checkpoint_interval = arguments.get('checkpoint_interval') or \
+            self.CHECKPOINT_INTERVAL
+        self.flush_rows = arguments.get('flush_rows') or self.FLUSH_ROWS
+        self.flush_bytes = arguments.get('flush_bytes') or self.FLUSH_BYTES
+        # ids of stocks that are committed in the current build generation
+        self.completed = set()
+        # ids of stocks that are stored in bulk data storage but not committed
+        self.uncommitted = []
+        self.generation = None
+        self.reset_bulk_data_storage()
+
+    def reset_bulk_data_storage(self):
+        """
+        Empties the bulk data storage after a commit
+        :return: nothing
+        """
         self.bulk_data_storage = {
             "parameter": [],
             "plot": [],
@@ -56,22 +96,228 @@ class BuildIndicatorsBase:
 
     def build(self):
         """
-        Start indicator build in serial mode
+        Start indicator build in serial mode or in parallel mode if more than one job is given
         :return:
         """
+        jobs = int(self.arguments.get('jobs') or 1)
+        if jobs > 1:
+            return self.build_parallel(jobs)
         return_code = 0
         self.logger.info("Start indicator build in serial mode")
-        for arguments in self.work_generator():
+        self.load_progress()
+        for arguments in self.get_work():
             return_code += self.build_indicator(arguments)
-        self.commit_work_result()
+            self.set_stock_done(arguments.get("stock_id"))
+        self.finish_build()
         return return_code
 
-    def build_indicator(self, arguments):
+    def build_parallel(self, jobs):
+        """
+        Start indicator build in parallel mode. The stocks are computed by a pool of processes
+        and every free process takes the next stock. The results are stored and committed by
+        this process.
+        :param jobs: amount of processes
+        :return:
+        """
+        return_code = 0
+        self.logger.info("Start indicator build in parallel mode with %s processes" % jobs)
+        settings = self.get_settings()
+        pending = {}
+        self.load_progress()
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for arguments in self.get_work():
+                task = self.get_task(arguments)
+                if task is None:
+                    self.set_stock_done(arguments.get("stock_id"))
+                    continue
+                future = executor.submit(compute_work_item, type(self), settings, task,
+                                         self.logger.name)
+                pending[future] = (arguments.get("stock_id"), task)
+                # keep the queue short so the bars of all stocks are not loaded at once
+                if len(pending) >= 2 * jobs:
+                    return_code += self.__store_done(pending, FIRST_COMPLETED)
+            return_code += self.__store_done(pending, ALL_COMPLETED)
+        self.finish_build()
+        return return_code
+
+    def __store_done(self, pending, return_when):
+        """
+        Waits for computed tasks and stores their results
+        :param pending: dictionary with futures and tuples of stock id and task
+        :param return_when: FIRST_COMPLETED or ALL_COMPLETED
+        :return: sum of return codes
+        """
+        return_code = 0
+        done, _ = wait(pending, return_when=return_when)
+        for future in done:
+            stock_id, task = pending.pop(future)
+            return_code += self.store_result(task, future.result())
+            self.set_stock_done(stock_id)
+        return return_code
+
+    def get_work(self):
+        """
+        Returns the arguments of work_generator without the completed stocks
+        :return: generator of dictionaries with arguments
+        """
+        for arguments in self.work_generator():
+            if arguments.get("stock_id") in self.completed:
+                continue
+            yield arguments
+
+    def load_progress(self):
+        """
+        Starts a new build generation or continues the generation of the progress file if
+        the build is resumed with the same settings
+        :return: nothing
+        """
+        self.completed = set()
+        self.uncommitted = []
+        self.generation = datetime.now().strftime('%Y%m%d%H%M%S')
+        if not self.checkpoint or not self.arguments.get('resume') or \
+                not os.path.isfile(self.checkpoint):
+            return
+        with open(self.checkpoint) as progress_file:
+            progress = json.load(progress_file)
+        if progress.get("settings") != self.get_progress_settings():
+            self.logger.warning("Progress file %s belongs to another build and is ignored" %
+                                self.checkpoint)
+            return
+        self.generation = progress["generation"]
+        self.completed = set(progress["stocks"])
+        self.logger.info("Resume build generation %s with %s completed stocks" %
+                         (self.generation, len(self.completed)))
+
+    def get_progress_settings(self):
+        """
+        Returns the settings a resumed build must share with the build of the progress file
+        :return: dictionary with json serializable settings
+        """
+        return {
+            "tool": type(self).__name__,
+            "signals": list(self.signal_to_builds),
+            "look_back": self.look_back
+        }
+
+    def set_stock_done(self, stock_id):
+        """
+        Marks a stored stock. The stored stocks are committed every checkpoint_interval
+        stocks or if bulk data storage exceeds flush_rows or flush_bytes. The results of a
+        stock are always committed together.
+        :param stock_id: id of stock
+        :return: nothing
+        """
+        self.uncommitted.append(stock_id)
+        if self.checkpoint and len(self.uncommitted) >= self.checkpoint_interval:
+            self.flush()
+            return
+        rows, size = self.get_bulk_size()
+        if rows >= self.flush_rows or size >= self.flush_bytes:
+            self.flush()
+
+    def get_bulk_size(self):
         """
+        Measures bulk data storage
+        :return: amount of rows and bytes of plot data
+        """
+        rows = sum(len(items) for items in self.bulk_data_storage.values())
+        size = 0
+        for key in ("plot", "plot_create"):
+            for plot in self.bulk_data_storage.get(key, []):
+                data = plot.get("data") if isinstance(plot, dict) else getattr(plot, "data", None)
+                size += len(data) if data else 0
+        return rows, size
+
+    def flush(self):
+        """
+        Commits the stored stocks and adds them to the progress file
+        :return: nothing
+        """
+        self.commit_work_result()
+        self.reset_bulk_data_storage()
+        self.completed.update(stock_id for stock_id in self.uncommitted if stock_id is not None)
+        self.uncommitted = []
+        if not self.checkpoint:
+            return
+        progress = {
+            "generation": self.generation,
+            "settings": self.get_progress_settings(),
+            "date": datetime.now().isoformat(),
+            "stocks": sorted(self.completed)
+        }
+        # replace the file in one step so a crash never leaves a broken progress file
+        with open(self.checkpoint + '.tmp', 'w') as progress_file:
+            json.dump(progress, progress_file)
+        os.replace(self.checkpoint + '.tmp', self.checkpoint)
+        self.logger.info("Checkpoint of build generation %s with %s completed stocks" %
+                         (self.generation, len(self.completed)))
+
+    def finish_build(self):
+        """
+        Commits the remaining stocks and removes the progress file of the finished build
+        :return: nothing
+        """
+        self.commit_work_result()
+        self.reset_bulk_data_storage()
+        self.uncommitted = []
+        if self.checkpoint and os.path.isfile(self.checkpoint):
+            os.remove(self.checkpoint)
 
+    def build_indicator(self, arguments):
+        """
+        Build the indicators of one stock
         :param arguments: dictionary with arguments
         :return:
         """
+        task = self.get_task(arguments)
+        if task is None:
+            return 0
+        return self.store_result(task, self.compute_task(self.get_settings(), task, self.logger))
+
+    def get_settings(self):
+        """
+        Returns the picklable settings for compute_task
+        :return: dictionary with settings
+        """
+        return {
+            'signals': self.signal_to_builds,
+            'look_back': self.look_back,
+            'threads': int(self.arguments.get('threads') or 1),
+            'search': self.arguments.get('search'),
+            'budget': int(self.arguments.get('budget') or Optimizer.SEARCH_BUDGET),
+            'seed': int(self.arguments.get('seed') or 0),
+            'indicator_time': self.arguments.get('indicator_time'),
+            'stock_time': self.arguments.get('stock_time')
+        }
+
+    def get_task(self, arguments):
+        """
+        Converts the arguments of work_generator to a picklable task. Runs in the
+        main process.
+        :param arguments: dictionary with arguments
+        :return: task or None to skip the stock
+        """
+        return arguments
+
+    @staticmethod
+    def compute_task(settings, task, logger: logging.Logger):
+        """
+        Computes the indicators of one stock without database access. Runs in a worker
+        process in parallel mode.
+        :param settings: dictionary from get_settings
+        :param task: task from get_task
+        :param logger: logger object
+        :return: picklable result
+        """
+        raise NotImplementedError
+
+    def store_result(self, task, result):
+        """
+        Stores the result of compute_task in bulk data storage. Runs in the main process.
+        :param task: task from get_task
+        :param result: result from compute_task
+        :return: return code
+        """
         raise NotImplementedError
 
     def get_last_known_value(self, stock):
@@ -90,12 +336,41 @@ class BuildIndicatorsBase:
         """
         raise NotImplementedError
 
+    @staticmethod
+    def has_bars(bars):
+        """
+        Checks if bars of get_bars can be used
+        :param bars: bars object or BARS_NUMPY array
+        :return: true if there are bars with all columns
+        """
+        return bars is not None and hasattr(bars, 'shape') and len(bars.shape) >= 2 and \
+            bars.shape[1] == 6 and bars.shape[0] > 0
+
+    def get_bar_range(self, data_size_days):
+        """
+        Returns the dates of the bars the indicators are built with
+        :param data_size_days: look back period in days
+        :return: tuple with start and end date
+        """
+        return datetime.now() + timedelta(days=-data_size_days), datetime.now()
+
     def get_bars(self, stock, data_size_days):
         if stock and data_size_days:
+            start, end = self.get_bar_range(data_size_days)
             return stock.get_bars(
-                start=datetime.now() + timedelta(days=-data_size_days),
-                end=datetime.now(),
-                output_type=BARS_NUMPY
+                start=start,
+                end=end,
+                output_type=BARS_TYPED
             )
         return None
 
+    def iterate_bars(self, stocks, data_size_days):
+        """
+        Iterates over stocks with their bars. The bars of many stocks are loaded with one query.
+        :param stocks: list with stocks
+        :param data_size_days: look back period in days
+        :return: generator of tuples with stock and typed bars
+        """
+        start, end = self.get_bar_range(data_size_days)
+        return BarPrefetch(self.arguments["db_tool"].session, start, end).iterate(stocks)
+
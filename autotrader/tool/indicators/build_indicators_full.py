@@ -15,17 +15,22 @@
  See the License for the specific language governing permissions and
  limitations under the License.
 """
-import itertools
 import logging
 import datetime
+import time
+import uuid
+
+from sqlalchemy import func
 
 from autotrader.base.trader_base import TraderBase
 
 from autotrader.broker.degiro.degiro_client import DegiroClient
-from autotrader.datasource.database.stock_schema import Signal, Parameter, Plot, Stock
+from autotrader.datasource.database.stock_schema import Signal, Parameter, Plot, Stock, \
+    Series
 import autotrader.indicators as ind
 from autotrader.tool.indicators.build_indicators_base import BuildIndicatorsBase
 from autotrader.tool.indicators.optimizer import Optimizer
+from autotrader.tool.indicators.result_cache import ResultCache
 
 
 class BuildIndicators(BuildIndicatorsBase):
@@ -33,55 +38,160 @@ class BuildIndicators(BuildIndicatorsBase):
     Tool to build indicators with optimized arguments from the scratch.
     """
 
+    # days after which the incremental build optimizes a stock without new bars again
+    MAX_AGE = 7
+    # maximal amount of rows per INSERT statement
+    INSERT_ROWS = 1000
+
     def __init__(self, config, arguments, logger: logging.Logger):
         super(BuildIndicators, self).__init__(config, arguments, logger)
         self.client = DegiroClient(config['degiro'], {"db_tool": None}, self.logger)
+        # identifies the signals of this build after the insert
+        self.build_token = uuid.uuid4().hex
+        self.cache = None
+        if arguments.get('cache'):
+            self.cache = ResultCache(arguments['cache'],
+                                     arguments.get('cache_size') or ResultCache.MAX_ENTRIES)
+
+    def get_task(self, arguments):
+        task = dict(arguments)
+        # the index is only logged so the database object is not sent to other processes
+        task["stock_index"] = str(arguments["stock_index"])
+        if self.cache is not None:
+            # the cache is only read and written by this process
+            task["cache_keys"] = self.__get_cache_keys(arguments)
+            task["cached"] = {}
+            for name, key in task["cache_keys"].items():
+                cached = self.cache.get(key)
+                if cached is not None:
+                    task["cached"][name] = cached
+        return task
+
+    def __get_cache_keys(self, arguments):
+        """
+        Builds the cache keys of the selected indicators of a stock. A key changes with the
+        bars, the parameter space and the settings of the search.
+        :param arguments: dictionary with arguments of work_generator
+        :return: dictionary with cache key per indicator name
+        """
+        settings = self.get_settings()
+        fingerprint = ResultCache.get_fingerprint(arguments["stock_bars"])
+        optima = arguments.get("optima", {})
+        keys = {}
+        for indicator in self.__get_selected_indicators():
+            # a warm start depends on the arguments and the profit of the stored optimum
+            optimum = optima.get(indicator.NAME)
+            warm_start = None if optimum is None else \
+                (tuple(optimum["parameters"]), optimum["profit"])
+            keys[indicator.NAME] = ResultCache.get_key(
+                arguments["stock_id"], indicator.NAME, indicator.PARAMETER_SPACE.get_version(),
+                settings['look_back'], fingerprint,
+                Optimizer.get_search_mode(settings['search'], indicator.SHORT_NAME),
+                settings['budget'], settings['seed'], warm_start)
+        return keys
+
+    def __get_selected_indicators(self):
+        """
+        Returns the indicator classes selected by the signals argument
+        :return: list of indicator classes
+        """
+        return [indicator for indicator in ind.INDICATORS
+                if indicator.SHORT_NAME in self.signal_to_builds or
+                'ALL' in self.signal_to_builds]
 
-    def build_indicator(self, arguments):
-        stock_id = arguments["stock_id"]
-        stock_index = arguments["stock_index"]
-        stock_symbol = arguments["stock_symbol"]
-        stock_bars = arguments["stock_bars"]
-        self.logger.info("Analyse %s:%s" % (stock_index, stock_symbol))
-        return_code = 0
+    @staticmethod
+    def compute_task(settings, task, logger: logging.Logger):
+        stock_index = task["stock_index"]
+        stock_symbol = task["stock_symbol"]
+        stock_bars = task["stock_bars"]
+        logger.info("Analyse %s:%s" % (stock_index, stock_symbol))
+        results = []
         indicators = []
+        # all indicators of a stock share the time budget of the stock
+        stock_deadline = None if settings.get('stock_time') is None else \
+            time.monotonic() + settings['stock_time']
         for indicator in ind.INDICATORS:
-            if indicator.SHORT_NAME in self.signal_to_builds or 'ALL' in self.signal_to_builds:
-                indicators.append(indicator(indicator.ARGUMENTS, self.logger))
+            if indicator.SHORT_NAME in settings['signals'] or 'ALL' in settings['signals']:
+                indicators.append(indicator(indicator.ARGUMENTS, logger))
 
         for indicator in indicators:
-            self.logger.info("Execute filter %s" % indicator.name)
-            if indicator.SHORT_NAME in ["SO", "SOM2", "SOM3"]:
-                optimizer_values = itertools.product(
-                    range(3, int(self.look_back/2)),
-                    range(3, int(self.look_back/2)),
-                    range(3, int(self.look_back/2))
-                )
+            cached = task.get("cached", {}).get(indicator.name)
+            if cached is not None:
+                logger.info("Reuse cached result of %s for %s" % (indicator.name, stock_symbol))
+                results.append(dict(cached, cached=True))
+                continue
+            logger.info("Execute filter %s" % indicator.name)
+            optimizer_values = indicator.PARAMETER_SPACE.get_grid(settings['look_back'])
+            optimizer = Optimizer(logger)
+            optimizer.set_time_budget(settings.get('indicator_time'), stock_deadline)
+            search = Optimizer.get_search_mode(settings.get('search'), indicator.SHORT_NAME)
+            optimum = task.get("optima", {}).get(indicator.name)
+            if optimum is not None:
+                threshold = None if optimum["profit"] is None else \
+                    optimum["profit"] - Optimizer.WARM_TOLERANCE
+                profit_max, param_max, status = optimizer.run_optimizer_warm_start(
+                    optimizer_values, indicator, stock_bars, optimum["parameters"],
+                    threshold=threshold, search=search, threads=settings.get('threads', 1),
+                    budget=settings.get('budget', Optimizer.SEARCH_BUDGET),
+                    seed=settings.get('seed', 0))
             else:
-                optimizer_values = itertools.combinations(
-                    range(5, int(self.look_back/2)),
-                    indicator.param_count
-                )
-            profit_max, param_max, status = Optimizer(self.logger).run_optimizer(
-                optimizer_values, indicator, stock_bars)
-            self.logger.info("Signal %s(%s) earns %s for %s and has status code %s" %
-                             (indicator.name, param_max, profit_max, stock_symbol, status))
+                profit_max, param_max, status = optimizer.run_optimizer_search(
+                    optimizer_values, indicator, stock_bars, search=search,
+                    threads=settings.get('threads', 1),
+                    budget=settings.get('budget', Optimizer.SEARCH_BUDGET),
+                    seed=settings.get('seed', 0))
+            logger.info("Signal %s(%s) earns %s for %s and has status code %s after %s "
+                        "evaluations" % (indicator.name, param_max, profit_max, stock_symbol,
+                                         status, optimizer.evaluations))
+            if optimizer.truncated:
+                logger.warning("Time budget of %s for %s is spent" % (indicator.name, stock_symbol))
             if not param_max:
-                self.logger.warning("no results for %s", indicator)
+                logger.warning("no results for %s", indicator)
                 continue
+            indicator.set_parameters(param_max)
+            results.append({
+                "name": indicator.name,
+                "profit_in_percent": float(profit_max),
+                "status": status,
+                "parameters": param_max,
+                "truncated": optimizer.truncated,
+                "runner_ups": [{"profit": profit, "parameters": list(parameters), "status": code}
+                               for profit, parameters, code in optimizer.top.get()
+                               if parameters != tuple(param_max)],
+                "plot": indicator.get_plot()
+            })
+        return results
+
+    def store_result(self, task, result):
+        date = datetime.datetime.now(TraderBase.get_timezone())
+        for indicator_result in result:
             # save to bulk data storage
-            db_signal = Signal(
-                profit_in_percent=float(profit_max),
-                name=indicator.name,
-                status=status,
-                info=self.look_back,
-                date=datetime.datetime.now(TraderBase.get_timezone()),
-                refresh_date=datetime.datetime.now(TraderBase.get_timezone())
-                )
-            self.__add_signal_to_bulk(stock_id, db_signal)
-            self.__add_parameter_to_bulk(db_signal, param_max)
-            self.__add_plot_to_bulk(indicator, param_max, db_signal)
-        return return_code
+            self.bulk_data_storage["signal"].append({
+                "stock_id": task["stock_id"],
+                "profit_in_percent": indicator_result["profit_in_percent"],
+                "name": indicator_result["name"],
+                "status": indicator_result["status"],
+                "runner_ups": indicator_result["runner_ups"],
+                "truncated": indicator_result["truncated"],
+                "series_date": task.get("series_date"),
+                "series_count": task.get("series_count"),
+                "info": str(self.look_back),
+                "build_token": self.build_token,
+                "date": date,
+                "refresh_date": date
+            })
+            # a build stores each indicator of a stock once
+            signal_key = (task["stock_id"], indicator_result["name"])
+            for value in indicator_result["parameters"] or []:
+                self.bulk_data_storage["parameter"].append({"signal": signal_key, "value": value})
+            if indicator_result["plot"]:
+                self.bulk_data_storage["plot"].append({"signal": signal_key,
+                                                       "data": indicator_result["plot"]})
+            key = task.get("cache_keys", {}).get(indicator_result["name"])
+            if key is not None and not indicator_result.get("cached") and \
+                    not indicator_result["truncated"]:
+                self.cache.put(key, indicator_result)
+        return 0
 
     def get_last_known_value(self, stock):
         raise NotImplementedError
@@ -89,68 +199,6 @@ class BuildIndicators(BuildIndicatorsBase):
     def get_real_time_series(self, issue_id):
         raise NotImplementedError
 
-    def __add_parameter_to_bulk(self, my_signal, my_parameters):
-        """
-        Add parameter to bulk data storage
-
-        :param my_signal: signal belongs to parameter
-        :param my_parameters: list of parameters
-
-        :return: false if operation fails otherwise true
-        """
-        if my_signal and my_parameters:
-            for para in my_parameters:
-                my_param = Parameter(
-                    value=para
-                )
-                my_signal.parameter.append(
-                    my_param
-                )
-                self.bulk_data_storage["parameter"].append(my_param)
-            return True
-        return False
-
-    def __add_plot_to_bulk(self, my_strategy, my_param, my_signal):
-        """
-        Add plot to bulk data storage
-        :param my_strategy:
-        :param my_param:
-        :param my_signal:
-        :return:
-        """
-        if my_strategy and my_param and my_signal:
-            my_strategy.set_parameters(my_param)
-            my_plot = Plot(
-                data=my_strategy.get_plot()
-            )
-            my_signal.plot.append(
-                my_plot
-            )
-            self.bulk_data_storage["plot"].append(my_plot)
-            return True
-        return False
-
-    def __add_signal_to_bulk(self, my_stock_id, my_signal):
-        """
-        Add plot to bulk data storage
-        :param my_signal:
-        :param my_stock_id: stock id of stock that belongs to signal
-        :return: false if operation fails otherwise true
-        """
-        if my_stock_id and my_signal:
-            self.bulk_data_storage["signal"].append([my_stock_id, my_signal])
-            return True
-        return False
-
-    def __fix_relationships(self, stocks):
-        my_signals = []
-        for stock in stocks:
-            for my_signal in self.bulk_data_storage["signal"]:
-                if len(my_signal) == 2 and stock.id == my_signal[0]:
-                    stock.signal.append(my_signal[1])
-                    my_signals.append(my_signal[1])
-        self.bulk_data_storage["signal"] = my_signals
-
     def work_generator(self):
         """
 
@@ -162,27 +210,175 @@ class BuildIndicators(BuildIndicatorsBase):
             if self.stock_ids else db_tool.session.query(Stock).all()
 
         self.arguments["stocks"] = stocks
-        for stock in stocks:
-            my_bars = self.get_bars(stock, self.look_back)
-            if my_bars is not None and hasattr(my_bars, 'shape') and len(my_bars.shape) >= 2 and my_bars.shape[1] == 6:
+        optima = self.__get_last_optima(db_tool) if self.arguments.get('warm_start') else {}
+        series_states = self.__get_series_states(db_tool)
+        if self.arguments.get('incremental'):
+            stocks = self.__get_changed_stocks(db_tool, stocks, series_states)
+        # the bars of stocks that are completed in a resumed build are not loaded
+        stocks = [stock for stock in stocks if stock.id not in self.completed]
+        for stock, my_bars in self.iterate_bars(stocks, self.look_back):
+            series_date, series_count = series_states.get(stock.id, (None, 0))
+            if self.has_bars(my_bars):
                 yield {
                     "stock_id": stock.id,
                     "stock_index": stock.indices[0],
                     "stock_symbol": stock.symbol,
-                    "stock_bars": my_bars
+                    "stock_bars": my_bars,
+                    "optima": optima.get(stock.id, {}),
+                    "series_date": series_date,
+                    "series_count": series_count
                 }
             else:
                 self.logger.warning('Skip indicator build for {} because of missing bars.'.format(stock.symbol))
 
+    def __get_series_states(self, db_tool):
+        """
+        Loads the date of the newest bar and the amount of bars of each stock
+        :param db_tool: database tool
+        :return: dictionary with tuple of date and count per stock id
+        """
+        query = db_tool.session.query(Series.stock_id, func.max(Series.date),
+                                      func.count(Series.id)).\
+            filter(Series.resolution == 'P1D')
+        if self.stock_ids:
+            query = query.filter(Series.stock_id.in_(self.stock_ids))
+        return {stock_id: (series_date, series_count)
+                for stock_id, series_date, series_count in query.group_by(Series.stock_id)}
+
+    def __get_changed_stocks(self, db_tool, stocks, series_states):
+        """
+        Selects the stocks with new or corrected bars since their last build and the stocks
+        whose last build is older than the maximal age
+        :param db_tool: database tool
+        :param stocks: list of stocks
+        :param series_states: dictionary from __get_series_states
+        :return: list of stocks
+        """
+        names = [indicator.NAME for indicator in self.__get_selected_indicators()]
+        newest = self.__get_newest_signals(db_tool)
+        query = db_tool.session.query(Signal.stock_id, Signal.name, Signal.date,
+                                      Signal.series_date, Signal.series_count).\
+            join(newest, Signal.id == newest.c.id)
+        builds = {}
+        for stock_id, name, date, series_date, series_count in query:
+            builds.setdefault(stock_id, {})[name] = (date, series_date, series_count)
+        max_age = self.arguments.get('max_age')
+        oldest = datetime.datetime.now(TraderBase.get_timezone()) - datetime.timedelta(
+            days=self.MAX_AGE if max_age is None else max_age)
+        changed = [stock for stock in stocks
+                   if self.needs_build(builds.get(stock.id, {}), names,
+                                       series_states.get(stock.id, (None, 0)), oldest)]
+        self.logger.info("Incremental build of %s from %s stocks" % (len(changed), len(stocks)))
+        return changed
+
+    @staticmethod
+    def needs_build(builds, names, series_state, oldest):
+        """
+        Checks if the indicators of a stock have to be built again
+        :param builds: dictionary with date, series date and series count of the newest
+        signal per indicator name
+        :param names: names of the selected indicators
+        :param series_state: tuple with date of newest bar and amount of bars of the stock
+        :param oldest: oldest date of a build that is still up to date
+        :return: true if a selected indicator has no signal, new or corrected bars or an old
+        signal
+        """
+        if any(name not in builds for name in names):
+            return True
+        for date, series_date, series_count in builds.values():
+            if (series_date, series_count) != tuple(series_state):
+                return True
+            if date is None:
+                return True
+            if date.tzinfo is None:
+                # some databases return naive dates in the time zone of the trader
+                date = date.replace(tzinfo=oldest.tzinfo)
+            if date < oldest:
+                return True
+        return False
+
+    def __insert_rows(self, db_tool, table, rows):
+        """
+        Inserts rows with multi-row INSERT statements
+        :param db_tool: database tool
+        :param table: sqlalchemy table
+        :param rows: list of dictionaries with the same keys
+        :return: nothing
+        """
+        for start in range(0, len(rows), self.INSERT_ROWS):
+            db_tool.session.execute(table.insert().values(rows[start:start + self.INSERT_ROWS]))
+
+    def __get_signal_ids(self, db_tool, signals):
+        """
+        Loads the ids of inserted signals by the token of this build
+        :param db_tool: database tool
+        :param signals: list of inserted signal rows
+        :return: dictionary with id per tuple of stock id and name
+        """
+        stock_ids = sorted({signal["stock_id"] for signal in signals})
+        query = db_tool.session.query(Signal.id, Signal.stock_id, Signal.name).\
+            filter(Signal.build_token == self.build_token).\
+            filter(Signal.stock_id.in_(stock_ids))
+        signal_ids = {}
+        for signal_id, stock_id, name in query:
+            if (stock_id, name) in signal_ids:
+                raise RuntimeError("Signal %s of stock %s is not unique in build %s" %
+                                   (name, stock_id, self.build_token))
+            signal_ids[(stock_id, name)] = signal_id
+        return signal_ids
+
+    def __get_newest_signals(self, db_tool):
+        """
+        Builds a subquery with the id of the newest signal per stock and selected indicator
+        with the same look back period, so the history of signals is not loaded
+        :param db_tool: database tool
+        :return: subquery with column id
+        """
+        names = [indicator.NAME for indicator in self.__get_selected_indicators()]
+        query = db_tool.session.query(func.max(Signal.id).label('id')).\
+            filter(Signal.info == str(self.look_back)).\
+            filter(Signal.name.in_(names))
+        if self.stock_ids:
+            query = query.filter(Signal.stock_id.in_(self.stock_ids))
+        return query.group_by(Signal.stock_id, Signal.name).subquery()
+
+    def __get_last_optima(self, db_tool):
+        """
+        Loads the arguments of the newest signals with the same look back period
+        :param db_tool: database tool
+        :return: dictionary with a dictionary of optima per indicator name per stock id
+        """
+        newest = self.__get_newest_signals(db_tool)
+        query = db_tool.session.query(Signal.stock_id, Signal.name, Signal.id,
+                                      Signal.profit_in_percent, Parameter.value).\
+            join(newest, Signal.id == newest.c.id).\
+            join(Parameter, Parameter.signal_id == Signal.id)
+        optima = {}
+        for stock_id, name, signal_id, profit, value in query.order_by(Signal.id, Parameter.id):
+            optimum = optima.setdefault(stock_id, {}).setdefault(
+                name, {"signal_id": signal_id, "profit": profit, "parameters": []})
+            optimum["parameters"].append(int(value))
+        return optima
+
     def commit_work_result(self):
         """
 
         :return:
         """
         db_tool = self.arguments["db_tool"]
-        stocks = self.arguments["stocks"]
-        self.__fix_relationships(stocks)
-        db_tool.session.add_all(self.bulk_data_storage["signal"])
-        db_tool.session.add_all(self.bulk_data_storage["parameter"])
-        db_tool.session.add_all(self.bulk_data_storage["plot"])
+        signals = self.bulk_data_storage["signal"]
+        if signals:
+            self.__insert_rows(db_tool, Signal.__table__, signals)
+            signal_ids = self.__get_signal_ids(db_tool, signals)
+            self.__insert_rows(db_tool, Parameter.__table__, [
+                {"signal_id": signal_ids[row["signal"]], "value": row["value"]}
+                for row in self.bulk_data_storage["parameter"]])
+            # plots are large, so they are sent with executemany in driver sized batches
+            plots = [{"signal_id": signal_ids[row["signal"]], "data": row["data"]}
+                     for row in self.bulk_data_storage["plot"]]
+            if plots:
+                db_tool.session.execute(Plot.__table__.insert(), plots)
         db_tool.commit()
+        if self.cache is not None:
+            self.logger.info("Result cache has %s hits and %s misses" % (self.cache.hits,
+                                                                        self.cache.misses))
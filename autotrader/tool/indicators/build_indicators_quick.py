@@ -51,9 +51,8 @@ class BuildIndicatorsQuick(BuildIndicatorsBase):
 
         self.arguments["signals"] = new_signals
         self.arguments["stocks"] = stocks
-        for stock in stocks:
-            my_bars = self.get_bars(stock, self.look_back)
-            if my_bars is not None and hasattr(my_bars, 'shape') and len(my_bars.shape) >= 2 and my_bars.shape[1] == 6:
+        for stock, my_bars in self.iterate_bars(stocks, self.look_back):
+            if self.has_bars(my_bars):
                 yield {
                     "stock_id": stock.id,
                     "stock_index": stock.indices[0],
@@ -82,15 +81,13 @@ class BuildIndicatorsQuick(BuildIndicatorsBase):
             db_tool.session.bulk_insert_mappings(Plot, self.bulk_data_storage["plot_create"])
         db_tool.commit()
 
-    def build_indicator(self, arguments):
+    def get_task(self, arguments):
         stock_issue_id = arguments["stock_issue_id"]
         update_new_signals = arguments["update_new_signals"]
         stock_symbol = arguments["stock_symbol"]
-        stock_bars = arguments["stock_bars"]
-        return_code = 0
         if not update_new_signals:
             self.logger.warning("No update able signals found for %s" % stock_symbol)
-            return 0
+            return None
         # select signals to refresh only new and used signals by orders will be refreshed
         # the date filter with datetime.now() is necessary for backtesting
         self.logger.info("Analyse %s" % stock_symbol)
@@ -101,48 +98,102 @@ class BuildIndicatorsQuick(BuildIndicatorsBase):
                                 " real time data. Date is {} and weekday is {}".
                                 format(stock_symbol, datetime.now(),
                                        datetime.now().strftime('%A')))
-            return 0
+            return None
+        return {
+            "stock_symbol": stock_symbol,
+            "stock_bars": arguments["stock_bars"],
+            "real_time_value": real_time_value,
+            "signals": [
+                {
+                    "id": signal_to_update.id,
+                    "name": signal_to_update.name,
+                    "parameters": [x.value for x in signal_to_update.parameter],
+                    "runner_ups": signal_to_update.runner_ups,
+                    "plot_id": plot_to_update
+                }
+                for signal_to_update, plot_to_update in update_new_signals
+            ]
+        }
 
+    @staticmethod
+    def compute_task(settings, task, logger: logging.Logger):
+        stock_bars = task["stock_bars"]
+        results = []
         indicators = []
         for indicator in ind.INDICATORS:
-            indicators.append(indicator(indicator.ARGUMENTS, self.logger))
+            indicators.append(indicator(indicator.ARGUMENTS, logger))
 
         for indicator in indicators:
-            self.logger.info("Execute filter %s" % indicator.name)
-            for update_new_signal in update_new_signals:
-                signal_to_update = update_new_signal[0]
-                plot_to_update = update_new_signal[1]
-                if indicator.NAME != signal_to_update.name:
+            logger.info("Execute filter %s" % indicator.name)
+            for signal_to_update in task["signals"]:
+                if indicator.NAME != signal_to_update["name"]:
                     continue
                 indicator.set_bars(stock_bars)
-                optimizer_values = [[x.value for x in signal_to_update.parameter]]
-                profit_max, param_max, status = Optimizer(self.logger).run_optimizer(
-                    optimizer_values, indicator, stock_bars, real_time_value)
-                # save to database
+                optimizer_values = [signal_to_update["parameters"]]
+                profit_max, param_max, status = Optimizer(logger).run_optimizer(
+                    optimizer_values, indicator, stock_bars, task["real_time_value"])
                 indicator.set_parameters(param_max)
-                self.bulk_data_storage["signal"].append(
-                    {"id": signal_to_update.id,
-                     "refresh_date": datetime.now(),
-                     "profit_in_percent": float(profit_max),
-                     "status": status
-                     }
+                plot = indicator.get_plot()
+                results.append({
+                    "id": signal_to_update["id"],
+                    "profit_in_percent": float(profit_max),
+                    "status": status,
+                    "runner_ups": BuildIndicatorsQuick.score_runner_ups(
+                        signal_to_update.get("runner_ups"), indicator, stock_bars,
+                        task["real_time_value"], logger),
+                    "plot_id": signal_to_update["plot_id"],
+                    "plot": plot
+                })
+        return results
+
+    @staticmethod
+    def score_runner_ups(runner_ups, indicator, stock_bars, real_time_value, logger):
+        """
+        Scores the runner-ups of the last full build with the new bars
+        :param runner_ups: list of dictionaries with profit, parameters and status or None
+        :param indicator: strategy object
+        :param stock_bars: bars of stock
+        :param real_time_value: last price
+        :param logger: logger
+        :return: list of dictionaries with the new profit, parameters and status or None
+        """
+        if not runner_ups:
+            return None
+        indicator.set_bars(stock_bars)
+        results = Optimizer(logger).score_candidates(
+            [runner_up["parameters"] for runner_up in runner_ups], indicator, None,
+            real_time_value)
+        return [{"profit": profit, "parameters": list(parameters), "status": status}
+                for profit, parameters, status in results]
+
+    def store_result(self, task, result):
+        # save to database
+        for signal_result in result:
+            signal_mapping = {
+                "id": signal_result["id"],
+                "refresh_date": datetime.now(),
+                "profit_in_percent": signal_result["profit_in_percent"],
+                "status": signal_result["status"]
+            }
+            if signal_result["runner_ups"] is not None:
+                signal_mapping["runner_ups"] = signal_result["runner_ups"]
+            self.bulk_data_storage["signal"].append(signal_mapping)
+            if signal_result["plot_id"]:
+                self.bulk_data_storage["plot"].append(
+                    {
+                        "id": signal_result["plot_id"],
+                        "data": signal_result["plot"],
+                        "signal_id": signal_result["id"]
+                    }
+                )
+            else:
+                self.bulk_data_storage["plot_create"].append(
+                    {
+                        "data": signal_result["plot"],
+                        "signal_id": signal_result["id"]
+                    }
                 )
-                if plot_to_update:
-                    self.bulk_data_storage["plot"].append(
-                        {
-                            "id": plot_to_update,
-                            "data": indicator.get_plot(),
-                            "signal_id": signal_to_update.id
-                        }
-                    )
-                else:
-                    self.bulk_data_storage["plot_create"].append(
-                        {
-                            "data": indicator.get_plot(),
-                            "signal_id": signal_to_update.id
-                        }
-                    )
-        return return_code
+        return 0
 
     def get_last_known_value(self, issue_id):
         real_time_series = self.get_real_time_series(issue_id)
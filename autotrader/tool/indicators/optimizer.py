@@ -15,14 +15,21 @@
  See the License for the specific language governing permissions and
  limitations under the License.
 """
+import itertools
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+import numpy as np
 from dateutil.relativedelta import relativedelta
 
 from autotrader.datasource.database.stock_schema import BARS_NUMPY
 from autotrader.indicators.base_indicator import BaseIndicator
+from autotrader.indicators.parameter_space import ParameterGrid
 from autotrader.tool.indicators.back_testing import BackTesting
+from autotrader.tool.indicators.parameter_sampler import ParameterSampler
+from autotrader.tool.indicators.top_results import TopResults
 
 
 class Optimizer:
@@ -30,8 +37,76 @@ class Optimizer:
     The optimizer iterate over all possible arguments to find the combination
     with the best earnings.
     """
-    def __init__(self, logger: logging.Logger):
+
+    BATCH_SIZE = 4096
+    # search modes
+    SEARCH_GRID = 'grid'
+    SEARCH_COARSE = 'coarse'
+    SEARCH_HALVING = 'halving'
+    SEARCH_RANDOM = 'random'
+    SEARCH_PARZEN = 'parzen'
+    SEARCH_MODES = (SEARCH_GRID, SEARCH_COARSE, SEARCH_HALVING, SEARCH_RANDOM, SEARCH_PARZEN)
+    # distance between two values of the coarse grid
+    COARSE_STRIDE = 4
+    # fraction and maximal amount of coarse arguments that are refined
+    TOP_FRACTION = 0.05
+    TOP_LIMIT = 32
+    # successive halving starts with this fraction of bars and keeps 1 / rate of the arguments
+    HALVING_WINDOW = 0.25
+    HALVING_RATE = 2
+    # maximal amount of scored arguments of the sampling searches
+    SEARCH_BUDGET = 1024
+    # the Parzen search starts with this fraction of quasi-random arguments
+    PARZEN_START = 0.25
+    PARZEN_BATCH = 32
+    # radius of the neighbourhood of a warm start in steps of the dimensions
+    WARM_RADIUS = 3
+    # the neighbourhood of a warm start may earn this much less than the last optimum
+    WARM_TOLERANCE = 0.05
+    # amount of best results that are kept
+    TOP_COUNT = 5
+
+    def __init__(self, logger: logging.Logger, top_count=TOP_COUNT):
         self.logger = logger
+        self.top_count = top_count
+        self.evaluations = 0
+        self.top = TopResults(top_count)
+        self.deadline = None
+        self.truncated = False
+
+    def reset(self):
+        """
+        Resets the amount of scored arguments, the best results and the truncation flag
+        before a run
+        :return: nothing
+        """
+        self.evaluations = 0
+        self.top = TopResults(self.top_count)
+        self.truncated = False
+
+    def set_time_budget(self, seconds=None, deadline=None):
+        """
+        Limits the wall-clock time of the next runs. A run scores at least one block and stops
+        after the block that exceeds the budget. The best result so far is returned and the
+        run is marked as truncated.
+        :param seconds: time budget in seconds from now or None
+        :param deadline: latest end as value of time.monotonic or None
+        :return: nothing
+        """
+        if seconds is not None:
+            end = time.monotonic() + seconds
+            deadline = end if deadline is None else min(end, deadline)
+        self.deadline = deadline
+
+    def is_expired(self):
+        """
+        Checks if the time budget of a run is spent. The first arguments of a run are always
+        scored, so a run has a result.
+        :return: true if the run must stop
+        """
+        if self.evaluations and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.truncated = True
+        return self.truncated
 
     def run_optimizer(self, optimizer_values, strategy, stock_bars, last_price=None):
         """
@@ -47,7 +122,11 @@ class Optimizer:
         profit_max = - 2000
         param_max = None
         status = BaseIndicator.NO_SIGNAL
+        self.reset()
         for optimizer_value in optimizer_values:
+            if self.is_expired():
+                break
+            self.evaluations += 1
             try:
                 profit, status = self.calc_profit(
                     strategy,
@@ -55,6 +134,7 @@ class Optimizer:
                     optimizer_value,
                     last_price
                 )
+                self.top.push(profit, optimizer_value, status)
                 if profit > profit_max:
                     profit_max = profit
                     param_max = optimizer_value
@@ -63,6 +143,486 @@ class Optimizer:
                 continue
         return profit_max, param_max, status
 
+    def score_candidates(self, candidates, strategy, stock_bars, last_price=None):
+        """
+        Scores a few known arguments i.e. the runner-ups of the last full build
+        :param candidates: list of list with arguments
+        :param strategy: strategy object
+        :param stock_bars: bars of stock
+        :param last_price: added to price dataframe. Useful when db is not in
+        sync with newest values.
+        :return: list of tuples with profit, arguments and status of the valid arguments
+        """
+        self.prepare_strategy(strategy, stock_bars, last_price)
+        results = []
+        for candidate in candidates:
+            try:
+                profit, status = self.calc_profit(strategy, None, candidate)
+            except ValueError:
+                self.logger.debug("Arguments %s causes errors", candidate)
+                continue
+            results.append((float(profit), tuple(candidate), int(status)))
+        self.evaluations += len(candidates)
+        return results
+
+    def run_optimizer_batch(self, optimizer_values, strategy, stock_bars, last_price=None,
+                            batch_size=BATCH_SIZE, threads=1):
+        """
+        Batched version of run_optimizer. The arguments are evaluated in blocks and each block
+        is scored with one signal matrix. The result is the same as in run_optimizer.
+        :param optimizer_values: list of list with integer arguments or a parameter grid
+        :param strategy: strategy object
+        :param stock_bars: bars of stock
+        :param last_price: added to price dataframe. Useful when db is not in
+        sync with newest values.
+        :param batch_size: amount of arguments per block
+        :param threads: amount of threads that score the chunks of a block
+        :return: maximal profit, optimized arguments, status (buy, sell ...)
+        """
+        profit_max = - 2000
+        param_max = None
+        status = BaseIndicator.NO_SIGNAL
+        self.reset()
+        self.prepare_strategy(strategy, stock_bars, last_price)
+        executor = ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
+        strategies = [strategy] + [strategy.clone() for _ in range(threads - 1)]
+        try:
+            for block in self.get_blocks(optimizer_values, batch_size):
+                if self.is_expired():
+                    break
+                self.evaluations += block.shape[0]
+                if executor is None:
+                    profits, status_codes, valid = self.calc_profit_batch(strategy, None, block)
+                else:
+                    profits, status_codes, valid = self.calc_profit_threaded(executor, strategies,
+                                                                             block)
+                self.top.push_block(block, profits, status_codes, valid)
+                if not valid.any():
+                    continue
+                # the status of the last valid arguments wins like in the serial loop
+                status = int(status_codes[np.flatnonzero(valid)[-1]])
+                # invalid arguments and nan profits never pass the greater than check
+                profits = np.where(valid & ~np.isnan(profits), profits, -np.inf)
+                idx = int(np.argmax(profits))
+                if profits[idx] > profit_max:
+                    profit_max = profits[idx]
+                    param_max = tuple(block[idx].tolist())
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return profit_max, param_max, status
+
+    def run_optimizer_search(self, optimizer_values, strategy, stock_bars, last_price=None,
+                             search=SEARCH_GRID, threads=1, stride=COARSE_STRIDE,
+                             budget=SEARCH_BUDGET, seed=0):
+        """
+        Searches the best arguments of a parameter grid in stages. The grid search scores
+        every argument like run_optimizer_batch. The coarse search scores every stride-th
+        value of each dimension, keeps the best arguments and scores their neighbourhood at
+        full resolution. The halving search also ranks the coarse arguments on the last bars
+        first and only scores the best of them on all bars. The random and the parzen search
+        score at most budget arguments, see sample_arguments. The amount of scored arguments
+        is stored in evaluations.
+        :param optimizer_values: parameter grid. Other arguments are searched like a grid.
+        :param strategy: strategy object
+        :param stock_bars: bars of stock
+        :param last_price: added to price dataframe. Useful when db is not in
+        sync with newest values.
+        :param search: grid, coarse, halving, random or parzen
+        :param threads: amount of threads that score the chunks of a block
+        :param stride: distance between two values of the coarse grid
+        :param budget: maximal amount of scored arguments of the random and parzen search
+        :param seed: seed of the random and parzen search
+        :return: maximal profit, optimized arguments, status (buy, sell ...)
+        """
+        if search not in self.SEARCH_MODES:
+            raise ValueError("Unknown search mode {}".format(search))
+        if search == self.SEARCH_GRID and self.deadline is not None and \
+                isinstance(optimizer_values, ParameterGrid):
+            return self.run_grid_coarse_first(optimizer_values, strategy, stock_bars, last_price,
+                                              threads, stride)
+        if search == self.SEARCH_GRID or not isinstance(optimizer_values, ParameterGrid):
+            return self.run_optimizer_batch(optimizer_values, strategy, stock_bars, last_price,
+                                            threads=threads)
+        if search in (self.SEARCH_RANDOM, self.SEARCH_PARZEN):
+            if np.prod([values.size for values in optimizer_values.values]) <= budget:
+                # the grid is scored completely within budget
+                return self.run_optimizer_batch(optimizer_values, strategy, stock_bars,
+                                                last_price, threads=threads)
+            self.reset()
+            self.prepare_strategy(strategy, stock_bars, last_price)
+            result = self.sample_arguments(optimizer_values, strategy, search, budget, seed,
+                                           threads)
+            self.logger.info("Search %s of %s scored %s arguments" %
+                             (search, strategy.name, self.evaluations))
+            return result
+        self.reset()
+        self.prepare_strategy(strategy, stock_bars, last_price)
+        blocks = list(optimizer_values.get_coarse(stride).get_blocks(self.BATCH_SIZE))
+        if not blocks:
+            return - 2000, None, BaseIndicator.NO_SIGNAL
+        rows = np.concatenate(blocks)
+        keep = max(1, min(int(np.ceil(rows.shape[0] * self.TOP_FRACTION)), self.TOP_LIMIT))
+        if search == self.SEARCH_HALVING:
+            rows = self.halve_arguments(strategy, rows, keep, threads)
+        # the first block is scored on all bars even if the halving spent the time budget
+        profits, status_codes, valid = self.score_arguments(strategy, rows, threads,
+                                                            required=True)
+        # the best coarse arguments are refined at full resolution
+        best = rows[valid][np.argsort(-profits[valid], kind='stable')[:keep]]
+        neighbours = optimizer_values.get_neighbours(best, stride - 1)
+        # the last argument of the grid is scored to get the same status as the grid search
+        last = optimizer_values.get_last()
+        candidates = np.unique(np.concatenate((neighbours, last[np.newaxis, :])), axis=0)
+        known = set(map(tuple, rows.tolist()))
+        new_rows = np.asarray([row for row in candidates.tolist() if tuple(row) not in known],
+                              dtype='int64').reshape(-1, rows.shape[1])
+        new_profits, new_status_codes, new_valid = self.score_arguments(strategy, new_rows,
+                                                                        threads)
+        # the size of the grid is not logged because counting it builds all blocks
+        self.logger.info("Search %s of %s scored %s arguments" %
+                         (search, strategy.name, self.evaluations))
+        return self.reduce_arguments(np.concatenate((rows, new_rows)),
+                                     np.concatenate((profits, new_profits)),
+                                     np.concatenate((status_codes, new_status_codes)),
+                                     np.concatenate((valid, new_valid)))
+
+    def run_grid_coarse_first(self, grid, strategy, stock_bars, last_price=None, threads=1,
+                              stride=COARSE_STRIDE):
+        """
+        Grid search for a time budget. The coarse grid and the last argument of the grid are
+        scored first, so an expired budget still leaves arguments from the whole grid. The
+        rest of the grid follows in blocks. Without expiry the result is the same as in
+        run_optimizer_batch.
+        :param grid: parameter grid
+        :param strategy: strategy object
+        :param stock_bars: bars of stock
+        :param last_price: added to price dataframe. Useful when db is not in
+        sync with newest values.
+        :param threads: amount of threads that score the chunks of a block
+        :param stride: distance between two values of the coarse grid
+        :return: maximal profit, optimized arguments, status (buy, sell ...)
+        """
+        self.reset()
+        self.prepare_strategy(strategy, stock_bars, last_price)
+        last = grid.get_last()
+        if last is None:
+            return - 2000, None, BaseIndicator.NO_SIGNAL
+        coarse = np.unique(np.concatenate(list(grid.get_coarse(stride).get_blocks(self.BATCH_SIZE))),
+                           axis=0)
+        coarse = coarse[~np.all(coarse == last, axis=1)]
+        # the first block holds the last argument and coarse arguments from the whole grid,
+        # so it is scored even if the budget is spent and the other blocks are not
+        step = max(1, int(np.ceil(coarse.shape[0] / max(1, self.BATCH_SIZE - 1))))
+        spread = np.zeros(coarse.shape[0], dtype='bool')
+        spread[::step] = True
+        rows = np.concatenate((last[np.newaxis, :], coarse[spread], coarse[~spread]))
+        known = set(map(tuple, rows.tolist()))
+        results = [(rows,) + self.score_arguments(strategy, rows, threads, required=True)]
+        for block in grid.get_blocks(self.BATCH_SIZE):
+            if self.is_expired():
+                break
+            block = block[np.asarray([tuple(row) not in known for row in block.tolist()])]
+            if block.shape[0]:
+                results.append((block,) + self.score_arguments(strategy, block, threads))
+        if self.truncated:
+            self.logger.info("Grid search of %s stopped after %s arguments" %
+                             (strategy.name, self.evaluations))
+        return self.reduce_arguments(*(np.concatenate(values) for values in zip(*results)))
+
+    def run_optimizer_warm_start(self, optimizer_values, strategy, stock_bars, start,
+                                 threshold=None, last_price=None, radius=WARM_RADIUS,
+                                 search=SEARCH_GRID, threads=1, budget=SEARCH_BUDGET, seed=0):
+        """
+        Searches the best arguments around known arguments first. The neighbourhood of
+        start is scored and its best arguments are returned if they earn at least threshold.
+        Otherwise the grid is searched with run_optimizer_search and the better result wins.
+        :param optimizer_values: parameter grid. Other arguments are searched like a grid.
+        :param strategy: strategy object
+        :param stock_bars: bars of stock
+        :param start: known arguments i.e. the optimum of the last build
+        :param threshold: minimal profit of the neighbourhood. None accepts every profit.
+        :param last_price: added to price dataframe. Useful when db is not in
+        sync with newest values.
+        :param radius: radius of the neighbourhood in steps of the dimensions
+        :param search: search mode of the fallback
+        :param threads: amount of threads that score the chunks of a block
+        :param budget: maximal amount of scored arguments of the random and parzen search
+        :param seed: seed of the random and parzen search
+        :return: maximal profit, optimized arguments, status (buy, sell ...)
+        """
+        self.reset()
+        neighbourhood = None
+        start = None if start is None else np.asarray(start, dtype='int64').reshape(1, -1)
+        if isinstance(optimizer_values, ParameterGrid) and start is not None and \
+                optimizer_values.contains(start[0]):
+            self.prepare_strategy(strategy, stock_bars, last_price)
+            # the last argument of the grid is scored to get the same status as the grid search
+            rows = np.unique(np.concatenate((optimizer_values.get_neighbours(start, radius),
+                                             optimizer_values.get_last()[np.newaxis, :])), axis=0)
+            neighbourhood = self.reduce_arguments(rows,
+                                                  *self.score_arguments(strategy, rows, threads))
+            self.logger.info("Warm start of %s at %s scored %s arguments and earns %s" %
+                             (strategy.name, tuple(start[0].tolist()), self.evaluations,
+                              neighbourhood[0]))
+            if neighbourhood[1] is not None and \
+                    (threshold is None or neighbourhood[0] >= threshold):
+                return neighbourhood
+            # the bars are already set
+            stock_bars = None
+            last_price = None
+        evaluations = self.evaluations
+        top = self.top
+        result = self.run_optimizer_search(optimizer_values, strategy, stock_bars, last_price,
+                                           search=search, threads=threads, budget=budget,
+                                           seed=seed)
+        self.evaluations += evaluations
+        for profit, parameters, status in top.get():
+            self.top.push(profit, parameters, status)
+        if neighbourhood is not None and neighbourhood[0] > result[0]:
+            return neighbourhood[0], neighbourhood[1], result[2]
+        return result
+
+    @staticmethod
+    def get_search_mode(searches, short_name):
+        """
+        Selects the search mode of a strategy
+        :param searches: list of search modes. A mode can be restricted to a strategy with
+        its short name i.e. SO=halving. A mode without name is used for all other strategies.
+        :param short_name: short name of strategy
+        :return: search mode
+        """
+        search_mode = Optimizer.SEARCH_GRID
+        for search in searches or []:
+            name, _, mode = search.rpartition('=')
+            if name == short_name:
+                return mode
+            if not name:
+                search_mode = mode
+        return search_mode
+
+    def sample_arguments(self, grid, strategy, search, budget, seed=0, threads=1):
+        """
+        Scores at most budget arguments of a grid. The random search draws quasi-random
+        arguments from the Halton sequence. The parzen search draws a part of the budget
+        quasi-randomly and spends the rest in batches on arguments that a tree-structured
+        Parzen estimator proposes from the scored arguments. The last argument of the grid
+        is always scored to get the same status as the grid search.
+        :param grid: parameter grid
+        :param strategy: strategy object with bars
+        :param search: random or parzen
+        :param budget: maximal amount of scored arguments
+        :param seed: seed of sampler
+        :param threads: amount of threads that score the chunks of a block
+        :return: maximal profit, optimized arguments, status (buy, sell ...)
+        """
+        sampler = ParameterSampler(grid, seed)
+        last = grid.get_last()
+        if last is None:
+            return - 2000, None, BaseIndicator.NO_SIGNAL
+        known = {tuple(last.tolist())}
+        start = budget if search == self.SEARCH_RANDOM else int(budget * self.PARZEN_START)
+        rows = np.concatenate((last[np.newaxis, :],
+                               sampler.get_quasi_random(max(1, start) - 1, known)))
+        profits, status_codes, valid = self.score_arguments(strategy, rows, threads)
+        while search == self.SEARCH_PARZEN and rows.shape[0] < budget and \
+                not self.is_expired():
+            new_rows = sampler.get_proposals(rows[valid], profits[valid],
+                                             min(self.PARZEN_BATCH, budget - rows.shape[0]),
+                                             known)
+            if new_rows.shape[0] == 0:
+                break
+            new_profits, new_status_codes, new_valid = self.score_arguments(strategy, new_rows,
+                                                                            threads)
+            rows = np.concatenate((rows, new_rows))
+            profits = np.concatenate((profits, new_profits))
+            status_codes = np.concatenate((status_codes, new_status_codes))
+            valid = np.concatenate((valid, new_valid))
+        return self.reduce_arguments(rows, profits, status_codes, valid)
+
+    def halve_arguments(self, strategy, rows, keep, threads=1):
+        """
+        Successive halving of arguments. The arguments are scored on the last bars and only
+        the best of them are scored again on more bars until all bars are used. Arguments
+        that cannot be scored on a short window are kept for the next window.
+        :param strategy: strategy object with bars
+        :param rows: 2-D integer array with one argument set per row
+        :param keep: minimal amount of arguments that are kept
+        :param threads: amount of threads that score the chunks of a block
+        :return: 2-D integer array with the kept arguments
+        """
+        size = strategy.open.size
+        fraction = self.HALVING_WINDOW
+        while fraction < 1 and rows.shape[0] > keep and not self.is_expired():
+            window = strategy.get_window(int(size * fraction))
+            profits, _, valid = self.score_arguments(window, rows, threads)
+            count = max(keep, int(np.count_nonzero(valid) / self.HALVING_RATE))
+            ranked = rows[valid][np.argsort(-profits[valid], kind='stable')[:count]]
+            rows = np.concatenate((ranked, rows[~valid]))
+            fraction *= self.HALVING_RATE
+        return rows
+
+    def score_arguments(self, strategy, rows, threads=1, required=False):
+        """
+        Calculates the profit for many arguments in blocks
+        :param strategy: strategy object with bars
+        :param rows: 2-D integer array with one argument set per row
+        :param threads: amount of threads that score the chunks of a block
+        :param required: scores the first block even if the time budget is spent
+        :return: profits, status codes and mask of valid rows. Invalid arguments, nan
+        profits and arguments that are not scored because of the time budget have a profit
+        of minus infinity.
+        """
+        results = []
+        executor = ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
+        strategies = [strategy] + [strategy.clone() for _ in range(threads - 1)]
+        try:
+            for start in range(0, rows.shape[0], self.BATCH_SIZE):
+                if self.is_expired() and not (required and start == 0):
+                    # the rest of the arguments is not scored
+                    size = rows.shape[0] - start
+                    results.append((np.full(size, np.nan),
+                                    np.full(size, BaseIndicator.NO_SIGNAL),
+                                    np.zeros(size, dtype='bool')))
+                    break
+                block = rows[start:start + self.BATCH_SIZE]
+                self.evaluations += block.shape[0]
+                if executor is None:
+                    results.append(self.calc_profit_batch(strategy, None, block))
+                else:
+                    results.append(self.calc_profit_threaded(executor, strategies, block))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        if not results:
+            return (np.empty(0), np.empty(0, dtype='int64'), np.zeros(0, dtype='bool'))
+        profits, status_codes, valid = (np.concatenate(values) for values in zip(*results))
+        return np.where(valid & ~np.isnan(profits), profits, -np.inf), status_codes, valid
+
+    def reduce_arguments(self, rows, profits, status_codes, valid):
+        """
+        Selects the best scored arguments and keeps the best results. The arguments are
+        sorted in the order of the grid, so ties and the status are resolved like in
+        run_optimizer.
+        :param rows: 2-D integer array with one argument set per row
+        :param profits: profits of rows
+        :param status_codes: status codes of rows
+        :param valid: mask of valid rows
+        :return: maximal profit, optimized arguments, status (buy, sell ...)
+        """
+        order = np.lexsort(rows.T[::-1])
+        rows, profits, status_codes, valid = (rows[order], profits[order], status_codes[order],
+                                              valid[order])
+        self.top.push_block(rows, profits, status_codes, valid)
+        if not valid.any():
+            return - 2000, None, BaseIndicator.NO_SIGNAL
+        status = int(status_codes[np.flatnonzero(valid)[-1]])
+        idx = int(np.argmax(profits))
+        if profits[idx] > - 2000:
+            return profits[idx], tuple(rows[idx].tolist()), status
+        return - 2000, None, status
+
+    def calc_profit_threaded(self, executor, strategies, block):
+        """
+        Calculates the profit for a block of arguments on several threads. The primitives
+        are prepared once for the whole block, then each strategy scores one chunk of rows
+        with the compiled kernels that release the GIL. The chunk results are joined in the
+        order of the block, so the reduction is the same as with one thread.
+        :param executor: thread pool
+        :param strategies: one strategy object per thread that share bars and primitives
+        :param block: 2-D integer array with one argument set per row
+        :return: profits, status codes and mask of valid rows
+        """
+        strategies[0].prepare_primitives(block)
+        chunks = [chunk for chunk in np.array_split(block, len(strategies)) if chunk.shape[0]]
+        futures = [executor.submit(self.calc_profit_batch, strategy, None, chunk)
+                   for strategy, chunk in zip(strategies, chunks)]
+        results = [future.result() for future in futures]
+        return tuple(np.concatenate(values) for values in zip(*results))
+
+    @staticmethod
+    def get_blocks(optimizer_values, batch_size=BATCH_SIZE):
+        """
+        Splits arguments in integer arrays
+        :param optimizer_values: list of list with integer arguments or a parameter grid
+        :param batch_size: maximal amount of rows per block
+        :return: generator of 2-D integer arrays
+        """
+        if isinstance(optimizer_values, ParameterGrid):
+            yield from optimizer_values.get_blocks(batch_size)
+            return
+        iterator = iter(optimizer_values)
+        while True:
+            block = list(itertools.islice(iterator, batch_size))
+            if not block:
+                return
+            yield np.asarray(block, dtype='int64')
+
+    @staticmethod
+    def prepare_strategy(strategy, stock_bars, last_price=None):
+        """
+        Sets the bars and the last price to strategy
+        :param strategy: strategy object
+        :param stock_bars: bars of stock
+        :param last_price: added to price dataframe. Useful when db is not in
+        sync with newest values.
+        :return: nothing
+        """
+        if not strategy.has_bars() and stock_bars is not None:
+            # skip if strategies has bars. Used for unit tests
+            strategy.set_bars(
+                stock_bars
+            )
+        strategy.append_value_to_bars(last_price)
+
+    def calc_profit_batch(self, strategy, stock_bars, optimizer_values, last_price=None):
+        """
+        Calculates the profit for a block of arguments
+        :param strategy: strategy object
+        :param stock_bars: bars of stock
+        :param optimizer_values: 2-D integer array with one argument set per row
+        :param last_price: added to price dataframe. Useful when db is not in
+        sync with newest values.
+        :return: profits, status codes and mask of valid rows
+        """
+        if stock_bars is not None or last_price is not None:
+            self.prepare_strategy(strategy, stock_bars, last_price)
+        scores = None if strategy.plot_result else self.score_batch(strategy, optimizer_values)
+        if scores is not None:
+            profits, status_codes, valid = scores
+        else:
+            signals, signal_shifts, valid = strategy.generate_signal_matrix(optimizer_values)
+            test = BackTesting(strategy.symbol, strategy, signals)
+            profits, status_codes = test.backtest_portfolio_matrix(signal_shifts, valid)
+        self.logger.debug("Signal %s scored %s of %s arguments" %
+                          (strategy.name, np.count_nonzero(valid), valid.size))
+        return profits, status_codes, valid
+
+    def score_batch(self, strategy, optimizer_values):
+        """
+        Scores a block of arguments with the compiled kernel of strategy
+        :param strategy: strategy object with bars
+        :param optimizer_values: 2-D integer array with one argument set per row
+        :return: profits, status codes and mask of valid rows or None if the strategy
+        has no kernel
+        """
+        profits = np.full(optimizer_values.shape[0], np.nan)
+        status_codes = np.full(optimizer_values.shape[0], BaseIndicator.NO_SIGNAL)
+        valid = np.zeros(optimizer_values.shape[0], dtype='bool')
+        strategy.prepare_primitives(optimizer_values)
+        for idx, optimizer_value in enumerate(optimizer_values):
+            try:
+                strategy.set_parameters(tuple(optimizer_value.tolist()))
+                score = strategy.score(BackTesting.ARGUMENTS)
+            except ValueError:
+                self.logger.debug("Arguments %s causes errors", optimizer_value)
+                continue
+            if score is None:
+                return None
+            profits[idx], status_codes[idx] = score
+            valid[idx] = True
+        return profits, status_codes, valid
+
     def calc_profit(self, strategy, stock_bars, optimizer_value, last_price=None):
         """
         Calculates the profit
@@ -80,11 +640,20 @@ class Optimizer:
             )
         strategy.append_value_to_bars(last_price)
         strategy.set_parameters(optimizer_value)
+        score = None if strategy.plot_result else strategy.score(BackTesting.ARGUMENTS)
+        if score is not None:
+            profit, status = score
+            self.logger.debug("Signal %s(%s) earns %s and has status code %s" %
+                              (strategy.name, strategy.parameters, profit, status))
+            return profit, status
         signal = strategy.generate_signals()
         status = strategy.get_status(signal)
         test = BackTesting(strategy.symbol, strategy, signal)
-        profit = test.backtest_portfolio(strategy.plot_result)
-        profit = profit[-1] / test.arguments['initial_capital'] - 1
+        if strategy.plot_result:
+            profit = test.backtest_portfolio(strategy.plot_result)[-1]
+        else:
+            profit = test.backtest_portfolio_value()
+        profit = profit / test.arguments['initial_capital'] - 1
         self.logger.debug("Signal %s(%s) earns %s and has status code %s" %
                           (strategy.name, strategy.parameters, profit, status))
         return profit, status
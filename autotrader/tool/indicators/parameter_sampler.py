@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import numpy as np
+
+PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29)
+
+
+def halton_points(count, dims, seed=0, start=0):
+    """
+    Calculates points of the Halton sequence in the unit cube. The sequence is shifted by
+    a random vector of seed, so different seeds give different points with the same spread.
+    :param count: amount of points
+    :param dims: amount of dimensions
+    :param seed: seed of shift
+    :param start: index of first point in sequence
+    :return: 2-D float array with one point per row
+    """
+    if dims > len(PRIMES):
+        raise ValueError("Halton sequence supports {} dimensions".format(len(PRIMES)))
+    points = np.zeros((count, dims))
+    for dim in range(dims):
+        base = PRIMES[dim]
+        indices = np.arange(start + 1, start + count + 1)
+        fraction = 1.0
+        while indices.any():
+            fraction /= base
+            points[:, dim] += fraction * (indices % base)
+            indices //= base
+    shift = np.random.RandomState(seed).random_sample(dims)
+    return (points + shift) % 1.0
+
+
+class ParameterSampler:
+    """
+    Proposes parameter sets of a parameter grid. The first parameter sets are quasi-random,
+    the next ones are proposed by a tree-structured Parzen estimator. It models the density
+    of the best scored parameter sets and of the other ones per dimension and proposes
+    parameter sets where the ratio of both densities is high.
+    """
+
+    # fraction of scored parameter sets that are good
+    GAMMA = 0.25
+    # candidates per proposal
+    CANDIDATES = 24
+    # kernel width as fraction of dimension size
+    BANDWIDTH = 0.1
+    # maximal amount of quasi-random draws per proposal
+    MAX_DRAWS = 64
+
+    def __init__(self, grid, seed=0):
+        self.grid = grid
+        self.seed = seed
+        self.random = np.random.RandomState(seed)
+        self.sizes = np.asarray([values.size for values in grid.values])
+        self.drawn = 0
+
+    def get_rows(self, indices):
+        """
+        Converts indices of dimension values to parameter sets
+        :param indices: 2-D integer array with one index per dimension
+        :return: 2-D integer array with parameter sets
+        """
+        return np.stack([values[indices[:, dim]] for dim, values in enumerate(self.grid.values)],
+                        axis=1).reshape(-1, len(self.grid.values))
+
+    def get_indices(self, rows):
+        """
+        Converts parameter sets to indices of dimension values
+        :param rows: 2-D integer array with parameter sets
+        :return: 2-D integer array with one index per dimension
+        """
+        return np.stack([np.searchsorted(values, rows[:, dim])
+                         for dim, values in enumerate(self.grid.values)], axis=1)
+
+    def get_quasi_random(self, count, known):
+        """
+        Draws valid parameter sets from the Halton sequence
+        :param count: maximal amount of parameter sets
+        :param known: set with tuples of drawn parameter sets. The new sets are added.
+        :return: 2-D integer array with parameter sets
+        """
+        rows = []
+        for _ in range(self.MAX_DRAWS):
+            if len(rows) >= count:
+                break
+            points = halton_points(4 * count, len(self.sizes), self.seed, self.drawn)
+            self.drawn += 4 * count
+            indices = np.minimum((points * self.sizes).astype('int64'), self.sizes - 1)
+            rows += self.__get_new(self.get_rows(indices), count - len(rows), known)
+        return np.asarray(rows, dtype='int64').reshape(-1, len(self.sizes))
+
+    def get_proposals(self, rows, profits, count, known):
+        """
+        Proposes parameter sets with the Parzen estimator. Missing proposals are filled up
+        with quasi-random parameter sets.
+        :param rows: 2-D integer array with scored parameter sets
+        :param profits: profits of rows
+        :param count: maximal amount of parameter sets
+        :param known: set with tuples of drawn parameter sets. The new sets are added.
+        :return: 2-D integer array with parameter sets
+        """
+        if rows.shape[0] == 0:
+            return self.get_quasi_random(count, known)
+        indices = self.get_indices(rows)
+        order = np.argsort(-profits, kind='stable')
+        good_count = max(1, int(np.ceil(self.GAMMA * rows.shape[0])))
+        good = indices[order[:good_count]]
+        bad = indices[order[good_count:]]
+        bandwidth = np.maximum(1.0, self.sizes * self.BANDWIDTH)
+        centers = good[self.random.randint(good_count, size=count * self.CANDIDATES)]
+        candidates = np.rint(centers + self.random.normal(size=centers.shape) * bandwidth)
+        candidates = np.clip(candidates, 0, self.sizes - 1).astype('int64')
+        ratio = self.__get_log_density(candidates, good, bandwidth) - \
+            self.__get_log_density(candidates, bad, bandwidth)
+        candidates = self.get_rows(candidates[np.argsort(-ratio, kind='stable')])
+        proposals = self.__get_new(candidates, count, known)
+        proposals = np.asarray(proposals, dtype='int64').reshape(-1, len(self.sizes))
+        if proposals.shape[0] < count:
+            proposals = np.concatenate((proposals, self.get_quasi_random(
+                count - proposals.shape[0], known)))
+        return proposals
+
+    def __get_log_density(self, candidates, centers, bandwidth):
+        """
+        Calculates the logarithm of the Parzen density per dimension with a uniform prior
+        :param candidates: 2-D integer array with indices of candidates
+        :param centers: 2-D integer array with indices of kernel centers
+        :param bandwidth: kernel width per dimension
+        :return: logarithm of density of each candidate
+        """
+        density = np.zeros(candidates.shape[0])
+        for dim in range(candidates.shape[1]):
+            diff = (candidates[:, dim, np.newaxis] - centers[np.newaxis, :, dim]) / bandwidth[dim]
+            kernels = np.exp(-0.5 * diff ** 2).sum(axis=1) / (bandwidth[dim] * np.sqrt(2 * np.pi))
+            density += np.log((kernels + 1.0 / self.sizes[dim]) / (centers.shape[0] + 1))
+        return density
+
+    def __get_new(self, candidates, count, known):
+        """
+        Selects valid parameter sets that are not known yet
+        :param candidates: 2-D integer array with parameter sets
+        :param count: maximal amount of parameter sets
+        :param known: set with tuples of drawn parameter sets. The new sets are added.
+        :return: list with parameter sets
+        """
+        rows = []
+        for row in candidates[self.grid.space.is_valid(candidates)].tolist():
+            if len(rows) >= count:
+                break
+            if tuple(row) not in known:
+                known.add(tuple(row))
+                rows.append(row)
+        return rows
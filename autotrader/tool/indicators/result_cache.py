@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import hashlib
+import pickle
+import sqlite3
+
+from autotrader.datasource.bars import Bars, COLUMNS
+
+
+class ResultCache:
+    """
+    Persistent cache of optimizer results in a sqlite file. The least recently used
+    results are removed if the cache holds more than max_entries results.
+    """
+
+    MAX_ENTRIES = 20000
+
+    def __init__(self, path, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS result "
+                                    "(key TEXT PRIMARY KEY, value BLOB, used INTEGER)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS result_used ON result (used)")
+        self.clock = self.connection.execute("SELECT MAX(used) FROM result").fetchone()[0] or 0
+
+    @staticmethod
+    def get_key(*parts):
+        """
+        Builds the key of a result
+        :param parts: values that identify the result i.e. stock id, indicator name, ...
+        :return: hex string
+        """
+        return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def get_fingerprint(bars):
+        """
+        Calculates the fingerprint of a bar window
+        :param bars: bars object or BARS_NUMPY array
+        :return: hex string
+        """
+        if not isinstance(bars, Bars):
+            bars = Bars.from_array(bars)
+        fingerprint = hashlib.sha1()
+        for column in COLUMNS:
+            fingerprint.update(bars.get_column(column).tobytes())
+        return fingerprint.hexdigest()
+
+    def get(self, key):
+        """
+        Returns a result and marks it as recently used
+        :param key: key of result
+        :return: result or None
+        """
+        row = self.connection.execute("SELECT value FROM result WHERE key = ?",
+                                      (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.clock += 1
+        with self.connection:
+            self.connection.execute("UPDATE result SET used = ? WHERE key = ?", (self.clock, key))
+        return pickle.loads(row[0])
+
+    def put(self, key, value):
+        """
+        Stores a result and removes the least recently used results above the size cap
+        :param key: key of result
+        :param value: picklable result
+        :return: nothing
+        """
+        self.clock += 1
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO result (key, value, used) "
+                                    "VALUES (?, ?, ?)",
+                                    (key, pickle.dumps(value), self.clock))
+            self.connection.execute("DELETE FROM result WHERE key IN (SELECT key FROM result "
+                                    "ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                                    (self.max_entries,))
+
+    def close(self):
+        """
+        Closes the cache file
+        :return: nothing
+        """
+        self.connection.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM result").fetchone()[0]
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+""" Autotrader
+
+ Copyright 2017-2018 Slash Gordon
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+import heapq
+
+import numpy as np
+
+
+class TopResults:
+    """
+    Bounded heap with the best results of an optimizer run. Equal profits are ranked in
+    the order the arguments were pushed like the profit > profit_max check of the optimizer.
+    Each argument set is kept once.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.heap = []
+        self.parameters = set()
+        self.count = 0
+
+    def push(self, profit, parameters, status):
+        """
+        Adds one result
+        :param profit: profit of arguments
+        :param parameters: arguments
+        :param status: status of arguments
+        :return: nothing
+        """
+        self.__push(profit, self.count, parameters, status)
+        self.count += 1
+
+    def push_block(self, rows, profits, status_codes, valid):
+        """
+        Adds the results of a block of arguments
+        :param rows: 2-D integer array with one argument set per row
+        :param profits: profits of rows
+        :param status_codes: status codes of rows
+        :param valid: mask of valid rows
+        :return: nothing
+        """
+        candidates = np.flatnonzero(valid & ~np.isnan(profits))
+        if candidates.size > self.size:
+            # only the best rows of a block can enter the heap
+            candidates = np.sort(candidates[np.argsort(-profits[candidates],
+                                                       kind='stable')[:self.size]])
+        for idx in candidates:
+            self.__push(profits[idx], self.count + idx, rows[idx].tolist(), status_codes[idx])
+        self.count += rows.shape[0]
+
+    def get(self):
+        """
+        Returns the results from the best to the worst
+        :return: list of tuples with profit, arguments and status
+        """
+        return [(profit, parameters, status)
+                for profit, _, parameters, status in sorted(self.heap, reverse=True)]
+
+    def __push(self, profit, sequence, parameters, status):
+        parameters = tuple(int(parameter) for parameter in parameters)
+        if self.size <= 0 or np.isnan(profit) or parameters in self.parameters:
+            return
+        item = (float(profit), -sequence, parameters, int(status))
+        if len(self.heap) < self.size:
+            heapq.heappush(self.heap, item)
+        elif item > self.heap[0]:
+            self.parameters.discard(heapq.heapreplace(self.heap, item)[2])
+        else:
+            return
+        self.parameters.add(parameters)
+
+    def __len__(self):
+        return len(self.heap)